@@ -75,4 +75,9 @@ async def run_async_migrations() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    asyncio.run(run_async_migrations()) 
\ No newline at end of file
+    asyncio.run(run_async_migrations()) 
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,71 @@
+"""Add usage and API key lookup indexes
+
+Revision ID: 05bdfd6dccf1
+Revises: 8a0ed50c8481
+Create Date: 2026-10-15 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05bdfd6dccf1'
+down_revision: Union[str, None] = '8a0ed50c8481'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build the indexes without blocking writes to the live tables.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_api_key_usage_api_key_id_created_at',
+            'api_key_usage',
+            ['api_key_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_api_keys_key_hash',
+            'api_keys',
+            ['key_hash'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Enum columns store member names, hence 'ACTIVE'
+        op.create_index(
+            'ix_api_keys_key_prefix_active',
+            'api_keys',
+            ['key_prefix'],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_api_keys_key_prefix_active',
+            table_name='api_keys',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_api_keys_key_hash',
+            table_name='api_keys',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_api_key_usage_api_key_id_created_at',
+            table_name='api_key_usage',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,81 @@
+"""Add API key usage rollups
+
+Revision ID: 73ee9e42f90a
+Revises: 05bdfd6dccf1
+Create Date: 2026-10-15 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73ee9e42f90a'
+down_revision: Union[str, None] = '05bdfd6dccf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+rollup_granularity = postgresql.ENUM(
+    'MINUTE', 'HOUR', 'DAY', name='rollupgranularity', create_type=False
+)
+
+
+def upgrade() -> None:
+    # The type may already exist if the app created the table via create_all
+    op.execute(
+        """
+        DO $$ BEGIN
+            CREATE TYPE rollupgranularity AS ENUM ('MINUTE', 'HOUR', 'DAY');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """
+    )
+    op.create_table(
+        'api_key_usage_rollups',
+        sa.Column('api_key_id', sa.Integer(), nullable=False),
+        sa.Column('granularity', rollup_granularity, nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('endpoint', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('response_time_sum', sa.Float(), nullable=False),
+        sa.Column('response_time_min', sa.Float(), nullable=False),
+        sa.Column('response_time_max', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['api_key_id'], ['api_keys.id']),
+        sa.PrimaryKeyConstraint('api_key_id', 'granularity', 'bucket_start', 'endpoint'),
+        if_not_exists=True,
+    )
+
+    # Backfill the rollups from the raw usage rows already recorded
+    for granularity in ('minute', 'hour', 'day'):
+        op.execute(
+            f"""
+            INSERT INTO api_key_usage_rollups (
+                api_key_id, granularity, bucket_start, endpoint,
+                request_count, error_count,
+                response_time_sum, response_time_min, response_time_max
+            )
+            SELECT
+                api_key_id,
+                '{granularity.upper()}',
+                date_trunc('{granularity}', created_at),
+                endpoint,
+                count(*),
+                count(*) FILTER (WHERE status_code >= 400),
+                sum(response_time),
+                min(response_time),
+                max(response_time)
+            FROM api_key_usage
+            GROUP BY api_key_id, date_trunc('{granularity}', created_at), endpoint
+            ON CONFLICT DO NOTHING
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('api_key_usage_rollups')
+    op.execute('DROP TYPE IF EXISTS rollupgranularity')
@@ -0,0 +1,135 @@
+"""Partition api_key_usage by month
+
+Revision ID: a79fba28c430
+Revises: 73ee9e42f90a
+Create Date: 2026-10-15 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a79fba28c430'
+down_revision: Union[str, None] = '73ee9e42f90a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    'updated_at, id, created_at, endpoint, method, status_code, '
+    'response_time, ip_address, user_agent, api_key_id'
+)
+
+# Partitions cover every month with data up to two months ahead; later
+# months are created by app.services.usage_partitions
+CREATE_PARTITIONS_SQL = """
+DO $$
+DECLARE
+    month date;
+    last_month date := (date_trunc('month', now()) + interval '2 months')::date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(created_at), now()))::date
+    INTO month FROM api_key_usage_unpartitioned;
+
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF api_key_usage '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'api_key_usage_' || to_char(month, '"y"YYYY"m"MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    # Move the existing table out of the way, keeping its id sequence
+    op.execute('ALTER TABLE api_key_usage RENAME TO api_key_usage_unpartitioned')
+    op.execute(
+        'ALTER TABLE api_key_usage_unpartitioned '
+        'RENAME CONSTRAINT api_key_usage_pkey TO api_key_usage_unpartitioned_pkey'
+    )
+    op.execute('DROP INDEX IF EXISTS ix_api_key_usage_endpoint')
+    op.execute('DROP INDEX IF EXISTS ix_api_key_usage_api_key_id_created_at')
+    op.execute('ALTER SEQUENCE api_key_usage_id_seq OWNED BY NONE')
+
+    op.execute(
+        """
+        CREATE TABLE api_key_usage (
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            id INTEGER NOT NULL DEFAULT nextval('api_key_usage_id_seq'),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            endpoint VARCHAR NOT NULL,
+            method VARCHAR NOT NULL,
+            status_code INTEGER NOT NULL,
+            response_time FLOAT NOT NULL,
+            ip_address VARCHAR NOT NULL,
+            user_agent VARCHAR,
+            api_key_id INTEGER NOT NULL REFERENCES api_keys (id),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE api_key_usage_id_seq OWNED BY api_key_usage.id')
+    op.create_index('ix_api_key_usage_endpoint', 'api_key_usage', ['endpoint'])
+    op.create_index(
+        'ix_api_key_usage_api_key_id_created_at',
+        'api_key_usage',
+        ['api_key_id', sa.text('created_at DESC')],
+    )
+
+    op.execute(CREATE_PARTITIONS_SQL)
+    op.execute(
+        f'INSERT INTO api_key_usage ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM api_key_usage_unpartitioned'
+    )
+    op.execute('DROP TABLE api_key_usage_unpartitioned')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE api_key_usage RENAME TO api_key_usage_partitioned')
+    op.execute(
+        'ALTER TABLE api_key_usage_partitioned '
+        'RENAME CONSTRAINT api_key_usage_pkey TO api_key_usage_partitioned_pkey'
+    )
+    op.execute('DROP INDEX IF EXISTS ix_api_key_usage_endpoint')
+    op.execute('DROP INDEX IF EXISTS ix_api_key_usage_api_key_id_created_at')
+    op.execute('ALTER SEQUENCE api_key_usage_id_seq OWNED BY NONE')
+
+    op.execute(
+        """
+        CREATE TABLE api_key_usage (
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            id INTEGER NOT NULL DEFAULT nextval('api_key_usage_id_seq'),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            endpoint VARCHAR NOT NULL,
+            method VARCHAR NOT NULL,
+            status_code INTEGER NOT NULL,
+            response_time FLOAT NOT NULL,
+            ip_address VARCHAR NOT NULL,
+            user_agent VARCHAR,
+            api_key_id INTEGER NOT NULL REFERENCES api_keys (id),
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute('ALTER SEQUENCE api_key_usage_id_seq OWNED BY api_key_usage.id')
+    op.create_index('ix_api_key_usage_endpoint', 'api_key_usage', ['endpoint'])
+    op.create_index(
+        'ix_api_key_usage_api_key_id_created_at',
+        'api_key_usage',
+        ['api_key_id', sa.text('created_at DESC')],
+    )
+
+    op.execute(
+        f'INSERT INTO api_key_usage ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM api_key_usage_partitioned'
+    )
+    # Dropping the partitioned parent drops all of its partitions
+    op.execute('DROP TABLE api_key_usage_partitioned')
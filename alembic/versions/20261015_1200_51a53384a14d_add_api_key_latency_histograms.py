@@ -0,0 +1,75 @@
+"""Add API key latency histograms
+
+Revision ID: 51a53384a14d
+Revises: a79fba28c430
+Create Date: 2026-10-15 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '51a53384a14d'
+down_revision: Union[str, None] = 'a79fba28c430'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+rollup_granularity = postgresql.ENUM(
+    'MINUTE', 'HOUR', 'DAY', name='rollupgranularity', create_type=False
+)
+
+# Must match app.services.usage_rollups.latency_bin
+LATENCY_BIN_SQL = (
+    'CASE WHEN response_time * 1000 <= 1 THEN 0 '
+    'ELSE ceil(ln(response_time * 1000) / ln(1.05))::integer END'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'api_key_latency_histograms',
+        sa.Column('api_key_id', sa.Integer(), nullable=False),
+        sa.Column('granularity', rollup_granularity, nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('endpoint', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('bin', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['api_key_id'], ['api_keys.id']),
+        sa.PrimaryKeyConstraint(
+            'api_key_id', 'granularity', 'bucket_start', 'endpoint', 'bin'
+        ),
+        if_not_exists=True,
+    )
+
+    # Backfill histograms from the raw usage rows already recorded
+    for granularity in ('hour', 'day'):
+        op.execute(
+            f"""
+            INSERT INTO api_key_latency_histograms (
+                api_key_id, granularity, bucket_start, endpoint, bin, count
+            )
+            SELECT
+                api_key_id,
+                '{granularity.upper()}',
+                date_trunc('{granularity}', created_at),
+                endpoint,
+                {LATENCY_BIN_SQL},
+                count(*)
+            FROM api_key_usage
+            GROUP BY
+                api_key_id,
+                date_trunc('{granularity}', created_at),
+                endpoint,
+                {LATENCY_BIN_SQL}
+            ON CONFLICT DO NOTHING
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('api_key_latency_histograms')
@@ -0,0 +1,86 @@
+"""Add jobs
+
+Revision ID: 3f9c2b7d6e41
+Revises: 51a53384a14d
+Create Date: 2026-10-15 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2b7d6e41'
+down_revision: Union[str, None] = '51a53384a14d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_kind = postgresql.ENUM(
+    'SUMMARIZE', 'PARAPHRASE', 'IMAGE_TO_TEXT', name='jobkind', create_type=False
+)
+job_status = postgresql.ENUM(
+    'PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus', create_type=False
+)
+
+
+def upgrade() -> None:
+    # The types may already exist if the app created the table via create_all
+    op.execute(
+        """
+        DO $$ BEGIN
+            CREATE TYPE jobkind AS ENUM ('SUMMARIZE', 'PARAPHRASE', 'IMAGE_TO_TEXT');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        DO $$ BEGIN
+            CREATE TYPE jobstatus AS ENUM ('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """
+    )
+    op.create_table(
+        'jobs',
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('kind', job_kind, nullable=False),
+        sa.Column('status', job_status, nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('callback_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('callback_delivered_at', sa.DateTime(), nullable=True),
+        sa.Column('api_key_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['api_key_id'], ['api_keys.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_jobs_api_key_id', 'jobs', ['api_key_id'], if_not_exists=True)
+    op.create_index(
+        'ix_jobs_runnable',
+        'jobs',
+        ['run_after'],
+        postgresql_where=sa.text("status IN ('PENDING', 'RUNNING')"),
+        if_not_exists=True,
+    )
+    op.create_index('ix_jobs_expires_at', 'jobs', ['expires_at'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table('jobs')
+    op.execute('DROP TYPE IF EXISTS jobstatus')
+    op.execute('DROP TYPE IF EXISTS jobkind')
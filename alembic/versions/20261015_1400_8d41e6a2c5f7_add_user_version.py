@@ -0,0 +1,29 @@
+"""Add user version
+
+Revision ID: 8d41e6a2c5f7
+Revises: 3f9c2b7d6e41
+Create Date: 2026-10-15 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6a2c5f7'
+down_revision: Union[str, None] = '3f9c2b7d6e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'version')
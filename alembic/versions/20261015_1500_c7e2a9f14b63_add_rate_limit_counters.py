@@ -0,0 +1,42 @@
+"""Add rate limit counters
+
+Revision ID: c7e2a9f14b63
+Revises: 8d41e6a2c5f7
+Create Date: 2026-10-15 15:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9f14b63'
+down_revision: Union[str, None] = '8d41e6a2c5f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Counters are short-lived and cheap to lose, so skip the WAL
+    op.create_table(
+        'rate_limit_counters',
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+        prefixes=['UNLOGGED'],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_rate_limit_counters_expires_at',
+        'rate_limit_counters',
+        ['expires_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rate_limit_counters')
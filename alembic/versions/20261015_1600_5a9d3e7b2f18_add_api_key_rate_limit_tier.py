@@ -0,0 +1,35 @@
+"""Add API key rate limit tier
+
+Revision ID: 5a9d3e7b2f18
+Revises: c7e2a9f14b63
+Create Date: 2026-10-15 16:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d3e7b2f18'
+down_revision: Union[str, None] = 'c7e2a9f14b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'api_keys',
+        sa.Column(
+            'rate_limit_tier',
+            sqlmodel.sql.sqltypes.AutoString(),
+            server_default='standard',
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('api_keys', 'rate_limit_tier')
@@ -0,0 +1,41 @@
+"""Drop api_keys key_prefix index
+
+Revision ID: e3b8c1d94a27
+Revises: 5a9d3e7b2f18
+Create Date: 2026-10-15 17:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8c1d94a27'
+down_revision: Union[str, None] = '5a9d3e7b2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Key verification only looks up active keys, which the partial
+    # ix_api_keys_key_prefix_active index covers; the full index only adds
+    # write cost. It exists where the table was created from the models.
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_api_keys_key_prefix',
+            table_name='api_keys',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_api_keys_key_prefix',
+            'api_keys',
+            ['key_prefix'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
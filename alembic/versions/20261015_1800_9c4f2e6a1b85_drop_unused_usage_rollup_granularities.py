@@ -0,0 +1,30 @@
+"""Drop unused usage rollup granularities
+
+Revision ID: 9c4f2e6a1b85
+Revises: e3b8c1d94a27
+Create Date: 2026-10-15 18:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f2e6a1b85'
+down_revision: Union[str, None] = 'e3b8c1d94a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only daily rollups are read or maintained; finer rows would never be
+    # pruned. Enum columns store member names, hence 'MINUTE'.
+    op.execute(
+        "DELETE FROM api_key_usage_rollups WHERE granularity IN ('MINUTE', 'HOUR')"
+    )
+
+
+def downgrade() -> None:
+    # The deleted rows cannot be rebuilt once their raw usage has expired
+    pass
@@ -4,25 +4,32 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.auth import verify_token
+from app.core.security import verify_token
+from app.core.config import settings
 from app.core.database import get_session
+from app.core.rate_limit import set_rate_limit_subject
 from app.models import User
+from app.services.user_cache import CachedUser, get_cached_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/endpoints/auth/login")
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)
-) -> User:
+) -> CachedUser:
     """
     Get the current authenticated user based on the JWT token.
 
+    With JWT_STATELESS_AUTH enabled, tokens carrying the user's version are
+    resolved through the user cache and rejected once the user has changed
+    since the token was issued; other tokens fall back to a database lookup.
+
     Args:
         token: JWT token from the Authorization header
         session: Database session
 
     Returns:
-        User: The authenticated user
+        CachedUser: The authenticated user
 
     Raises:
         HTTPException: If authentication fails
@@ -48,6 +55,16 @@ async def get_current_user(
     except (TypeError, ValueError):
         raise credentials_exception
 
+    if settings.JWT_STATELESS_AUTH and "ver" in payload:
+        if not payload.get("active"):
+            raise credentials_exception
+
+        user = await get_cached_user(session, user_id)
+        if user is None or not user.is_active or user.version != payload["ver"]:
+            raise credentials_exception
+        set_rate_limit_subject(f"user:{user.id}")
+        return user
+
     # Get the user from database
     query = select(User).where(User.id == user_id, User.is_active == True)
     result = await session.execute(query)
@@ -56,12 +73,13 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
-    return user
+    set_rate_limit_subject(f"user:{user.id}")
+    return CachedUser.from_user(user)
 
 
 async def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CachedUser = Depends(get_current_user),
+) -> CachedUser:
     """
     Get the current authenticated superuser.
 
@@ -69,7 +87,7 @@ async def get_current_active_superuser(
         current_user: The current authenticated user
 
     Returns:
-        User: The authenticated superuser
+        CachedUser: The authenticated superuser
 
     Raises:
         HTTPException: If the user is not a superuser
@@ -8,7 +8,16 @@ from fastapi import APIRouter, Request
 from app.api.v1.endpoints.ai_tools.text_summarizer import summarizer_router
 from app.api.v1.endpoints.ai_tools.text_paraphraser import paraphraser_router
 from app.api.v1.endpoints.ai_tools.image_to_text import image_to_text_router
+from app.api.v1.endpoints.ai_tools.jobs import jobs_router
 from app.core.rate_limit import limiter
+from app.services.image_to_text import image_analyzer
+from app.services.jobs import job_queue
+from app.services.model_router import model_router
+from app.services.result_cache import result_cache
+from app.services.text_paraphraser import paraphraser
+from app.services.text_summarizer import summarizer
+from app.services.upstream_scheduler import upstream_scheduler
+from app.services.usage_log_writer import usage_log_writer
 from app.api.v1.endpoints import auth, api_keys
 
 # Create the main endpoints router
@@ -22,7 +31,24 @@ async def health_check(request: Request):
     Health check endpoint to verify API status.
     Rate limited to 5 requests per minute per IP address.
     """
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "usage_log": usage_log_writer.metrics,
+        "jobs": job_queue.metrics,
+        "result_cache": result_cache.metrics,
+        "single_flight": {
+            "summarize": summarizer.inflight.metrics,
+            "paraphrase": paraphraser.inflight.metrics,
+            "image_to_text": image_analyzer.inflight.metrics,
+        },
+        "upstream": upstream_scheduler.metrics,
+        "llm_calls": {
+            "summarize": summarizer.route.caller.metrics,
+            "paraphrase": paraphraser.route.caller.metrics,
+            "image_to_text": image_analyzer.route.caller.metrics,
+        },
+        "routes": model_router.metrics,
+    }
 
 
 # Include all v1 endpoint routers
@@ -30,6 +56,7 @@ ai_tools_router = APIRouter()
 ai_tools_router.include_router(summarizer_router)
 ai_tools_router.include_router(paraphraser_router)
 ai_tools_router.include_router(image_to_text_router)
+ai_tools_router.include_router(jobs_router)
 
 endpoints_router.include_router(ai_tools_router, prefix="/ai-tools", tags=["ai-tools"])
 
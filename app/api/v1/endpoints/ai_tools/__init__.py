@@ -13,8 +13,10 @@ ai_tools_router = APIRouter()
 from app.api.v1.endpoints.ai_tools.text_summarizer import summarizer_router
 from app.api.v1.endpoints.ai_tools.text_paraphraser import paraphraser_router
 from app.api.v1.endpoints.ai_tools.image_to_text import image_to_text_router
+from app.api.v1.endpoints.ai_tools.jobs import jobs_router
 
 # Include tool routers
 ai_tools_router.include_router(summarizer_router)
 ai_tools_router.include_router(paraphraser_router)
 ai_tools_router.include_router(image_to_text_router)
+ai_tools_router.include_router(jobs_router)
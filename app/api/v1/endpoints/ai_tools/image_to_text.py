@@ -10,7 +10,6 @@ import os
 import tempfile
 from fastapi import APIRouter, HTTPException, Request, Depends, File, UploadFile, Form
 from fastapi.responses import JSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.services.image_to_text import (
@@ -20,11 +19,12 @@ from app.services.image_to_text import (
     DetailLevel,
 )
 from app.schemas.image_to_text import ImageToTextResponse, ImageUrlRequest
-from app.core.rate_limit import limiter
-from app.core.database import get_session
+from app.services.upstream_scheduler import UpstreamUnavailableException
+from app.core.rate_limit import limiter, tiered_limit
 from app.api.v1.endpoints.ai_tools.utils import (
     get_current_user_by_api_key,
     log_api_usage,
+    upstream_unavailable_error,
 )
 
 image_to_text_router = APIRouter()
@@ -37,7 +37,7 @@ ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
 
 
 @image_to_text_router.post("/image-to-text", response_model=ImageToTextResponse)
-@limiter.limit("5/minute")
+@limiter.limit(tiered_limit("5/minute"))
 async def image_to_text(
     request: Request,
     image_url: Optional[str] = Form(None),
@@ -45,12 +45,11 @@ async def image_to_text(
     mode: Optional[str] = Form("description"),
     detail_level: Optional[str] = Form("standard"),
     auth_data: tuple = Depends(get_current_user_by_api_key),
-    session: AsyncSession = Depends(get_session),
 ):
     """
     Convert an image to text description using AI.
     Accepts either an image URL or an uploaded image file.
-    Rate limited to 5 requests per minute per IP address.
+    Rate limited to 5 requests per minute per API key, scaled by its tier.
     Requires API key authentication via X-API-Key header.
 
     - **image_url**: URL of the image to analyze (optional if image_file is provided)
@@ -164,6 +163,9 @@ async def image_to_text(
 
         response = ImageToTextResponse(**result)
 
+    except UpstreamUnavailableException as e:
+        status_code = 503
+        raise upstream_unavailable_error(e)
     except ImageToTextException as e:
         status_code = 422
         raise HTTPException(status_code=422, detail=str(e))
@@ -176,7 +178,7 @@ async def image_to_text(
     finally:
         # Log API key usage
         response_time = time() - start_time
-        await log_api_usage(
+        log_api_usage(
             api_key_id=api_key_id,
             endpoint="/image-to-text",
             method="POST",
@@ -184,7 +186,6 @@ async def image_to_text(
             response_time=response_time,
             ip_address=request.client.host,
             user_agent=request.headers.get("user-agent"),
-            session=session,
         )
 
     return response
@@ -0,0 +1,165 @@
+"""
+Background Job API Routes
+
+This module provides the API endpoints for running AI tools as background jobs.
+"""
+
+import uuid
+from time import time
+from fastapi import APIRouter, HTTPException, Request, Depends, Response
+from pydantic import ValidationError
+from app.models import JobKind
+from app.schemas.image_to_text import ImageToTextResponse, ImageUrlRequest
+from app.schemas.jobs import JobRequest, JobResponse
+from app.schemas.text_paraphraser import ParaphraseRequest, ParaphraseResponse
+from app.schemas.text_summarizer import SummarizeRequest, SummarizeResponse
+from app.services.image_to_text import image_analyzer, ImageToTextException
+from app.services.jobs import CallbackURLException, job_queue, public_job
+from app.services.text_paraphraser import paraphraser, TextParaphraserException
+from app.services.text_summarizer import summarizer, TextSummarizerException
+from app.core.rate_limit import limiter, tiered_limit
+from app.api.v1.endpoints.ai_tools.utils import (
+    get_current_user_by_api_key,
+    log_api_usage,
+)
+
+jobs_router = APIRouter()
+
+
+async def run_summarize(body: SummarizeRequest) -> dict:
+    result = await summarizer.summarize(
+        text=body.text,
+        mode=body.mode,
+        max_length=body.max_length,
+        custom_instructions=body.custom_instructions,
+        extract_keywords=body.extract_keywords,
+    )
+    return SummarizeResponse(**result).model_dump()
+
+
+async def run_paraphrase(body: ParaphraseRequest) -> dict:
+    result = await paraphraser.paraphrase(
+        text=body.text,
+        style=body.style,
+        intensity=body.intensity,
+        length_option=body.length_option,
+    )
+    return ParaphraseResponse(**result).model_dump()
+
+
+async def run_image_to_text(body: ImageUrlRequest) -> dict:
+    result = await image_analyzer.analyze_image(
+        image_source=str(body.image_url),
+        mode=body.mode,
+        detail_level=body.detail_level,
+        is_url=True,
+    )
+    return ImageToTextResponse(**result).model_dump()
+
+
+job_queue.register(
+    JobKind.SUMMARIZE, SummarizeRequest, run_summarize, TextSummarizerException
+)
+job_queue.register(
+    JobKind.PARAPHRASE, ParaphraseRequest, run_paraphrase, TextParaphraserException
+)
+job_queue.register(
+    JobKind.IMAGE_TO_TEXT, ImageUrlRequest, run_image_to_text, ImageToTextException
+)
+
+
+@jobs_router.post("/jobs", response_model=JobResponse, status_code=202)
+@limiter.limit(tiered_limit("5/minute"))
+async def submit_job(
+    request: Request,
+    response: Response,
+    body: JobRequest,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> JobResponse:
+    """
+    Run an AI tool as a background job.
+    Rate limited to 5 requests per minute per API key, scaled by its tier.
+    Requires API key authentication via X-API-Key header.
+    Returns immediately with the job ID; poll `GET /jobs/{job_id}` or pass
+    a `callback_url` to receive the finished job as a POST signed with
+    HMAC-SHA256 (`X-Signature: sha256=<hex>` over
+    `{X-Signature-Timestamp}.{body}`). Finished jobs are kept until their
+    `expires_at`.
+
+    - **kind**: The tool to run (summarize, paraphrase, or image_to_text)
+    - **payload**: The request body the tool's endpoint would take; images
+      must be given by `image_url`
+    - **callback_url**: Optional URL notified when the job finishes; it
+      must point to a public host and redirects are not followed
+    """
+    current_user, api_key_id = auth_data
+    start_time = time()
+    status_code = 202
+
+    try:
+        if body.callback_url is not None and not job_queue.webhooks_enabled:
+            status_code = 422
+            raise HTTPException(
+                status_code=422, detail="Webhook callbacks are not enabled"
+            )
+
+        try:
+            payload = job_queue.validate(body.kind, body.payload)
+        except ValidationError as e:
+            status_code = 422
+            raise HTTPException(
+                status_code=422,
+                detail=e.errors(include_url=False, include_input=False),
+            )
+
+        job = await job_queue.submit(
+            api_key_id=api_key_id,
+            kind=body.kind,
+            payload=payload,
+            callback_url=str(body.callback_url) if body.callback_url else None,
+        )
+        response.headers["Location"] = f"{request.url.path}/{job['id']}"
+
+    except HTTPException:
+        raise
+    except CallbackURLException as e:
+        status_code = 422
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception:
+        status_code = 500
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        # Log API key usage
+        response_time = time() - start_time
+        log_api_usage(
+            api_key_id=api_key_id,
+            endpoint="/jobs",
+            method="POST",
+            status_code=status_code,
+            response_time=response_time,
+            ip_address=request.client.host,
+            user_agent=request.headers.get("user-agent"),
+        )
+
+    return JobResponse(**public_job(job))
+
+
+@jobs_router.get("/jobs/{job_id}", response_model=JobResponse)
+@limiter.limit(tiered_limit("60/minute"))
+async def get_job(
+    request: Request,
+    job_id: uuid.UUID,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> JobResponse:
+    """
+    Get the status and, once finished, the result of a job.
+    Rate limited to 60 requests per minute per API key, scaled by its tier.
+    Requires authentication with the API key that submitted the job.
+
+    - **job_id**: The job ID returned on submission
+    """
+    current_user, api_key_id = auth_data
+    job = await job_queue.get(job_id, api_key_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**public_job(job))
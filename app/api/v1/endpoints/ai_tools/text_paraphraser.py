@@ -5,34 +5,56 @@ This module provides the API endpoints for text paraphrasing functionality.
 """
 
 from time import time
+import asyncio
 from fastapi import APIRouter, HTTPException, Request, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
 from app.services.text_paraphraser import paraphraser, TextParaphraserException
-from app.schemas.text_paraphraser import ParaphraseRequest, ParaphraseResponse
-from app.core.rate_limit import limiter
-from app.core.database import get_session
+from app.schemas.text_paraphraser import (
+    ParaphraseBatchRequest,
+    ParaphraseBatchResponse,
+    ParaphraseRequest,
+    ParaphraseResponse,
+)
+from app.services.upstream_scheduler import UpstreamUnavailableException
+from app.core.rate_limit import limiter, tiered_limit
 from app.api.v1.endpoints.ai_tools.utils import (
+    NDJSONStreamingResponse,
+    cache_bypass_requested,
+    event_stream_requested,
     get_current_user_by_api_key,
     log_api_usage,
+    log_batch_usage,
+    run_batch,
+    stream_bulk_results,
+    stream_events,
+    upstream_unavailable_error,
 )
 
 paraphraser_router = APIRouter()
 
 
 @paraphraser_router.post(
-    "/paraphrase", response_model=ParaphraseResponse, status_code=200
+    "/paraphrase",
+    response_model=ParaphraseResponse,
+    status_code=200,
+    responses={200: {"content": {"text/event-stream": {}}}},
 )
-@limiter.limit("5/minute")  # Same rate limit as summarizer
+@limiter.limit(tiered_limit("5/minute"))  # Same rate limit as summarizer
 async def paraphrase_text(
     request: Request,
     body: ParaphraseRequest,
     auth_data: tuple = Depends(get_current_user_by_api_key),
-    session: AsyncSession = Depends(get_session),
+    stream: bool = False,
 ) -> ParaphraseResponse:
     """
     Paraphrase text using the specified style, intensity, and length options.
-    Rate limited to 5 requests per minute per IP address.
+    Rate limited to 5 requests per minute per API key, scaled by its tier.
     Requires API key authentication via X-API-Key header.
+    Identical requests are served from the result cache; send
+    `Cache-Control: no-cache` to force a fresh result.
+    Send `stream=true` or `Accept: text/event-stream` to receive the result
+    as Server-Sent Events: `token` events with incremental text, then a
+    `done` event with the complete result (or an `error` event).
 
     - **text**: The text to paraphrase
     - **style**: Paraphrasing style (formal, casual, or simple)
@@ -42,34 +64,163 @@ async def paraphrase_text(
     current_user, api_key_id = auth_data
     start_time = time()
     status_code = 200
+    streaming = False
 
     try:
+        if event_stream_requested(request, stream):
+            pieces = paraphraser.stream_paraphrase(
+                text=body.text,
+                style=body.style,
+                intensity=body.intensity,
+                length_option=body.length_option,
+                use_cache=not cache_bypass_requested(request),
+            )
+            # The event stream logs its own usage once it finishes
+            streaming = True
+            return StreamingResponse(
+                stream_events(
+                    pieces,
+                    result_field="paraphrased_text",
+                    service_exception=TextParaphraserException,
+                    request=request,
+                    api_key_id=api_key_id,
+                    endpoint="/paraphrase",
+                    start_time=start_time,
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
         result = await paraphraser.paraphrase(
             text=body.text,
             style=body.style,
             intensity=body.intensity,
             length_option=body.length_option,
+            use_cache=not cache_bypass_requested(request),
         )
         response = ParaphraseResponse(**result)
 
+    except UpstreamUnavailableException as e:
+        status_code = 503
+        raise upstream_unavailable_error(e)
     except TextParaphraserException as e:
         status_code = 422
         raise HTTPException(status_code=422, detail=str(e))
+    except asyncio.TimeoutError:
+        status_code = 504
+        raise HTTPException(status_code=504, detail="Request timed out")
     except Exception as e:
         status_code = 500
         raise HTTPException(status_code=500, detail="Internal server error")
     finally:
         # Log API key usage
-        response_time = time() - start_time
-        await log_api_usage(
-            api_key_id=api_key_id,
-            endpoint="/paraphrase",
-            method="POST",
-            status_code=status_code,
-            response_time=response_time,
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent"),
-            session=session,
-        )
+        if not streaming:
+            response_time = time() - start_time
+            log_api_usage(
+                api_key_id=api_key_id,
+                endpoint="/paraphrase",
+                method="POST",
+                status_code=status_code,
+                response_time=response_time,
+                ip_address=request.client.host,
+                user_agent=request.headers.get("user-agent"),
+            )
 
     return response
+
+
+@paraphraser_router.post(
+    "/paraphrase/batch", response_model=ParaphraseBatchResponse, status_code=200
+)
+@limiter.limit(tiered_limit("5/minute"))
+async def paraphrase_batch(
+    request: Request,
+    body: ParaphraseBatchRequest,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> ParaphraseBatchResponse:
+    """
+    Paraphrase a list of texts in one request.
+    Rate limited to 5 requests per minute per API key, scaled by its tier,
+    counting each batch once.
+    Requires API key authentication via X-API-Key header.
+    Items take the same options as a single `/paraphrase` request and are
+    processed concurrently at batch priority. Each item gets its own result
+    or error, with the status code it would have had on its own, and is
+    logged as one usage record.
+
+    - **items**: Up to `BATCH_MAX_ITEMS` paraphrase requests
+    """
+    current_user, api_key_id = auth_data
+    use_cache = not cache_bypass_requested(request)
+
+    async def paraphrase_item(item: ParaphraseRequest) -> dict:
+        return await paraphraser.paraphrase(
+            text=item.text,
+            style=item.style,
+            intensity=item.intensity,
+            length_option=item.length_option,
+            use_cache=use_cache,
+        )
+
+    outcomes = await run_batch(body.items, paraphrase_item, TextParaphraserException)
+    log_batch_usage(request, api_key_id, "/paraphrase/batch", outcomes)
+
+    succeeded = sum(outcome["status_code"] == 200 for outcome in outcomes)
+    return ParaphraseBatchResponse(
+        results=outcomes, succeeded=succeeded, failed=len(outcomes) - succeeded
+    )
+
+
+@paraphraser_router.post(
+    "/paraphrase/bulk",
+    status_code=200,
+    response_class=NDJSONStreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+@limiter.limit(tiered_limit("5/minute"))
+async def paraphrase_bulk(
+    request: Request,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> NDJSONStreamingResponse:
+    """
+    Paraphrase a stream of texts sent as NDJSON.
+    Rate limited to 5 requests per minute per API key, scaled by its tier,
+    counting each request once.
+    Requires API key authentication via X-API-Key header.
+    Each line of the body is a `/paraphrase` request body with an optional `id`.
+    Lines are processed concurrently at batch priority while the body is
+    still arriving, and each result is written back as an NDJSON line as
+    soon as it is ready, so results are out of order: match them by `id`
+    (the line number for lines without one). Every result line has the
+    `status_code` its item would have had on its own, with either the
+    `result` or an `error`.
+    """
+    current_user, api_key_id = auth_data
+    use_cache = not cache_bypass_requested(request)
+
+    async def paraphrase_item(item: ParaphraseRequest) -> dict:
+        return await paraphraser.paraphrase(
+            text=item.text,
+            style=item.style,
+            intensity=item.intensity,
+            length_option=item.length_option,
+            use_cache=use_cache,
+        )
+
+    return NDJSONStreamingResponse(
+        stream_bulk_results(
+            request,
+            schema=ParaphraseRequest,
+            process=paraphrase_item,
+            service_exception=TextParaphraserException,
+            api_key_id=api_key_id,
+            endpoint="/paraphrase/bulk",
+        ),
+        headers={"X-Accel-Buffering": "no"},
+    )
@@ -5,36 +5,61 @@ This module provides the API endpoints for text summarization functionality.
 """
 
 from time import time
+import asyncio
 from fastapi import APIRouter, HTTPException, Request, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
 from app.services.text_summarizer import summarizer, TextSummarizerException
-from app.schemas.text_summarizer import SummarizeRequest, SummarizeResponse
-from app.core.rate_limit import limiter
-from app.core.database import get_session
+from app.schemas.text_summarizer import (
+    SummarizeBatchRequest,
+    SummarizeBatchResponse,
+    SummarizeRequest,
+    SummarizeResponse,
+)
+from app.services.upstream_scheduler import UpstreamUnavailableException
+from app.core.rate_limit import limiter, tiered_limit
 from app.api.v1.endpoints.ai_tools.utils import (
+    NDJSONStreamingResponse,
+    cache_bypass_requested,
+    event_stream_requested,
     get_current_user_by_api_key,
     log_api_usage,
+    log_batch_usage,
+    run_batch,
+    stream_bulk_results,
+    stream_events,
+    upstream_unavailable_error,
 )
 
 summarizer_router = APIRouter()
 
 
-@summarizer_router.post("/summarize", response_model=SummarizeResponse, status_code=200)
+@summarizer_router.post(
+    "/summarize",
+    response_model=SummarizeResponse,
+    status_code=200,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
 @limiter.limit(
-    "5/minute"
+    tiered_limit("5/minute")
 )  # More conservative limit for resource-intensive summarization
 async def summarize_text(
     request: Request,
     body: SummarizeRequest,
     auth_data: tuple = Depends(get_current_user_by_api_key),
-    session: AsyncSession = Depends(get_session),
+    stream: bool = False,
 ) -> SummarizeResponse:
     """
     Summarize text using the specified mode and parameters.
-    Rate limited to 5 requests per minute per IP address.
+    Rate limited to 5 requests per minute per API key, scaled by its tier.
     Requires API key authentication via X-API-Key header.
+    Identical requests are served from the result cache; send
+    `Cache-Control: no-cache` to force a fresh result.
+    Send `stream=true` or `Accept: text/event-stream` to receive the result
+    as Server-Sent Events: `token` events with incremental text, then a
+    `done` event with the complete result (or an `error` event).
 
-    - **text**: The text to summarize
+    - **text**: The text to summarize; texts beyond the model's context are
+      summarized in chunks that are then combined
     - **mode**: Summarization mode (paragraph, bullet_points, or custom)
     - **max_length**: Optional maximum length for paragraph mode
     - **custom_instructions**: Optional custom instructions for custom mode
@@ -43,35 +68,170 @@ async def summarize_text(
     current_user, api_key_id = auth_data
     start_time = time()
     status_code = 200
+    streaming = False
 
     try:
+        if event_stream_requested(request, stream):
+            if body.extract_keywords:
+                raise TextSummarizerException(
+                    "extract_keywords is not supported in streaming mode"
+                )
+            pieces = summarizer.stream_summary(
+                text=body.text,
+                mode=body.mode,
+                max_length=body.max_length,
+                custom_instructions=body.custom_instructions,
+                use_cache=not cache_bypass_requested(request),
+            )
+            # The event stream logs its own usage once it finishes
+            streaming = True
+            return StreamingResponse(
+                stream_events(
+                    pieces,
+                    result_field="summary",
+                    service_exception=TextSummarizerException,
+                    request=request,
+                    api_key_id=api_key_id,
+                    endpoint="/summarize",
+                    start_time=start_time,
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
         result = await summarizer.summarize(
             text=body.text,
             mode=body.mode,
             max_length=body.max_length,
             custom_instructions=body.custom_instructions,
             extract_keywords=body.extract_keywords,
+            use_cache=not cache_bypass_requested(request),
         )
         response = SummarizeResponse(**result)
 
+    except UpstreamUnavailableException as e:
+        status_code = 503
+        raise upstream_unavailable_error(e)
     except TextSummarizerException as e:
         status_code = 422
         raise HTTPException(status_code=422, detail=str(e))
+    except asyncio.TimeoutError:
+        status_code = 504
+        raise HTTPException(status_code=504, detail="Request timed out")
     except Exception as e:
         status_code = 500
         raise HTTPException(status_code=500, detail="Internal server error")
     finally:
         # Log API key usage
-        response_time = time() - start_time
-        await log_api_usage(
-            api_key_id=api_key_id,
-            endpoint="/summarize",
-            method="POST",
-            status_code=status_code,
-            response_time=response_time,
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent"),
-            session=session,
-        )
+        if not streaming:
+            response_time = time() - start_time
+            log_api_usage(
+                api_key_id=api_key_id,
+                endpoint="/summarize",
+                method="POST",
+                status_code=status_code,
+                response_time=response_time,
+                ip_address=request.client.host,
+                user_agent=request.headers.get("user-agent"),
+            )
 
     return response
+
+
+@summarizer_router.post(
+    "/summarize/batch", response_model=SummarizeBatchResponse, status_code=200
+)
+@limiter.limit(tiered_limit("5/minute"))
+async def summarize_batch(
+    request: Request,
+    body: SummarizeBatchRequest,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> SummarizeBatchResponse:
+    """
+    Summarize a list of texts in one request.
+    Rate limited to 5 requests per minute per API key, scaled by its tier,
+    counting each batch once.
+    Requires API key authentication via X-API-Key header.
+    Items take the same options as a single `/summarize` request and are
+    processed concurrently at batch priority. Each item gets its own result
+    or error, with the status code it would have had on its own, and is
+    logged as one usage record.
+
+    - **items**: Up to `BATCH_MAX_ITEMS` summarize requests
+    """
+    current_user, api_key_id = auth_data
+    use_cache = not cache_bypass_requested(request)
+
+    async def summarize_item(item: SummarizeRequest) -> dict:
+        return await summarizer.summarize(
+            text=item.text,
+            mode=item.mode,
+            max_length=item.max_length,
+            custom_instructions=item.custom_instructions,
+            extract_keywords=item.extract_keywords,
+            use_cache=use_cache,
+        )
+
+    outcomes = await run_batch(body.items, summarize_item, TextSummarizerException)
+    log_batch_usage(request, api_key_id, "/summarize/batch", outcomes)
+
+    succeeded = sum(outcome["status_code"] == 200 for outcome in outcomes)
+    return SummarizeBatchResponse(
+        results=outcomes, succeeded=succeeded, failed=len(outcomes) - succeeded
+    )
+
+
+@summarizer_router.post(
+    "/summarize/bulk",
+    status_code=200,
+    response_class=NDJSONStreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+@limiter.limit(tiered_limit("5/minute"))
+async def summarize_bulk(
+    request: Request,
+    auth_data: tuple = Depends(get_current_user_by_api_key),
+) -> NDJSONStreamingResponse:
+    """
+    Summarize a stream of texts sent as NDJSON.
+    Rate limited to 5 requests per minute per API key, scaled by its tier,
+    counting each request once.
+    Requires API key authentication via X-API-Key header.
+    Each line of the body is a `/summarize` request body with an optional `id`.
+    Lines are processed concurrently at batch priority while the body is
+    still arriving, and each result is written back as an NDJSON line as
+    soon as it is ready, so results are out of order: match them by `id`
+    (the line number for lines without one). Every result line has the
+    `status_code` its item would have had on its own, with either the
+    `result` or an `error`.
+    """
+    current_user, api_key_id = auth_data
+    use_cache = not cache_bypass_requested(request)
+
+    async def summarize_item(item: SummarizeRequest) -> dict:
+        return await summarizer.summarize(
+            text=item.text,
+            mode=item.mode,
+            max_length=item.max_length,
+            custom_instructions=item.custom_instructions,
+            extract_keywords=item.extract_keywords,
+            use_cache=use_cache,
+        )
+
+    return NDJSONStreamingResponse(
+        stream_bulk_results(
+            request,
+            schema=SummarizeRequest,
+            process=summarize_item,
+            service_exception=TextSummarizerException,
+            api_key_id=api_key_id,
+            endpoint="/summarize/bulk",
+        ),
+        headers={"X-Accel-Buffering": "no"},
+    )
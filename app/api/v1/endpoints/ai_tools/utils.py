@@ -4,15 +4,45 @@ AI Tools Utilities
 Shared functionality for AI tool endpoints.
 """
 
+import asyncio
+import json
 from time import time
-from typing import Optional, Tuple
-from fastapi import HTTPException, Security, Depends
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from fastapi import HTTPException, Request, Security, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.user import User
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 from app.core.database import get_session
 from app.services.api_key_service import APIKeyService
+from app.services.user_cache import CachedUser
+from app.core.config import settings
+from app.core.rate_limit import set_rate_limit_subject
+from app.services.upstream_scheduler import (
+    Priority,
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+    priority,
+    set_client_key,
+)
+from app.services.usage_log_writer import usage_log_writer
+
+T = TypeVar("T")
 
 # API key header scheme
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=True)
@@ -21,7 +51,7 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=True)
 async def get_current_user_by_api_key(
     api_key: str = Security(api_key_header),
     session: AsyncSession = Depends(get_session),
-) -> Tuple[User, int]:
+) -> Tuple[CachedUser, int]:
     """
     Get the current user from API key authentication.
 
@@ -30,13 +60,13 @@ async def get_current_user_by_api_key(
         session: Database session
 
     Returns:
-        Tuple[User, int]: The authenticated user and API key ID
+        Tuple[CachedUser, int]: The authenticated user and API key ID
 
     Raises:
         HTTPException: If API key is invalid or missing
     """
     api_key_service = APIKeyService(session)
-    key = await api_key_service.verify_and_update_key(api_key)
+    key = await api_key_service.authenticate(api_key)
 
     if not key:
         raise HTTPException(
@@ -45,22 +75,15 @@ async def get_current_user_by_api_key(
             headers={"WWW-Authenticate": "APIKey"},
         )
 
-    # Get user
-    user_query = select(User).where(User.id == key.user_id)
-    result = await session.execute(user_query)
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid API key",
-            headers={"WWW-Authenticate": "APIKey"},
-        )
+    # Upstream calls made for this request are queued fairly per API key,
+    # and its rate limits are counted per API key
+    set_client_key(key.key_id)
+    set_rate_limit_subject(f"api_key:{key.key_id}", key.rate_limit_tier)
 
-    return user, key.id
+    return key.user, key.key_id
 
 
-async def log_api_usage(
+def log_api_usage(
     api_key_id: int,
     endpoint: str,
     method: str,
@@ -68,11 +91,13 @@ async def log_api_usage(
     response_time: float,
     ip_address: Optional[str],
     user_agent: Optional[str],
-    session: AsyncSession,
 ) -> None:
     """
     Log API key usage for analytics and rate limiting.
 
+    The record is queued for the background usage log writer, so this
+    never waits on the database.
+
     Args:
         api_key_id: The ID of the API key used
         endpoint: The endpoint path
@@ -81,10 +106,8 @@ async def log_api_usage(
         response_time: Time taken to process the request
         ip_address: Client IP address
         user_agent: Client user agent
-        session: Database session
     """
-    api_key_service = APIKeyService(session)
-    await api_key_service.log_api_key_usage(
+    usage_log_writer.submit(
         api_key_id=api_key_id,
         endpoint=endpoint,
         method=method,
@@ -93,3 +116,417 @@ async def log_api_usage(
         ip_address=ip_address,
         user_agent=user_agent,
     )
+
+
+def upstream_unavailable_error(exc: UpstreamUnavailableException) -> HTTPException:
+    """
+    Build the 503 response for an upstream call that could not be served.
+
+    Args:
+        exc: The upstream exception
+
+    Returns:
+        HTTPException: 503 error with a Retry-After header
+    """
+    return HTTPException(
+        status_code=503,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def cache_bypass_requested(request: Request) -> bool:
+    """
+    Check whether the client asked for a fresh result.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        bool: True if the Cache-Control header contains ``no-cache``
+    """
+    cache_control = request.headers.get("cache-control", "")
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    return "no-cache" in directives
+
+
+def event_stream_requested(request: Request, stream: bool = False) -> bool:
+    """
+    Check whether the client asked for a Server-Sent Events response.
+
+    Args:
+        request: The incoming request
+        stream: Value of the ``stream`` query parameter
+
+    Returns:
+        bool: True if ``stream=true`` or the Accept header names text/event-stream
+    """
+    return stream or "text/event-stream" in request.headers.get("accept", "")
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_events(
+    pieces: AsyncIterator[str],
+    result_field: str,
+    service_exception: Type[Exception],
+    request: Request,
+    api_key_id: int,
+    endpoint: str,
+    start_time: float,
+) -> AsyncIterator[str]:
+    """
+    Forward streamed text as Server-Sent Events and log usage when done.
+
+    Emits a ``token`` event per piece of text, then a ``done`` event with
+    the complete result, or an ``error`` event if generation fails. The
+    HTTP status is already sent by then, so the logged status code records
+    the actual outcome: 422/500/503/504 for failures and 499 if the client
+    went away before the stream finished.
+
+    Args:
+        pieces: Text pieces produced by the service
+        result_field: Name of the result field in the ``done`` event
+        service_exception: Exception type the service raises for
+            generation failures
+        request: The incoming request
+        api_key_id: The ID of the API key used
+        endpoint: The endpoint path
+        start_time: When the request started
+
+    Yields:
+        str: Encoded Server-Sent Events
+    """
+    status_code = 499
+    parts = []
+
+    try:
+        async for piece in pieces:
+            parts.append(piece)
+            yield sse_event("token", {"text": piece})
+        status_code = 200
+        yield sse_event("done", {result_field: "".join(parts).rstrip()})
+    except UpstreamTimeoutException:
+        status_code = 504
+        yield sse_event("error", {"detail": "Request timed out"})
+    except UpstreamUnavailableException as e:
+        status_code = 503
+        yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+    except service_exception as e:
+        status_code = 422
+        yield sse_event("error", {"detail": str(e)})
+    except Exception:
+        status_code = 500
+        yield sse_event("error", {"detail": "Internal server error"})
+    finally:
+        log_api_usage(
+            api_key_id=api_key_id,
+            endpoint=endpoint,
+            method="POST",
+            status_code=status_code,
+            response_time=time() - start_time,
+            ip_address=request.client.host,
+            user_agent=request.headers.get("user-agent"),
+        )
+
+
+async def process_item(
+    process: Callable[[T], Awaitable[dict]],
+    item: T,
+    service_exception: Type[Exception],
+) -> Dict[str, Any]:
+    """
+    Process one item of a batch or bulk request.
+
+    Args:
+        process: Coroutine function producing the item's result
+        item: The item
+        service_exception: Exception type the service raises for
+            generation failures
+
+    Returns:
+        Dict[str, Any]: The outcome, with ``status_code``, ``result`` or
+        ``error`` (plus ``retry_after`` for 503s) and ``response_time``
+    """
+    outcome: Dict[str, Any] = {"status_code": 200}
+    start_time = time()
+    try:
+        outcome["result"] = await process(item)
+    except UpstreamTimeoutException:
+        outcome.update(status_code=504, error="Request timed out")
+    except UpstreamUnavailableException as e:
+        outcome.update(status_code=503, error=str(e), retry_after=e.retry_after)
+    except service_exception as e:
+        outcome.update(status_code=422, error=str(e))
+    except Exception:
+        outcome.update(status_code=500, error="Internal server error")
+    outcome["response_time"] = time() - start_time
+    return outcome
+
+
+async def run_batch(
+    items: Sequence[T],
+    process: Callable[[T], Awaitable[dict]],
+    service_exception: Type[Exception],
+    max_concurrency: int = settings.BATCH_MAX_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Process the items of a batch request concurrently.
+
+    At most ``max_concurrency`` items are processed at once, and their
+    upstream calls are scheduled with batch priority so they yield to
+    interactive requests. A failing item does not fail the batch; its
+    outcome carries the status code its own request would have returned.
+
+    Args:
+        items: The batch items
+        process: Coroutine function producing an item's result
+        service_exception: Exception type the service raises for
+            generation failures
+        max_concurrency: Maximum number of items processed at once
+
+    Returns:
+        List[Dict[str, Any]]: One outcome per item, in order, as returned
+        by :func:`process_item` plus the item's ``index``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_item(index: int, item: T) -> Dict[str, Any]:
+        async with semaphore:
+            outcome = await process_item(process, item, service_exception)
+        return {"index": index, **outcome}
+
+    # Tasks copy the context, so every item's calls run with batch priority
+    with priority(Priority.BATCH):
+        return await asyncio.gather(
+            *(run_item(index, item) for index, item in enumerate(items))
+        )
+
+
+def log_batch_usage(
+    request: Request,
+    api_key_id: int,
+    endpoint: str,
+    outcomes: List[Dict[str, Any]],
+) -> None:
+    """
+    Log one usage record per batch item, queued in a single call.
+
+    Args:
+        request: The incoming request
+        api_key_id: The ID of the API key used
+        endpoint: The endpoint path
+        outcomes: Item outcomes returned by :func:`run_batch`
+    """
+    ip_address = request.client.host
+    user_agent = request.headers.get("user-agent")
+    usage_log_writer.submit_many(
+        [
+            {
+                "api_key_id": api_key_id,
+                "endpoint": endpoint,
+                "method": "POST",
+                "status_code": outcome["status_code"],
+                "response_time": outcome["response_time"],
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            }
+            for outcome in outcomes
+        ]
+    )
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming NDJSON response that leaves the request body to the endpoint.
+
+    ``StreamingResponse`` watches for client disconnects by reading from the
+    request, which would swallow body chunks of a request that is still
+    being read while results are streamed back.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+async def iter_ndjson_lines(
+    request: Request, max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a streamed request body into lines without buffering the body.
+
+    Args:
+        request: The incoming request
+        max_line_bytes: Maximum length of a line
+
+    Yields:
+        Tuple[int, Optional[bytes]]: The 1-based physical line number, with
+        blank lines counted, and each non-blank line, or None for a line
+        that was too long and has been skipped
+    """
+    buffer = bytearray()
+    oversized = False
+    line_number = 1
+
+    async for chunk in request.stream():
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not oversized:
+                buffer += chunk[start:] if end == -1 else chunk[start:end]
+                oversized = len(buffer) > max_line_bytes
+                if oversized:
+                    buffer.clear()
+            if end == -1:
+                break
+
+            if oversized:
+                yield line_number, None
+            elif buffer.strip():
+                yield line_number, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            line_number += 1
+            start = end + 1
+
+    if oversized:
+        yield line_number, None
+    elif buffer.strip():
+        yield line_number, bytes(buffer)
+
+
+def parse_ndjson_item(
+    line: Optional[bytes], line_number: int, schema: Type[BaseModel]
+) -> Tuple[Any, Optional[BaseModel], Optional[Dict[str, Any]]]:
+    """
+    Parse one line of a bulk request.
+
+    Args:
+        line: The line, or None if it was too long
+        line_number: 1-based number of the line, the default item ID
+        schema: Request model the line must match, besides its ``id``
+
+    Returns:
+        Tuple: The client's item ID, then either the parsed item or the
+        error outcome for the line
+    """
+    if line is None:
+        return line_number, None, {"status_code": 413, "error": "Line too long"}
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return line_number, None, {"status_code": 422, "error": "Invalid JSON"}
+    if not isinstance(data, dict):
+        return line_number, None, {"status_code": 422, "error": "Expected an object"}
+
+    client_id = data.pop("id", line_number)
+    try:
+        return client_id, schema.model_validate(data), None
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            for error in e.errors()
+        )
+        return client_id, None, {"status_code": 422, "error": errors}
+
+
+async def stream_bulk_results(
+    request: Request,
+    schema: Type[BaseModel],
+    process: Callable[[Any], Awaitable[dict]],
+    service_exception: Type[Exception],
+    api_key_id: int,
+    endpoint: str,
+    max_concurrency: int = settings.BATCH_MAX_CONCURRENCY,
+    max_line_bytes: int = settings.BULK_MAX_LINE_BYTES,
+) -> AsyncIterator[str]:
+    """
+    Process an NDJSON request body and stream NDJSON results back.
+
+    Lines are read as the body arrives and processed concurrently at batch
+    priority. Each result line is written as soon as its item finishes, so
+    results arrive out of order and carry the item's ``id`` (the line
+    number if the item has none). At most ``max_concurrency`` items are in
+    progress and as many results are waiting to be sent; beyond that the
+    body is not read further, so neither side is buffered in memory.
+    Usage is logged per item, in bulk.
+
+    Args:
+        request: The incoming request
+        schema: Request model each line must match, besides its ``id``
+        process: Coroutine function producing an item's result
+        service_exception: Exception type the service raises for
+            generation failures
+        api_key_id: The ID of the API key used
+        endpoint: The endpoint path
+        max_concurrency: Maximum number of items processed at once
+        max_line_bytes: Maximum length of a line
+
+    Yields:
+        str: NDJSON result lines, each an outcome as returned by
+        :func:`process_item` (without ``response_time``) plus ``id``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+    tasks: Set[asyncio.Task] = set()
+
+    async def run_item(client_id: Any, item: BaseModel) -> None:
+        # The slot is held until the result is queued, so a slow reader
+        # stops new items from starting
+        try:
+            outcome = await process_item(process, item, service_exception)
+            await results.put({"id": client_id, **outcome})
+        finally:
+            semaphore.release()
+
+    async def read_body() -> None:
+        try:
+            async for line_number, line in iter_ndjson_lines(request, max_line_bytes):
+                client_id, item, error = parse_ndjson_item(line, line_number, schema)
+                if error is not None:
+                    await results.put({"id": client_id, "response_time": 0.0, **error})
+                    continue
+                await semaphore.acquire()
+                task = asyncio.create_task(run_item(client_id, item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except Exception:
+            await results.put(None)
+            raise
+        # Signals the end of the results
+        await results.put(None)
+
+    pending_usage: List[Dict[str, Any]] = []
+    # Tasks copy the context, so every item's calls run with batch priority
+    with priority(Priority.BATCH):
+        reader = asyncio.create_task(read_body())
+
+    try:
+        while (outcome := await results.get()) is not None:
+            pending_usage.append(outcome)
+            if len(pending_usage) >= settings.USAGE_LOG_BATCH_SIZE:
+                log_batch_usage(request, api_key_id, endpoint, pending_usage)
+                pending_usage = []
+            line = {k: v for k, v in outcome.items() if k != "response_time"}
+            yield json.dumps(line) + "\n"
+
+        try:
+            await reader
+        except ClientDisconnect:
+            # Nobody is left to tell
+            return
+    finally:
+        reader.cancel()
+        for task in list(tasks):
+            task.cancel()
+        if pending_usage:
+            log_batch_usage(request, api_key_id, endpoint, pending_usage)
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
@@ -8,9 +9,10 @@ from app.schemas.api_key import (
     APIKeyResponse,
     APIKeyList,
     APIKeyUsageStats,
+    UsageWindow,
 )
 from app.api.deps import get_current_user
-from app.models import User
+from app.services.user_cache import CachedUser
 from app.core.rate_limit import limiter
 
 router = APIRouter()
@@ -21,7 +23,7 @@ router = APIRouter()
 async def create_api_key(
     request: Request,
     key_create: APIKeyCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Create a new API key for the current user."""
@@ -46,7 +48,7 @@ async def create_api_key(
 @limiter.limit("10/minute")
 async def list_api_keys(
     request: Request,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """List all API keys for the current user."""
@@ -74,7 +76,8 @@ async def list_api_keys(
 async def get_api_key_usage(
     request: Request,
     key_id: int,
-    current_user: User = Depends(get_current_user),
+    window: Optional[UsageWindow] = None,
+    current_user: CachedUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """
@@ -82,6 +85,7 @@ async def get_api_key_usage(
 
     Args:
         key_id: The ID of the API key to get usage for
+        window: Optional time window for latency percentiles (1h, 24h, 7d, 30d)
         current_user: The authenticated user
         session: Database session
 
@@ -92,7 +96,9 @@ async def get_api_key_usage(
         HTTPException: If the API key doesn't exist or doesn't belong to the user
     """
     api_key_service = APIKeyService(session)
-    stats = await api_key_service.get_key_usage_stats(key_id, current_user.id)
+    stats = await api_key_service.get_key_usage_stats(
+        key_id, current_user.id, window=window
+    )
 
     if not stats:
         raise HTTPException(status_code=404, detail="API key not found")
@@ -105,7 +111,7 @@ async def get_api_key_usage(
 async def revoke_api_key(
     request: Request,
     key_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Revoke an API key."""
@@ -3,13 +3,14 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.auth import (
-    verify_password,
-    get_password_hash,
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 from app.core.database import get_session
+from app.services.user_cache import user_token_claims
 from app.models.user import User
 from app.schemas.auth import Token, UserCreate, UserResponse, LoginRequest
 from app.core.rate_limit import limiter
@@ -45,7 +46,9 @@ async def login(
     result = await session.execute(query)
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(
+        login_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -60,7 +63,7 @@ async def login(
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data=user_token_claims(user), expires_delta=access_token_expires
     )
 
     return Token(access_token=access_token, token_type="bearer")
@@ -101,7 +104,7 @@ async def register(
     user = User(
         email=user_in.email,
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
     )
     session.add(user)
     await session.commit()
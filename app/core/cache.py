@@ -0,0 +1,94 @@
+"""
+In-Process Cache Module
+
+This module provides a small TTL + LRU cache used to keep hot lookups
+(such as resolved API keys) in memory between requests.
+"""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Size-bounded cache whose entries expire after a time-to-live.
+
+    Entries are evicted in least-recently-used order once ``maxsize`` is
+    reached. The cache is not thread-safe; it is meant to be used from a
+    single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get a value from the cache.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[V]: The cached value, or None if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: The cache key
+            value: The value to store
+            ttl: Optional time-to-live in seconds overriding the default
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        """
+        Remove a value from the cache.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[V]: The removed value, if it was present
+        """
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -6,7 +6,7 @@ loading them from environment variables and providing type-safe access
 through Pydantic settings management.
 """
 
-from typing import Optional
+from typing import Any, Dict, Optional
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from pydantic import validator
@@ -28,11 +28,16 @@ class Settings(BaseSettings):
 
     # Security settings
     SECRET_KEY: str
+    # Maximum concurrent bcrypt hash/verify operations (worker threads)
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+    # Maximum decoded JWTs kept in memory until they expire
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
 
     # Groq API Settings
     GROK_API_KEY: str
     OPENAI_BASE_URL: str = "https://api.groq.com/openai/v1"
     OPENAI_MODEL_NAME: str = "deepseek-r1-distill-llama-70b"
+    IMAGE_MODEL_NAME: str = "meta-llama/llama-4-scout-17b-16e-instruct"
 
     # PostgreSQL Database Settings
     POSTGRES_USER: str
@@ -42,6 +47,142 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_URL: Optional[str] = None
 
+    # API Key Cache Settings
+    API_KEY_CACHE_TTL_SECONDS: int = 60
+    API_KEY_CACHE_MAX_SIZE: int = 10_000
+    # Maximum staleness of api_keys.last_used_at before a batched flush
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 30
+
+    # User Cache Settings
+    # Resolve JWT users from token claims and the user cache instead of a
+    # database lookup per request
+    JWT_STATELESS_AUTH: bool = False
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Rate Limit Settings
+    # Where counters live: "memory://" (per process), "postgresql://" (the app
+    # database), a full postgresql:// URI, or any URI supported by the limits
+    # package such as "redis://localhost:6379" (needs `uv pip install coredis`)
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_STORAGE_POOL_SIZE: int = 4
+    # A check taking longer fails over to per-process counters
+    RATE_LIMIT_STORAGE_TIMEOUT_SECONDS: float = 0.5
+    # How long to use per-process counters before trying the storage again
+    RATE_LIMIT_STORAGE_RETRY_SECONDS: float = 30.0
+    RATE_LIMIT_STORAGE_CLEANUP_SECONDS: float = 60.0
+    # Factors applied to the AI tool endpoints' limits for each API key tier
+    # (APIKey.rate_limit_tier); unknown tiers get the default tier's factor
+    RATE_LIMIT_TIERS: Dict[str, float] = {
+        "standard": 1.0,
+        "pro": 5.0,
+        "enterprise": 20.0,
+    }
+    RATE_LIMIT_DEFAULT_TIER: str = "standard"
+
+    # Usage Log Writer Settings
+    USAGE_LOG_QUEUE_SIZE: int = 10_000
+    USAGE_LOG_BATCH_SIZE: int = 500
+    USAGE_LOG_FLUSH_SECONDS: float = 1.0
+    USAGE_LOG_DROP_POLICY: str = "drop_newest"  # Alternative: "drop_oldest"
+
+    # Usage Partition Settings
+    USAGE_RETENTION_MONTHS: int = 12
+    # Hourly latency histograms back the windows of up to a week; daily
+    # ones are kept like the daily rollups
+    USAGE_HOURLY_HISTOGRAM_RETENTION_DAYS: int = 8
+    USAGE_PARTITIONS_AHEAD: int = 2
+    USAGE_PARTITION_MAINTENANCE_SECONDS: int = 6 * 60 * 60
+
+    # Result Cache Settings
+    RESULT_CACHE_BACKEND: str = "memory"  # Alternatives: "sqlite", "none"
+    RESULT_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    RESULT_CACHE_MAX_ENTRIES: int = 10_000
+    RESULT_CACHE_SQLITE_PATH: str = "cache/results.sqlite3"
+
+    # Long Document Summarization Settings
+    # Texts above this estimated token count are summarized chunk by chunk
+    SUMMARY_CHUNK_TOKENS: int = 6_000
+    SUMMARY_MAX_PARALLEL_CHUNKS: int = 4
+    # Rounds of re-summarizing partial summaries that still exceed the budget
+    SUMMARY_MAX_REDUCE_ROUNDS: int = 3
+    SUMMARY_MAX_INPUT_CHARS: int = 500_000
+
+    # Batch Endpoint Settings
+    BATCH_MAX_ITEMS: int = 100
+    # Items of one batch processed at the same time
+    BATCH_MAX_CONCURRENCY: int = 8
+    # Longest line accepted by the NDJSON bulk endpoints
+    BULK_MAX_LINE_BYTES: int = 4 * 1024 * 1024
+
+    # Job Queue Settings
+    JOB_WORKERS: int = 4
+    # How often idle workers look for jobs submitted to other instances
+    JOB_POLL_SECONDS: float = 2.0
+    # A job whose worker stops renewing its lease is picked up again
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RESULT_TTL_SECONDS: int = 24 * 60 * 60
+    JOB_CLEANUP_SECONDS: float = 5 * 60
+    # Webhook callbacks are only accepted when a signing secret is set
+    JOB_WEBHOOK_SECRET: Optional[str] = None
+    JOB_WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    JOB_WEBHOOK_MAX_ATTEMPTS: int = 3
+
+    # Upstream Scheduler Settings
+    UPSTREAM_MAX_CONCURRENCY: int = 16
+    UPSTREAM_MAX_CONCURRENCY_PER_MODEL: int = 8
+    # Per-model overrides as JSON, e.g. {"deepseek-r1-distill-llama-70b": 4}
+    UPSTREAM_MODEL_CONCURRENCY: Dict[str, int] = {}
+    UPSTREAM_QUEUE_TIMEOUT_SECONDS: float = 20.0
+    UPSTREAM_BATCH_QUEUE_TIMEOUT_SECONDS: float = 300.0
+
+    # LLM Call Settings
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    # Maximum gap between bytes of a response (or stream chunks)
+    LLM_READ_TIMEOUT_SECONDS: float = 60.0
+    # Overall deadline for a call including queueing and retries
+    LLM_TOTAL_TIMEOUT_SECONDS: float = 120.0
+    # Per-service overrides as JSON, e.g. {"image_to_text": {"read": 30, "total": 45}}
+    LLM_SERVICE_TIMEOUTS: Dict[str, Dict[str, float]] = {}
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_HEDGING_ENABLED: bool = False
+    # Calls observed per model before hedging starts
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+
+    # Circuit Breaker Settings
+    CIRCUIT_WINDOW_SECONDS: float = 60.0
+    CIRCUIT_MIN_CALLS: int = 10
+    CIRCUIT_ERROR_RATE: float = 0.5
+    CIRCUIT_SLOW_CALL_SECONDS: float = 30.0
+    CIRCUIT_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_PROBES: int = 2
+
+    # Model Router Settings
+    # Backends per task as JSON; tasks not listed use OPENAI_BASE_URL with
+    # OPENAI_MODEL_NAME (IMAGE_MODEL_NAME for image_to_text), e.g.
+    # {"summarize": {"policy": "latency", "backends": [
+    #     {"name": "groq", "base_url": "https://api.groq.com/openai/v1",
+    #      "model": "deepseek-r1-distill-llama-70b"},
+    #     {"name": "local", "base_url": "http://localhost:11434/v1",
+    #      "model": "llama3.1", "api_key": "local"}]}}
+    LLM_BACKENDS: Dict[str, Dict[str, Any]] = {}
+    # Weight of the newest call in the rolling latency and error rates
+    LLM_ROUTER_EWMA_ALPHA: float = 0.2
+    # Share of latency-routed calls sent to a random backend to keep
+    # the other backends' figures current
+    LLM_ROUTER_EXPLORE_RATE: float = 0.05
+
+    # HTTP Client Settings
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    # Used only when the optional h2 package is installed
+    HTTP2_ENABLED: bool = True
+
     # FastAPI Settings
     HOST: str
     PORT: int
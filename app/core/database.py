@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, List
 import asyncpg
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -48,6 +48,24 @@ engine = create_async_engine(
 # Create async session factory
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Callbacks run by close_db before the engine is disposed
+_close_hooks: List[Callable[[], Awaitable[None]]] = []
+
+
+def register_close_hook(hook: Callable[[], Awaitable[None]]) -> None:
+    """
+    Register a coroutine function to run before database connections close.
+
+    Hooks run in reverse registration order, so a background service
+    started after another is stopped before it and can still hand it
+    buffered writes. They are used to flush those writes on shutdown.
+
+    Args:
+        hook: Coroutine function taking no arguments
+    """
+    if hook not in _close_hooks:
+        _close_hooks.append(hook)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions."""
@@ -75,5 +93,11 @@ async def init_db():
 
 
 async def close_db():
-    """Close database connections."""
+    """Flush pending writes and close database connections."""
+    for hook in reversed(_close_hooks):
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(f"Error running database close hook: {str(e)}")
+
     await engine.dispose()
@@ -0,0 +1,72 @@
+"""
+Shared HTTP Client Module
+
+This module owns the pooled ``httpx.AsyncClient`` used for all outbound
+API calls, so connections and TLS sessions are reused across services
+instead of each service keeping its own pool.
+"""
+
+from typing import Optional
+import httpx
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and the optional ``h2`` package is installed."""
+    if not settings.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _create_client() -> httpx.AsyncClient:
+    http2 = http2_available()
+    logger.info(f"Creating shared HTTP client (HTTP/2: {http2})")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.LLM_READ_TIMEOUT_SECONDS,
+            connect=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+        ),
+        follow_redirects=True,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it if needed.
+
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def init_http_client() -> None:
+    """Create the shared HTTP client on startup."""
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
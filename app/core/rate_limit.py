@@ -1,27 +1,263 @@
 """
 Rate Limiting Configuration Module
 
-This module provides rate limiting configuration for the FastAPI application
-using slowapi for controlling request rates per client IP.
+This module provides rate limiting for the FastAPI application, checked
+with the async API of the ``limits`` package so a shared storage never
+blocks the event loop. Authenticated requests are limited per API key or
+user, and anonymous ones per client IP.
+
+Counters are kept in the storage named by RATE_LIMIT_STORAGE_URI. With a
+shared storage (PostgreSQL or Redis) every worker and node counts against
+the same limits; if the storage is unreachable, checks fall back to
+per-process counters until it recovers.
 """
 
-from slowapi import Limiter
+import asyncio
+import functools
+import inspect
+import math
+from contextvars import ContextVar
+from functools import lru_cache
+from time import monotonic, time
+from typing import Any, Callable, List, Optional, Tuple, Union
+from fastapi import HTTPException, Request
+from limits import RateLimitItem, parse_many
+from limits.aio.storage import MemoryStorage
+from limits.aio.strategies import FixedWindowRateLimiter
+from limits.storage import storage_from_string
 from slowapi.util import get_remote_address
-from typing import Any
+from app.core.config import settings
+from app.core.database import register_close_hook
+from app.core.logging_config import get_logger
+from app.core.rate_limit_storage import close_rate_limit_storage
+
+logger = get_logger(__name__)
+
+# The rate limit key and tier of the current request, set by the auth
+# dependencies; they run in the same context as the limit check
+_rate_limit_subject: ContextVar[Optional[Tuple[str, str]]] = ContextVar(
+    "rate_limit_subject", default=None
+)
+
+
+class RateLimitExceeded(HTTPException):
+    """A request went over one of its route's rate limits"""
+
+    def __init__(self, limit: RateLimitItem, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail=str(limit),
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def set_rate_limit_subject(key: str, tier: Optional[str] = None) -> None:
+    """
+    Set who the current request's rate limits are counted against.
+
+    Args:
+        key: Identifies the caller, e.g. ``api_key:42`` or ``user:7``
+        tier: The caller's rate limit tier; defaults to RATE_LIMIT_DEFAULT_TIER
+    """
+    _rate_limit_subject.set((key, tier or settings.RATE_LIMIT_DEFAULT_TIER))
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Get the rate limit key of a request.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        str: The authenticated API key or user, or else the client IP
+    """
+    subject = _rate_limit_subject.get()
+    return subject[0] if subject else get_remote_address(request)
+
+
+@lru_cache(maxsize=256)
+def _scale_limit(base: str, tier: str) -> str:
+    multiplier = settings.RATE_LIMIT_TIERS.get(
+        tier, settings.RATE_LIMIT_TIERS.get(settings.RATE_LIMIT_DEFAULT_TIER, 1.0)
+    )
+    return ";".join(
+        f"{max(1, math.ceil(item.amount * multiplier))} per "
+        f"{item.multiples} {item.GRANULARITY.name}"
+        for item in parse_many(base)
+    )
+
+
+def tiered_limit(base: str) -> Callable[[], str]:
+    """
+    Build a limit that scales with the caller's rate limit tier.
+
+    Args:
+        base: The limit for the default tier, e.g. ``"5/minute"``
+
+    Returns:
+        Callable[[], str]: Limit provider for ``limiter.limit``, multiplying
+        the base limit by the tier's factor from RATE_LIMIT_TIERS
+    """
+
+    def provider() -> str:
+        subject = _rate_limit_subject.get()
+        tier = subject[1] if subject else settings.RATE_LIMIT_DEFAULT_TIER
+        return _scale_limit(base, tier)
+
+    return provider
+
+
+@lru_cache(maxsize=256)
+def _parse_limits(value: str) -> List[RateLimitItem]:
+    return parse_many(value)
+
+
+class RateLimiter:
+    """
+    Fixed-window rate limits for individual routes.
+
+    Limits are counted in the storage named by ``storage_uri``. A check
+    that fails or takes longer than RATE_LIMIT_STORAGE_TIMEOUT_SECONDS is
+    counted in per-process memory instead, and the storage is tried again
+    after RATE_LIMIT_STORAGE_RETRY_SECONDS.
+    """
+
+    def __init__(self, key_func: Callable[[Request], str], storage_uri: str):
+        self.key_func = key_func
+        if not storage_uri.startswith("async+"):
+            storage_uri = f"async+{storage_uri}"
+        self.storage = storage_from_string(storage_uri)
+        self._strategy = FixedWindowRateLimiter(self.storage)
+        self._fallback = FixedWindowRateLimiter(MemoryStorage())
+        self._storage_failed_at: Optional[float] = None
+
+    async def hit(self, item: RateLimitItem, *identifiers: str) -> bool:
+        """
+        Count a request against a limit.
+
+        Args:
+            item: The limit
+            *identifiers: The rate limit key and scope
+
+        Returns:
+            bool: Whether the request is within the limit
+        """
+        allowed, _ = await self._hit(item, *identifiers)
+        return allowed
+
+    async def _hit(
+        self, item: RateLimitItem, *identifiers: str
+    ) -> Tuple[bool, FixedWindowRateLimiter]:
+        """Count a request, returning the strategy that counted it."""
+        failed_at = self._storage_failed_at
+        if (
+            failed_at is None
+            or monotonic() - failed_at >= settings.RATE_LIMIT_STORAGE_RETRY_SECONDS
+        ):
+            try:
+                allowed = await asyncio.wait_for(
+                    self._strategy.hit(item, *identifiers),
+                    settings.RATE_LIMIT_STORAGE_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                if failed_at is None:
+                    logger.warning(
+                        "Rate limit storage unreachable, falling back to "
+                        f"in-memory counters: {str(e) or type(e).__name__}"
+                    )
+                self._storage_failed_at = monotonic()
+            else:
+                if failed_at is not None:
+                    logger.info("Rate limit storage recovered")
+                    self._storage_failed_at = None
+                return allowed, self._strategy
+        return await self._fallback.hit(item, *identifiers), self._fallback
+
+    async def _retry_after(
+        self,
+        strategy: FixedWindowRateLimiter,
+        item: RateLimitItem,
+        *identifiers: str,
+    ) -> int:
+        """Seconds until the current window of a limit resets."""
+        try:
+            stats = await asyncio.wait_for(
+                strategy.get_window_stats(item, *identifiers),
+                settings.RATE_LIMIT_STORAGE_TIMEOUT_SECONDS,
+            )
+        except Exception:
+            return item.get_expiry()
+        return max(1, math.ceil(stats.reset_time - time()))
+
+    async def check(
+        self, request: Request, scope: str, limit_value: Union[str, Callable[[], str]]
+    ) -> None:
+        """
+        Count a request against a route's limits.
+
+        Args:
+            request: The incoming request
+            scope: Identifies the route
+            limit_value: The limits, or a callable returning them
+
+        Raises:
+            RateLimitExceeded: If any of the limits is exceeded
+        """
+        value = limit_value() if callable(limit_value) else limit_value
+        key = self.key_func(request)
+        for item in _parse_limits(value):
+            allowed, strategy = await self._hit(item, key, scope)
+            if not allowed:
+                retry_after = await self._retry_after(strategy, item, key, scope)
+                raise RateLimitExceeded(item, retry_after)
+
+    def limit(self, limit_value: Union[str, Callable[[], str]]) -> Callable:
+        """
+        Rate limit an async route.
+
+        The route must take a ``request`` parameter. Limits are checked
+        after its dependencies have resolved, so they can see who is calling.
+
+        Args:
+            limit_value: Limits such as ``"5/minute"``, or a callable
+                returning them for the current request
+
+        Returns:
+            Callable: The route decorator
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if "request" not in inspect.signature(func).parameters:
+                raise TypeError(f'No "request" argument on route "{func.__name__}"')
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                await self.check(kwargs["request"], scope, limit_value)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
 
 # Create a limiter instance with default configuration
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["60/minute"],
-    strategy="fixed-window",  # Alternative: "moving-window"
+limiter = RateLimiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
 )
 
+register_close_hook(close_rate_limit_storage)
+
 
 def get_limiter() -> Any:
     """
     Get the configured rate limiter instance.
 
     Returns:
-        Limiter: The configured rate limiter instance
+        RateLimiter: The configured rate limiter instance
     """
     return limiter
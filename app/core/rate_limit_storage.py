@@ -0,0 +1,160 @@
+"""
+Rate Limit Storage Module
+
+This module provides an async PostgreSQL storage backend for the ``limits``
+package so rate limit counters are shared by every worker and node instead
+of being kept per process.
+
+Importing the module registers the backend for ``async+postgresql://`` and
+``async+postgres://`` storage URIs. A URI without a host
+(``async+postgresql://``) uses the application database.
+"""
+
+import asyncio
+from time import time
+from typing import Any, List, Optional
+from urllib.parse import urlparse
+
+import asyncpg
+from limits.aio.storage import Storage
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Incrementing and starting a new window happen in one statement, so every
+# check is a single atomic round trip. Timestamps are naive UTC like the
+# rest of the schema.
+INCR_SQL = """
+INSERT INTO rate_limit_counters AS c (key, count, expires_at)
+VALUES ($1, $2, timezone('utc', now()) + make_interval(secs => $3::float8))
+ON CONFLICT (key) DO UPDATE SET
+    count = CASE WHEN c.expires_at <= timezone('utc', now())
+        THEN EXCLUDED.count ELSE c.count + EXCLUDED.count END,
+    expires_at = CASE WHEN c.expires_at <= timezone('utc', now())
+        THEN EXCLUDED.expires_at ELSE c.expires_at END
+RETURNING count
+"""
+
+GET_SQL = """
+SELECT count FROM rate_limit_counters
+WHERE key = $1 AND expires_at > timezone('utc', now())
+"""
+
+GET_EXPIRY_SQL = """
+SELECT EXTRACT(EPOCH FROM expires_at) FROM rate_limit_counters
+WHERE key = $1 AND expires_at > timezone('utc', now())
+"""
+
+CLEANUP_SQL = """
+DELETE FROM rate_limit_counters WHERE expires_at <= timezone('utc', now())
+"""
+
+# Storages created by the limiter, closed on shutdown
+_storages: List["PostgresStorage"] = []
+
+
+class PostgresStorage(Storage):
+    """
+    Fixed-window rate limit counters in the ``rate_limit_counters`` table.
+
+    Queries run on an asyncpg pool on the application's event loop, so a
+    check never blocks it. The pool is opened lazily on the first check.
+    """
+
+    STORAGE_SCHEME = ["async+postgresql", "async+postgres"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options: Any):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.uri = uri.split("+", 1)[1]
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+        _storages.append(self)
+
+    @property
+    def base_exceptions(self) -> tuple:
+        return (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, TimeoutError)
+
+    async def _create_pool(self) -> asyncpg.Pool:
+        if urlparse(self.uri).netloc:
+            return await asyncpg.create_pool(
+                self.uri.replace("postgres://", "postgresql://", 1),
+                min_size=1,
+                max_size=settings.RATE_LIMIT_STORAGE_POOL_SIZE,
+            )
+        return await asyncpg.create_pool(
+            user=settings.POSTGRES_USER,
+            password=settings.POSTGRES_PASSWORD,
+            host=settings.POSTGRES_HOST,
+            port=int(settings.POSTGRES_PORT),
+            database=settings.POSTGRES_DB,
+            min_size=1,
+            max_size=settings.RATE_LIMIT_STORAGE_POOL_SIZE,
+        )
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is not None:
+            return self._pool
+
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            # Another check may have created the pool while this one waited
+            if self._pool is None:
+                self._pool = await self._create_pool()
+                self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        return self._pool
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RATE_LIMIT_STORAGE_CLEANUP_SECONDS)
+            try:
+                await self._pool.execute(CLEANUP_SQL)
+            except Exception as e:
+                logger.error(f"Error deleting expired rate limit counters: {str(e)}")
+
+    async def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        pool = await self._get_pool()
+        return await pool.fetchval(INCR_SQL, key, amount, float(expiry))
+
+    async def get(self, key: str) -> int:
+        pool = await self._get_pool()
+        return await pool.fetchval(GET_SQL, key) or 0
+
+    async def get_expiry(self, key: str) -> float:
+        pool = await self._get_pool()
+        expiry = await pool.fetchval(GET_EXPIRY_SQL, key)
+        return float(expiry) if expiry is not None else time()
+
+    async def check(self) -> bool:
+        try:
+            pool = await self._get_pool()
+            return await pool.fetchval("SELECT 1") == 1
+        except Exception:
+            return False
+
+    async def reset(self) -> Optional[int]:
+        pool = await self._get_pool()
+        status = await pool.execute("DELETE FROM rate_limit_counters")
+        return int(status.split()[-1])
+
+    async def clear(self, key: str) -> None:
+        pool = await self._get_pool()
+        await pool.execute("DELETE FROM rate_limit_counters WHERE key = $1", key)
+
+    async def close(self) -> None:
+        """Stop the cleanup task and close the connection pool."""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+
+async def close_rate_limit_storage() -> None:
+    """Close the connections of every PostgreSQL rate limit storage."""
+    for storage in _storages:
+        await storage.close()
@@ -1,14 +1,37 @@
+import asyncio
 import secrets
 import hashlib
-from typing import Tuple, Any, Union
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import Any, Union
 from datetime import datetime, timedelta
 import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+# Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow (~250ms per call) but releases the GIL, so it
+# runs on a small dedicated pool instead of the event loop. The pool size caps
+# how many hashes run at once; further calls queue for a free worker.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    thread_name_prefix="password-hash",
+)
+
+# JWT token settings
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Decoded tokens keyed by the SHA-256 digest of the token, kept until they
+# expire. Only valid tokens are cached.
+token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -20,6 +43,20 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
 def create_access_token(
     data: dict[str, Any], expires_delta: Union[timedelta, None] = None
 ) -> str:
@@ -28,20 +65,46 @@ def create_access_token(
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str) -> Union[dict[str, Any], None]:
-    """Verify JWT token."""
+    """
+    Verify JWT token.
+
+    Clients send the same bearer token on every request, so decoded tokens
+    are cached until their ``exp``; a cache hit skips the signature check.
+
+    Args:
+        token: The encoded JWT
+
+    Returns:
+        Union[dict[str, Any], None]: A copy of the token's claims, or None if
+        the token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        # Entries are evicted at exp, but expiry is checked against the wall
+        # clock in case it moved since the entry was cached
+        if payload["exp"] > time():
+            return dict(payload)
+        token_cache.pop(digest)
+        return None
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
         return None
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(digest, payload, ttl=exp - time())
+    return dict(payload)
+
 
 def generate_api_key() -> str:
     """Generate a new API key."""
@@ -0,0 +1,73 @@
+"""
+Single-Flight Module
+
+This module coalesces concurrent identical async calls so that only one
+of them runs and every caller receives its result.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The first caller for a key starts the call; callers arriving while it
+    is in flight await the same task. A caller that is cancelled does not
+    cancel the shared call, so the other callers still get the result.
+    Exceptions are propagated to every caller. Like ``TTLCache``, it is
+    meant to be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Counters describing how many calls were shared."""
+        return {
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key: Identifies identical calls
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
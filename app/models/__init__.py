@@ -2,6 +2,13 @@ from .base import TimestampModel
 from .user import User
 from .api_key import APIKey, KeyStatus
 from .api_key_usage import APIKeyUsage
+from .api_key_usage_rollup import (
+    APIKeyUsageRollup,
+    APIKeyLatencyHistogram,
+    RollupGranularity,
+)
+from .job import Job, JobKind, JobStatus
+from .rate_limit_counter import RateLimitCounter
 
 __all__ = [
     "TimestampModel",
@@ -9,4 +16,11 @@ __all__ = [
     "APIKey",
     "KeyStatus",
     "APIKeyUsage",
+    "APIKeyUsageRollup",
+    "APIKeyLatencyHistogram",
+    "RollupGranularity",
+    "Job",
+    "JobKind",
+    "JobStatus",
+    "RateLimitCounter",
 ]
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from enum import Enum
 from .base import TimestampModel
@@ -13,12 +14,27 @@ class KeyStatus(str, Enum):
 
 class APIKey(TimestampModel, table=True):
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # Key verification only ever looks up active keys by prefix.
+        # Enum columns store member names, hence 'ACTIVE'.
+        Index(
+            "ix_api_keys_key_prefix_active",
+            "key_prefix",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    key_prefix: str = Field(index=True)  # First few chars of the key for reference
-    key_hash: str  # Hashed API key
+    # First few chars of the key for reference; looked up through the partial
+    # index above, as only active keys are ever verified
+    key_prefix: str
+    key_hash: str = Field(unique=True, index=True)  # Hashed API key
     name: str  # User-provided name for the key
     status: KeyStatus = Field(default=KeyStatus.ACTIVE)
+    # Plan tier scaling the key's rate limits, see settings.RATE_LIMIT_TIERS
+    rate_limit_tier: str = Field(
+        default="standard", sa_column_kwargs={"server_default": "standard"}
+    )
     expires_at: Optional[datetime] = Field(default=None)
     last_used_at: Optional[datetime] = Field(default=None)
     revoked_at: Optional[datetime] = Field(default=None)
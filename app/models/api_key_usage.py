@@ -1,12 +1,28 @@
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship
 from .base import TimestampModel
 
 
 class APIKeyUsage(TimestampModel, table=True):
     __tablename__ = "api_key_usage"
+    __table_args__ = (
+        # Usage stats filter by key and read the newest entries first
+        Index(
+            "ix_api_key_usage_api_key_id_created_at",
+            "api_key_id",
+            text("created_at DESC"),
+        ),
+        # Monthly partitions are managed by app.services.usage_partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    # The partition key has to be part of the primary key
+    id: Optional[int] = Field(
+        default=None, primary_key=True, sa_column_kwargs={"autoincrement": True}
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
     endpoint: str = Field(index=True)  # The endpoint that was accessed
     method: str  # HTTP method used
     status_code: int  # Response status code
@@ -0,0 +1,48 @@
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel, Field
+
+
+class RollupGranularity(str, Enum):
+    # Usage rollups are kept per day only; HOUR is used by the latency
+    # histograms. The database enum type still has a MINUTE value, which
+    # nothing writes.
+    HOUR = "hour"
+    DAY = "day"
+
+
+class APIKeyUsageRollup(SQLModel, table=True):
+    """Pre-aggregated API key usage per endpoint and time bucket."""
+
+    __tablename__ = "api_key_usage_rollups"
+
+    # Primary key ordered so per-key, per-granularity range scans use it
+    api_key_id: int = Field(foreign_key="api_keys.id", primary_key=True)
+    granularity: RollupGranularity = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    endpoint: str = Field(primary_key=True)
+
+    request_count: int = Field(default=0)
+    error_count: int = Field(default=0)  # Responses with status code >= 400
+    response_time_sum: float = Field(default=0.0)  # Seconds
+    response_time_min: float
+    response_time_max: float
+
+
+class APIKeyLatencyHistogram(SQLModel, table=True):
+    """
+    Log-scale response time histogram per endpoint and time bucket.
+
+    Counts from any set of buckets can be summed per bin to get a merged
+    histogram from which latency percentiles are estimated.
+    """
+
+    __tablename__ = "api_key_latency_histograms"
+
+    api_key_id: int = Field(foreign_key="api_keys.id", primary_key=True)
+    granularity: RollupGranularity = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    endpoint: str = Field(primary_key=True)
+    bin: int = Field(primary_key=True)  # See app.services.usage_rollups.latency_bin
+
+    count: int = Field(default=0)
@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field
+from .base import TimestampModel
+
+
+class JobKind(str, Enum):
+    SUMMARIZE = "summarize"
+    PARAPHRASE = "paraphrase"
+    IMAGE_TO_TEXT = "image_to_text"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(TimestampModel, table=True):
+    """An AI tool request processed in the background by app.services.jobs."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest runnable jobs; finished jobs are never scanned.
+        # Enum columns store member names, hence 'PENDING'.
+        Index(
+            "ix_jobs_runnable",
+            "run_after",
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
+        Index("ix_jobs_expires_at", "expires_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    kind: JobKind
+    status: JobStatus = Field(default=JobStatus.PENDING)
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    callback_url: Optional[str] = Field(default=None)
+
+    # Processing state
+    attempts: int = Field(default=0)
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+    # Outcome, kept until expires_at
+    status_code: Optional[int] = Field(default=None)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    error: Optional[str] = Field(default=None)
+    expires_at: Optional[datetime] = Field(default=None)
+    callback_delivered_at: Optional[datetime] = Field(default=None)
+
+    api_key_id: int = Field(foreign_key="api_keys.id", index=True)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class RateLimitCounter(SQLModel, table=True):
+    """A fixed-window rate limit counter shared by all app instances."""
+
+    __tablename__ = "rate_limit_counters"
+    # Counters are short-lived and cheap to lose, so skip the WAL
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: str = Field(primary_key=True)
+    count: int = Field(default=0)
+    expires_at: datetime = Field(index=True)
@@ -12,6 +12,8 @@ class User(TimestampModel, table=True):
     hashed_password: str
     is_active: bool = Field(default=True)
     is_superuser: bool = Field(default=False)
+    # Bumped on every change; JWTs carry it so older tokens can be rejected
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
 
     # Relationships
     api_keys: List["APIKey"] = Relationship(back_populates="user")
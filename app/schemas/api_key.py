@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
@@ -37,6 +38,24 @@ class APIKeyUsageEntry(BaseModel):
     created_at: datetime
 
 
+class UsageWindow(str, Enum):
+    """Time window for latency percentiles"""
+
+    LAST_HOUR = "1h"
+    LAST_DAY = "24h"
+    LAST_WEEK = "7d"
+    LAST_MONTH = "30d"
+
+
+class LatencyPercentiles(BaseModel):
+    """Schema for estimated response time percentiles, in seconds"""
+
+    count: int
+    p50: float
+    p90: float
+    p99: float
+
+
 class APIKeyUsageStats(BaseModel):
     """Schema for API key usage statistics"""
 
@@ -46,3 +65,6 @@ class APIKeyUsageStats(BaseModel):
     average_response_time: float
     usage_by_endpoint: dict[str, int]
     recent_usage: List[APIKeyUsageEntry]
+    latency_window: Optional[UsageWindow] = None  # None means all time
+    latency_percentiles: Optional[LatencyPercentiles] = None
+    latency_percentiles_by_endpoint: Optional[dict[str, LatencyPercentiles]] = None
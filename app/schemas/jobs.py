@@ -0,0 +1,66 @@
+"""
+Job Schema Models
+
+This module defines the Pydantic models for background job requests and responses.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field, HttpUrl
+from app.models import JobKind, JobStatus
+
+
+class JobRequest(BaseModel):
+    kind: JobKind = Field(..., description="The AI tool to run")
+    payload: Dict[str, Any] = Field(
+        ..., description="The request body the tool's endpoint would take"
+    )
+    callback_url: Optional[HttpUrl] = Field(
+        None, description="URL that receives the finished job as a signed POST"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "kind": "summarize",
+                "payload": {
+                    "text": "Your long text to summarize goes here...",
+                    "mode": "bullet_points",
+                },
+                "callback_url": "https://example.com/hooks/ai-tool-nest",
+            }
+        }
+
+
+class JobResponse(BaseModel):
+    id: uuid.UUID = Field(..., description="The job ID")
+    kind: JobKind = Field(..., description="The AI tool the job runs")
+    status: JobStatus = Field(..., description="The job status")
+    status_code: Optional[int] = Field(
+        None, description="Status code the request would have had, once finished"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None, description="The tool's response, if the job succeeded"
+    )
+    error: Optional[str] = Field(None, description="Why the job failed")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    finished_at: Optional[datetime] = Field(None, description="When the job finished")
+    expires_at: Optional[datetime] = Field(
+        None, description="When the finished job and its result are deleted"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "8b0c6a1e-4f7d-4d2a-9a57-2f8d7c1e3b90",
+                "kind": "summarize",
+                "status": "succeeded",
+                "status_code": 200,
+                "result": {"summary": "A concise summary of the input text..."},
+                "error": None,
+                "created_at": "2026-10-15T13:00:00",
+                "finished_at": "2026-10-15T13:00:24",
+                "expires_at": "2026-10-16T13:00:24",
+            }
+        }
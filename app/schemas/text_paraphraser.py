@@ -4,8 +4,9 @@ Text Paraphraser Schema Models
 This module defines the Pydantic models for text paraphrasing requests and responses.
 """
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, constr
+from app.core.config import settings
 from app.services.text_paraphraser import (
     ParaphraseStyle,
     ParaphraseIntensity,
@@ -45,3 +46,47 @@ class ParaphraseResponse(BaseModel):
                 "paraphrased_text": "The swift brown fox leaps across the indolent canine."
             }
         }
+
+
+class ParaphraseBatchRequest(BaseModel):
+    items: List[ParaphraseRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_ITEMS,
+        description="The texts to paraphrase, each with its own options",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"text": "The quick brown fox jumps over the lazy dog."},
+                    {
+                        "text": "The meeting has been moved to next Tuesday.",
+                        "style": "formal",
+                    },
+                ]
+            }
+        }
+
+
+class ParaphraseBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    status_code: int = Field(
+        ..., description="Status code the item would have as a single request"
+    )
+    result: Optional[ParaphraseResponse] = Field(
+        None, description="The paraphrase, if the item succeeded"
+    )
+    error: Optional[str] = Field(None, description="Why the item failed")
+    retry_after: Optional[int] = Field(
+        None, description="Seconds to wait before retrying a 503 item"
+    )
+
+
+class ParaphraseBatchResponse(BaseModel):
+    results: List[ParaphraseBatchItemResult] = Field(
+        ..., description="One result per item, in request order"
+    )
+    succeeded: int = Field(..., description="Number of items that succeeded")
+    failed: int = Field(..., description="Number of items that failed")
@@ -6,11 +6,14 @@ This module defines the Pydantic models for text summarization requests and resp
 
 from typing import List, Optional
 from pydantic import BaseModel, Field, constr
+from app.core.config import settings
 from app.services.text_summarizer import SummaryMode
 
 
 class SummarizeRequest(BaseModel):
-    text: constr(min_length=100) = Field(..., description="The text to summarize")
+    text: constr(min_length=100, max_length=settings.SUMMARY_MAX_INPUT_CHARS) = Field(
+        ..., description="The text to summarize"
+    )
     mode: SummaryMode = Field(
         default=SummaryMode.PARAGRAPH, description="The summarization mode"
     )
@@ -48,3 +51,47 @@ class SummarizeResponse(BaseModel):
                 "keywords": ["key term 1", "key term 2", "key term 3"],
             }
         }
+
+
+class SummarizeBatchRequest(BaseModel):
+    items: List[SummarizeRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_ITEMS,
+        description="The texts to summarize, each with its own options",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"text": "First long text to summarize goes here..."},
+                    {
+                        "text": "Second long text to summarize goes here...",
+                        "mode": "bullet_points",
+                    },
+                ]
+            }
+        }
+
+
+class SummarizeBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    status_code: int = Field(
+        ..., description="Status code the item would have as a single request"
+    )
+    result: Optional[SummarizeResponse] = Field(
+        None, description="The summary, if the item succeeded"
+    )
+    error: Optional[str] = Field(None, description="Why the item failed")
+    retry_after: Optional[int] = Field(
+        None, description="Seconds to wait before retrying a 503 item"
+    )
+
+
+class SummarizeBatchResponse(BaseModel):
+    results: List[SummarizeBatchItemResult] = Field(
+        ..., description="One result per item, in request order"
+    )
+    succeeded: int = Field(..., description="Number of items that succeeded")
+    failed: int = Field(..., description="Number of items that failed")
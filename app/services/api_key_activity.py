@@ -0,0 +1,123 @@
+"""
+API Key Activity Service
+
+This module coalesces API key "last used" touches in memory and writes them
+to the database in periodic bulk updates instead of once per request.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import DateTime, Integer, column, or_, update, values
+
+from app.core.config import settings
+from app.core.database import engine, register_close_hook
+from app.core.logging_config import get_logger
+from app.models import APIKey
+
+logger = get_logger(__name__)
+
+
+class APIKeyActivityTracker:
+    """
+    Write-behind buffer for ``api_keys.last_used_at``.
+
+    Every authenticated request records a touch for its key. Touches for the
+    same key are coalesced so that each flush issues a single
+    ``UPDATE ... FROM (VALUES ...)`` statement covering all keys seen since
+    the previous flush.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def touch(self, key_id: int, used_at: Optional[datetime] = None) -> None:
+        """
+        Record that an API key was used.
+
+        Args:
+            key_id: The ID of the API key
+            used_at: When the key was used (defaults to now)
+        """
+        used_at = used_at or datetime.utcnow()
+        previous = self._pending.get(key_id)
+        if previous is None or previous < used_at:
+            self._pending[key_id] = used_at
+
+    async def flush(self) -> int:
+        """
+        Write all pending touches in one bulk UPDATE.
+
+        Returns:
+            int: Number of keys included in the flush
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            touched = values(
+                column("id", Integer),
+                column("last_used_at", DateTime),
+                name="touched",
+            ).data(list(pending.items()))
+            api_keys = APIKey.__table__
+
+            stmt = (
+                update(api_keys)
+                .where(api_keys.c.id == touched.c.id)
+                .where(
+                    or_(
+                        api_keys.c.last_used_at.is_(None),
+                        api_keys.c.last_used_at < touched.c.last_used_at,
+                    )
+                )
+                .values(last_used_at=touched.c.last_used_at)
+            )
+
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(stmt)
+            except Exception:
+                # Put the touches back so the next flush retries them
+                for key_id, used_at in pending.items():
+                    self.touch(key_id, used_at)
+                raise
+
+            return len(pending)
+
+    async def _run(self) -> None:
+        """Flush pending touches every flush interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush API key activity: {str(e)}")
+
+    def start(self) -> None:
+        """Start the periodic flush task and flush again on shutdown."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        register_close_hook(self.stop)
+
+    async def stop(self) -> None:
+        """Stop the periodic flush task and write any remaining touches."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+
+# Create a singleton instance
+api_key_activity = APIKeyActivityTracker(
+    flush_interval=settings.API_KEY_LAST_USED_FLUSH_SECONDS
+)
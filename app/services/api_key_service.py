@@ -1,10 +1,55 @@
-from datetime import datetime
-from typing import List, Optional, Tuple, Dict
-from sqlalchemy import select, and_, func
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple, Dict
+from sqlalchemy import Row, select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import APIKey, User, KeyStatus, APIKeyUsage
+from app.models import (
+    APIKey,
+    APIKeyLatencyHistogram,
+    User,
+    KeyStatus,
+    APIKeyUsage,
+    APIKeyUsageRollup,
+    RollupGranularity,
+)
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session
 from app.core.security import generate_api_key, verify_api_key, get_api_key_hash
-from app.schemas.api_key import APIKeyUsageStats, APIKeyUsageEntry
+from app.schemas.api_key import (
+    APIKeyUsageStats,
+    APIKeyUsageEntry,
+    LatencyPercentiles,
+    UsageWindow,
+)
+from app.services.api_key_activity import api_key_activity
+from app.services.usage_log_writer import usage_log_writer
+from app.services.usage_rollups import bucket_start, histogram_percentiles
+from app.services.user_cache import CachedUser
+
+
+class CachedAPIKey(NamedTuple):
+    """Resolved API key authentication data kept in the verification cache."""
+
+    user: CachedUser
+    key_id: int
+    status: KeyStatus
+    rate_limit_tier: str
+
+
+# Verified API keys keyed by their SHA-256 hash
+api_key_cache: TTLCache[str, CachedAPIKey] = TTLCache(
+    maxsize=settings.API_KEY_CACHE_MAX_SIZE, ttl=settings.API_KEY_CACHE_TTL_SECONDS
+)
+
+
+# Histogram granularity and span used for each latency percentile window
+USAGE_WINDOWS = {
+    UsageWindow.LAST_HOUR: (RollupGranularity.HOUR, timedelta(hours=1)),
+    UsageWindow.LAST_DAY: (RollupGranularity.HOUR, timedelta(days=1)),
+    UsageWindow.LAST_WEEK: (RollupGranularity.HOUR, timedelta(days=7)),
+    UsageWindow.LAST_MONTH: (RollupGranularity.DAY, timedelta(days=30)),
+}
 
 
 class APIKeyService:
@@ -83,11 +128,14 @@ class APIKeyService:
             await self.session.commit()
             await self.session.refresh(api_key)
 
+            # Make sure the revoked key is not served from the cache
+            api_key_cache.pop(api_key.key_hash)
+
         return api_key
 
     async def verify_and_update_key(self, api_key: str) -> Optional[APIKey]:
         """
-        Verify an API key and update its last used timestamp.
+        Verify an API key and record its last used timestamp.
 
         Args:
             api_key: The API key to verify
@@ -106,14 +154,55 @@ class APIKeyService:
         db_key = result.scalar_one_or_none()
 
         if db_key and verify_api_key(api_key, db_key.key_hash):
-            # Update last used timestamp
-            db_key.last_used_at = datetime.utcnow()
-            await self.session.commit()
-            await self.session.refresh(db_key)
+            # Record the last used timestamp; it is written in batches
+            api_key_activity.touch(db_key.id)
             return db_key
 
         return None
 
+    async def authenticate(self, api_key: str) -> Optional[CachedAPIKey]:
+        """
+        Resolve an API key to its user, using the verification cache.
+
+        A cache hit needs no database round trips. On a miss the key is
+        verified against the database and the result is cached, with a
+        snapshot of its user, until the TTL expires or the key is revoked.
+        Cached keys that are no longer active are rejected.
+
+        Args:
+            api_key: The API key to authenticate
+
+        Returns:
+            Optional[CachedAPIKey]: The resolved user and key data if valid
+        """
+        key_hash = get_api_key_hash(api_key)
+        cached = api_key_cache.get(key_hash)
+        if cached is not None:
+            if cached.status != KeyStatus.ACTIVE:
+                api_key_cache.pop(key_hash)
+                return None
+            api_key_activity.touch(cached.key_id)
+            return cached
+
+        db_key = await self.verify_and_update_key(api_key)
+        if not db_key:
+            return None
+
+        user_query = select(User).where(User.id == db_key.user_id)
+        result = await self.session.execute(user_query)
+        user = result.scalar_one_or_none()
+        if not user:
+            return None
+
+        cached = CachedAPIKey(
+            user=CachedUser.from_user(user),
+            key_id=db_key.id,
+            status=db_key.status,
+            rate_limit_tier=db_key.rate_limit_tier,
+        )
+        api_key_cache.set(key_hash, cached)
+        return cached
+
     async def get_user_by_api_key(self, api_key: str) -> Optional[User]:
         """
         Validate an API key and return the associated user.
@@ -137,9 +226,8 @@ class APIKeyService:
         if not db_key:
             return None
 
-        # Update last used timestamp
-        db_key.last_used_at = datetime.utcnow()
-        await self.session.commit()
+        # Record the last used timestamp; it is written in batches
+        api_key_activity.touch(db_key.id)
 
         # Get and return the associated user
         user_query = select(User).where(User.id == db_key.user_id)
@@ -147,7 +235,7 @@ class APIKeyService:
         return result.scalar_one_or_none()
 
     async def get_key_usage_stats(
-        self, key_id: int, user_id: int
+        self, key_id: int, user_id: int, window: Optional[UsageWindow] = None
     ) -> Optional[APIKeyUsageStats]:
         """
         Get usage statistics for an API key.
@@ -155,6 +243,7 @@ class APIKeyService:
         Args:
             key_id: The ID of the API key
             user_id: The ID of the user who owns the key
+            window: Optional time window for latency percentiles (all time if None)
 
         Returns:
             Optional[APIKeyUsageStats]: Usage statistics if key exists and belongs to user
@@ -167,12 +256,16 @@ class APIKeyService:
         if not result.scalar_one_or_none():
             return None
 
-        # Get usage statistics
-        usage_query = select(APIKeyUsage).where(APIKeyUsage.api_key_id == key_id)
-        result = await self.session.execute(usage_query)
-        usage_logs = list(result.scalars().all())
+        # Aggregate per endpoint, merge latency histograms and fetch the
+        # latest entries concurrently, each on its own session
+        endpoint_rows, histogram_rows, recent_usage = await asyncio.gather(
+            self._aggregate_usage_by_endpoint(key_id),
+            self._get_latency_histograms(key_id, window),
+            self._get_recent_usage(key_id),
+        )
 
-        if not usage_logs:
+        total_requests = sum(row.total for row in endpoint_rows)
+        if total_requests == 0:
             return APIKeyUsageStats(
                 total_requests=0,
                 successful_requests=0,
@@ -180,23 +273,18 @@ class APIKeyService:
                 average_response_time=0.0,
                 usage_by_endpoint={},
                 recent_usage=[],
+                latency_window=window,
             )
 
-        # Calculate statistics
-        total_requests = len(usage_logs)
-        successful_requests = sum(1 for log in usage_logs if log.status_code < 400)
+        successful_requests = sum(row.successful for row in endpoint_rows)
         failed_requests = total_requests - successful_requests
         average_response_time = (
-            sum(log.response_time for log in usage_logs) / total_requests
+            sum(row.response_time_sum for row in endpoint_rows) / total_requests
         )
+        usage_by_endpoint: Dict[str, int] = {
+            row.endpoint: row.total for row in endpoint_rows
+        }
 
-        # Count requests by endpoint
-        usage_by_endpoint: Dict[str, int] = {}
-        for log in usage_logs:
-            usage_by_endpoint[log.endpoint] = usage_by_endpoint.get(log.endpoint, 0) + 1
-
-        # Get 10 most recent usage entries
-        recent_usage = sorted(usage_logs, key=lambda x: x.created_at, reverse=True)[:10]
         recent_usage_entries = [
             APIKeyUsageEntry(
                 endpoint=log.endpoint,
@@ -217,8 +305,138 @@ class APIKeyService:
             average_response_time=average_response_time,
             usage_by_endpoint=usage_by_endpoint,
             recent_usage=recent_usage_entries,
+            latency_window=window,
+            **self._latency_percentiles(histogram_rows),
         )
 
+    @staticmethod
+    def _latency_percentiles(histogram_rows: List[Row]) -> dict:
+        """
+        Estimate overall and per-endpoint percentiles from histogram rows.
+
+        Args:
+            histogram_rows: Rows with endpoint, bin and count columns
+
+        Returns:
+            dict: latency_percentiles and latency_percentiles_by_endpoint
+            values for APIKeyUsageStats
+        """
+        overall: Dict[int, int] = {}
+        by_endpoint: Dict[str, Dict[int, int]] = {}
+        for row in histogram_rows:
+            overall[row.bin] = overall.get(row.bin, 0) + row.count
+            counts = by_endpoint.setdefault(row.endpoint, {})
+            counts[row.bin] = counts.get(row.bin, 0) + row.count
+
+        def percentiles(counts: Dict[int, int]) -> LatencyPercentiles:
+            p50, p90, p99 = histogram_percentiles(counts, (0.5, 0.9, 0.99))
+            return LatencyPercentiles(
+                count=sum(counts.values()), p50=p50, p90=p90, p99=p99
+            )
+
+        if not overall:
+            return {}
+        return {
+            "latency_percentiles": percentiles(overall),
+            "latency_percentiles_by_endpoint": {
+                endpoint: percentiles(counts)
+                for endpoint, counts in by_endpoint.items()
+            },
+        }
+
+    async def _get_latency_histograms(
+        self, key_id: int, window: Optional[UsageWindow]
+    ) -> List[Row]:
+        """
+        Merge latency histogram buckets per endpoint and bin.
+
+        Args:
+            key_id: The ID of the API key
+            window: Optional time window (all time if None)
+
+        Returns:
+            List[Row]: One row per endpoint and bin with a summed count column
+        """
+        granularity, span = USAGE_WINDOWS.get(window, (RollupGranularity.DAY, None))
+
+        query = (
+            select(
+                APIKeyLatencyHistogram.endpoint,
+                APIKeyLatencyHistogram.bin,
+                func.sum(APIKeyLatencyHistogram.count).label("count"),
+            )
+            .where(
+                APIKeyLatencyHistogram.api_key_id == key_id,
+                APIKeyLatencyHistogram.granularity == granularity,
+            )
+            .group_by(APIKeyLatencyHistogram.endpoint, APIKeyLatencyHistogram.bin)
+        )
+        if span is not None:
+            since = bucket_start(datetime.utcnow() - span, granularity)
+            query = query.where(APIKeyLatencyHistogram.bucket_start >= since)
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            return list(result.all())
+
+    async def _aggregate_usage_by_endpoint(self, key_id: int) -> List[Row]:
+        """
+        Count requests, successes and total response time per endpoint.
+
+        Reads the daily usage rollups, so the cost depends on the number of
+        days and endpoints rather than on the number of raw usage rows.
+
+        Args:
+            key_id: The ID of the API key
+
+        Returns:
+            List[Row]: One row per endpoint with total, successful and
+            response_time_sum columns
+        """
+        query = (
+            select(
+                APIKeyUsageRollup.endpoint,
+                func.sum(APIKeyUsageRollup.request_count).label("total"),
+                func.sum(
+                    APIKeyUsageRollup.request_count - APIKeyUsageRollup.error_count
+                ).label("successful"),
+                func.sum(APIKeyUsageRollup.response_time_sum).label(
+                    "response_time_sum"
+                ),
+            )
+            .where(
+                APIKeyUsageRollup.api_key_id == key_id,
+                APIKeyUsageRollup.granularity == RollupGranularity.DAY,
+            )
+            .group_by(APIKeyUsageRollup.endpoint)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return list(result.all())
+
+    async def _get_recent_usage(
+        self, key_id: int, limit: int = 10
+    ) -> List[APIKeyUsage]:
+        """
+        Get the most recent usage entries for an API key.
+
+        Args:
+            key_id: The ID of the API key
+            limit: Maximum number of entries to return
+
+        Returns:
+            List[APIKeyUsage]: Usage entries, newest first
+        """
+        query = (
+            select(APIKeyUsage)
+            .where(APIKeyUsage.api_key_id == key_id)
+            .order_by(APIKeyUsage.created_at.desc())
+            .limit(limit)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
     async def log_api_key_usage(
         self,
         api_key_id: int,
@@ -232,6 +450,9 @@ class APIKeyService:
         """
         Log usage of an API key.
 
+        The record is queued for the background usage log writer and
+        inserted in a later batch.
+
         Args:
             api_key_id: The ID of the API key
             endpoint: The endpoint that was accessed
@@ -241,7 +462,7 @@ class APIKeyService:
             ip_address: Client IP address
             user_agent: Client user agent
         """
-        usage_log = APIKeyUsage(
+        usage_log_writer.submit(
             api_key_id=api_key_id,
             endpoint=endpoint,
             method=method,
@@ -250,5 +471,3 @@ class APIKeyService:
             ip_address=ip_address,
             user_agent=user_agent,
         )
-        self.session.add(usage_log)
-        await self.session.commit()
@@ -0,0 +1,93 @@
+"""
+Text Chunking Utilities
+
+This module splits long texts into chunks that fit a token budget, cutting
+on paragraph and sentence boundaries wherever possible.
+"""
+
+import re
+from typing import List
+
+# Rough average for English text with the Llama tokenizer family
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """Split a paragraph into sentences, hard-cutting overlong sentences."""
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > max_chars:
+            # Prefer cutting at the last space within the limit
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def _pack(pieces: List[str], separator: str, max_chars: int) -> List[str]:
+    """Greedily join pieces into chunks of at most ``max_chars``."""
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` estimated tokens.
+
+    Paragraphs are packed together until the budget is reached. Paragraphs
+    that exceed the budget on their own are split into sentences, and
+    sentences that still exceed it are cut at word boundaries.
+
+    Args:
+        text: The text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List[str]: The chunks, in document order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    paragraphs: List[str] = []
+
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            paragraphs.append(paragraph)
+            continue
+
+        chunks.extend(_pack(paragraphs, "\n\n", max_chars))
+        paragraphs = []
+        chunks.extend(_pack(_split_oversized(paragraph, max_chars), " ", max_chars))
+
+    chunks.extend(_pack(paragraphs, "\n\n", max_chars))
+    return chunks
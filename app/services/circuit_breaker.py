@@ -0,0 +1,258 @@
+"""
+Upstream Circuit Breaker
+
+This module tracks the health of each (base URL, model) upstream and stops
+sending it calls while it is failing or too slow, so requests fail fast
+with a retryable error instead of piling up behind a degraded provider.
+"""
+
+import math
+from collections import deque
+from enum import Enum
+from time import monotonic
+from typing import Any, Deque, Dict, NamedTuple, Tuple
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.upstream_scheduler import UpstreamUnavailableException
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenException(UpstreamUnavailableException):
+    """The upstream's circuit is open, so the call was not attempted"""
+
+    pass
+
+
+class Admission(NamedTuple):
+    """A call admitted by :meth:`CircuitBreaker.before_call`."""
+
+    # State generation the call was admitted in
+    generation: int
+    # Whether the call is a half-open probe
+    probe: bool
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker driven by the error and slow-call rates of recent calls.
+
+    Closed: calls flow and their outcomes are kept for ``window`` seconds.
+    Once at least ``min_calls`` were seen, the circuit opens if the share
+    of failed calls reaches ``error_rate`` or the share of calls slower
+    than ``slow_call_seconds`` reaches ``slow_call_rate``.
+
+    Open: calls are rejected immediately for ``open_seconds``.
+
+    Half-open: up to ``half_open_probes`` calls are let through. If all of
+    them succeed in time the circuit closes; any failure opens it again.
+
+    Each admitted call gets an :class:`Admission` that is passed back with
+    its outcome. Outcomes of calls admitted before the circuit last changed
+    state are ignored.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        half_open_probes: int,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CircuitState.CLOSED
+        # (finished_at, failed, slow) for calls in the window
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self._opened_at = 0.0
+        self._generation = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Current state and the rates it is based on."""
+        calls, failures, slow_calls = self._counts(monotonic())
+        return {
+            "state": self.state.value,
+            "calls": calls,
+            "error_rate": round(failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(slow_calls / calls, 3) if calls else 0.0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Whether :meth:`before_call` would currently admit a call."""
+        if self.state == CircuitState.OPEN:
+            return monotonic() >= self._opened_at + self.open_seconds
+        if self.state == CircuitState.HALF_OPEN:
+            return self._probes_in_flight < self.half_open_probes
+        return True
+
+    def _counts(self, now: float) -> Tuple[int, int, int]:
+        """Drop outcomes outside the window; count calls, failures, slow calls."""
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+        return (
+            len(self._outcomes),
+            sum(failed for _, failed, _ in self._outcomes),
+            sum(slow for _, _, slow in self._outcomes),
+        )
+
+    def _open(self, reason: str) -> None:
+        self.state = CircuitState.OPEN
+        self._generation += 1
+        self._opened_at = monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+        logger.warning(f"Circuit {self.name} opened: {reason}")
+
+    def _close(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._generation += 1
+        self._outcomes.clear()
+        logger.info(f"Circuit {self.name} closed")
+
+    def before_call(self) -> Admission:
+        """
+        Admit a call or reject it.
+
+        Returns:
+            Admission: Passed to :meth:`record` or :meth:`cancel` once the
+            call is done
+
+        Raises:
+            CircuitOpenException: If the circuit is open, or half-open with
+                all probe slots taken
+        """
+        if self.state == CircuitState.OPEN:
+            remaining = self._opened_at + self.open_seconds - monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenException(
+                    "Upstream service is unavailable, please retry later",
+                    max(1, math.ceil(remaining)),
+                )
+            self.state = CircuitState.HALF_OPEN
+            self._generation += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenException(
+                    "Upstream service is recovering, please retry later", 1
+                )
+            self._probes_in_flight += 1
+            return Admission(self._generation, probe=True)
+
+        return Admission(self._generation, probe=False)
+
+    def record(self, admission: Admission, duration: float, failed: bool) -> None:
+        """
+        Record the outcome of an admitted call.
+
+        Args:
+            admission: The call's admission from :meth:`before_call`
+            duration: How long the call took, in seconds
+            failed: Whether the call failed in a way that indicates an
+                upstream problem (rate limit, server error, timeout)
+        """
+        if admission.generation != self._generation:
+            # Admitted before the circuit last changed state
+            return
+
+        slow = duration >= self.slow_call_seconds
+
+        if admission.probe:
+            self._probes_in_flight -= 1
+            if failed or slow:
+                self._open("probe call failed" if failed else "probe call too slow")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._close()
+            return
+
+        now = monotonic()
+        self._outcomes.append((now, failed, slow))
+        calls, failures, slow_calls = self._counts(now)
+        if calls < self.min_calls:
+            return
+        if failures / calls >= self.error_rate:
+            self._open(f"{failures}/{calls} calls failed")
+        elif slow_calls / calls >= self.slow_call_rate:
+            self._open(
+                f"{slow_calls}/{calls} calls took over {self.slow_call_seconds}s"
+            )
+
+    def cancel(self, admission: Admission) -> None:
+        """
+        Forget an admitted call that was cancelled before it finished.
+
+        Args:
+            admission: The call's admission from :meth:`before_call`
+        """
+        if admission.probe and admission.generation == self._generation:
+            self._probes_in_flight -= 1
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per (base URL, model), created on first use."""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, base_url: str, model: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker for an upstream.
+
+        Args:
+            base_url: The API base URL
+            model: The model name
+
+        Returns:
+            CircuitBreaker: The upstream's breaker
+        """
+        key = (base_url, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=f"{model}@{base_url}",
+                window=settings.CIRCUIT_WINDOW_SECONDS,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                error_rate=settings.CIRCUIT_ERROR_RATE,
+                slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+                slow_call_rate=settings.CIRCUIT_SLOW_CALL_RATE,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+            )
+            self._breakers[key] = breaker
+        return breaker
+
+
+# Create a singleton instance
+circuit_breakers = CircuitBreakerRegistry()
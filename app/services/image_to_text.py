@@ -5,14 +5,16 @@ This module provides image analysis functionality using Groq's Vision API.
 """
 
 import base64
+import hashlib
 import json
 import io
 from enum import Enum
 from typing import Optional, Union, BinaryIO
-from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
 
-from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.model_router import model_router
+from app.services.upstream_scheduler import UpstreamException
 
 
 class ImageAnalysisMode(str, Enum):
@@ -35,10 +37,8 @@ class ImageToTextException(Exception):
 
 class ImageToTextService:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.GROK_API_KEY, base_url=settings.OPENAI_BASE_URL
-        )
-        self.model = "meta-llama/llama-4-scout-17b-16e-instruct"
+        self.inflight = SingleFlight()
+        self.route = model_router.route("image_to_text")
 
     def _create_prompt(self, mode: ImageAnalysisMode, detail_level: DetailLevel) -> str:
         """Create the appropriate prompt based on mode and detail level."""
@@ -115,6 +115,7 @@ class ImageToTextService:
                     "type": "image_url",
                     "image_url": {"url": image_source},
                 }
+                source_key = image_source
             else:
                 # Handle file case safely
                 try:
@@ -128,14 +129,39 @@ class ImageToTextService:
                     raise ImageToTextException(
                         f"Failed to process image file: {str(e)}"
                     )
+                # Uploads are identified by their content
+                source_key = hashlib.sha256(base64_image.encode()).hexdigest()
 
+            # Identical concurrent requests share one upstream call
+            return await self.inflight.do(
+                (source_key, mode, detail_level),
+                lambda: self._analyze(prompt, image_content, mode, detail_level),
+            )
+
+        except (ImageToTextException, UpstreamException) as e:
+            # Re-raise specific exceptions
+            raise
+        except Exception as e:
+            raise ImageToTextException(f"Image analysis failed: {str(e)}")
+
+    async def _analyze(
+        self,
+        prompt: str,
+        image_content: dict,
+        mode: ImageAnalysisMode,
+        detail_level: DetailLevel,
+    ) -> dict:
+        """Call the upstream API and format the analysis."""
+        try:
             # Create the API request
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self.route.create(
                 messages=[
                     {
                         "role": "user",
-                        "content": [{"type": "text", "text": prompt}, image_content],
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            image_content,
+                        ],
                     }
                 ],
                 temperature=0.2,  # Lower temperature for more consistent results
@@ -162,7 +188,7 @@ class ImageToTextService:
             else:
                 return {"analysis": analysis_text}
 
-        except ImageToTextException as e:
+        except (ImageToTextException, UpstreamException) as e:
             # Re-raise specific exceptions
             raise
         except Exception as e:
@@ -0,0 +1,593 @@
+"""
+Background Job Queue
+
+This module runs AI tool requests as background jobs. Jobs are stored in
+the ``jobs`` table and claimed by a pool of worker tasks with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of app instances can
+share the queue. Finished jobs keep their result until it expires, and can
+notify a webhook with a request signed with HMAC-SHA256.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from time import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Type,
+)
+from urllib.parse import urlsplit
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, insert, or_, select, update
+
+from app.core.config import settings
+from app.core.database import engine, register_close_hook
+from app.core.http_client import get_http_client
+from app.core.logging_config import get_logger
+from app.models import Job, JobKind, JobStatus
+from app.schemas.jobs import JobResponse
+from app.services.upstream_scheduler import (
+    Priority,
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+    priority,
+    set_client_key,
+)
+from app.services.usage_log_writer import usage_log_writer
+
+logger = get_logger(__name__)
+
+jobs = Job.__table__
+
+# Job fields exposed to API clients and webhooks
+PUBLIC_FIELDS = (
+    "id",
+    "kind",
+    "status",
+    "status_code",
+    "result",
+    "error",
+    "created_at",
+    "finished_at",
+    "expires_at",
+)
+
+
+class CallbackURLException(Exception):
+    """The callback URL does not point to a public host"""
+
+    pass
+
+
+class JobHandler(NamedTuple):
+    schema: Type[BaseModel]
+    run: Callable[[BaseModel], Awaitable[dict]]
+    service_exception: Type[Exception]
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Select the fields of a job row that are shown to its owner."""
+    return {field: job[field] for field in PUBLIC_FIELDS}
+
+
+async def check_callback_url(url: str) -> None:
+    """
+    Make sure a callback URL only reaches public hosts.
+
+    Every address the host resolves to must be globally routable, so jobs
+    cannot make the server call its own loopback, private network or cloud
+    metadata addresses.
+
+    Args:
+        url: The callback URL
+
+    Raises:
+        CallbackURLException: If the URL is not http(s), its host does not
+            resolve, or it resolves to a non-public address
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise CallbackURLException("Callback URL must be an http or https URL")
+
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError):
+        raise CallbackURLException("Callback URL host does not resolve")
+
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise CallbackURLException("Callback URL must point to a public host")
+
+
+def sign_webhook(secret: str, timestamp: str, body: bytes) -> str:
+    """
+    Sign a webhook request body.
+
+    Receivers recompute the HMAC-SHA256 of ``"{timestamp}.{body}"`` with the
+    shared secret and compare it to the ``X-Signature`` header; checking
+    the timestamp as well guards against replayed requests.
+
+    Args:
+        secret: The webhook signing secret
+        timestamp: Value of the ``X-Signature-Timestamp`` header
+        body: The raw request body
+
+    Returns:
+        str: Hex-encoded signature
+    """
+    message = timestamp.encode() + b"." + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class JobQueue:
+    """
+    Postgres-backed job queue with an in-process worker pool.
+
+    A worker claims the oldest runnable job and holds a lease on it that it
+    renews while the job runs; a job whose lease lapses (for example because
+    its instance died) is claimed again, up to ``max_attempts`` times. Jobs
+    that fail because the upstream API is unavailable are put back with the
+    upstream's ``Retry-After`` delay. Other failures are final.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+        result_ttl: int,
+        cleanup_interval: float,
+        webhook_secret: Optional[str],
+        webhook_timeout: float,
+        webhook_max_attempts: int,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.result_ttl = timedelta(seconds=result_ttl)
+        self.cleanup_interval = cleanup_interval
+        self.webhook_secret = webhook_secret
+        self.webhook_timeout = webhook_timeout
+        self.webhook_max_attempts = webhook_max_attempts
+
+        self._handlers: Dict[JobKind, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._deliveries: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+        # Metrics
+        self.busy = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.requeued = 0
+        self.webhooks_delivered = 0
+        self.webhooks_failed = 0
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Counters describing this instance's workers."""
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "webhooks_delivered": self.webhooks_delivered,
+            "webhooks_failed": self.webhooks_failed,
+        }
+
+    @property
+    def webhooks_enabled(self) -> bool:
+        return bool(self.webhook_secret)
+
+    def register(
+        self,
+        kind: JobKind,
+        schema: Type[BaseModel],
+        run: Callable[[BaseModel], Awaitable[dict]],
+        service_exception: Type[Exception],
+    ) -> None:
+        """
+        Register how jobs of a kind are validated and run.
+
+        Args:
+            kind: The job kind
+            schema: Request model the job payload must match
+            run: Coroutine function producing the result for a request
+            service_exception: Exception type the service raises for
+                generation failures (reported with status code 422)
+        """
+        self._handlers[kind] = JobHandler(schema, run, service_exception)
+
+    def validate(self, kind: JobKind, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a job payload and normalize it for storage.
+
+        Args:
+            kind: The job kind
+            payload: The request body for the kind's endpoint
+
+        Returns:
+            Dict[str, Any]: The validated payload in JSON form
+
+        Raises:
+            pydantic.ValidationError: If the payload is invalid
+        """
+        handler = self._handlers[kind]
+        return handler.schema.model_validate(payload).model_dump(mode="json")
+
+    async def submit(
+        self,
+        api_key_id: int,
+        kind: JobKind,
+        payload: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Args:
+            api_key_id: The ID of the API key submitting the job
+            kind: The job kind
+            payload: Payload returned by :meth:`validate`
+            callback_url: URL notified when the job finishes
+
+        Returns:
+            Dict[str, Any]: The stored job
+
+        Raises:
+            CallbackURLException: If the callback URL is not a public host
+        """
+        if callback_url is not None:
+            await check_callback_url(callback_url)
+
+        now = datetime.utcnow()
+        stmt = (
+            insert(jobs)
+            .values(
+                id=uuid.uuid4(),
+                kind=kind,
+                status=JobStatus.PENDING,
+                payload=payload,
+                callback_url=callback_url,
+                attempts=0,
+                run_after=now,
+                created_at=now,
+                api_key_id=api_key_id,
+            )
+            .returning(*jobs.c)
+        )
+        async with engine.begin() as conn:
+            job = dict((await conn.execute(stmt)).mappings().one())
+
+        self.submitted += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: uuid.UUID, api_key_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a job that has not expired.
+
+        Args:
+            job_id: The job ID
+            api_key_id: The ID of the API key that submitted the job
+
+        Returns:
+            Optional[Dict[str, Any]]: The job, or None if not found
+        """
+        stmt = select(jobs).where(
+            jobs.c.id == job_id,
+            jobs.c.api_key_id == api_key_id,
+            or_(jobs.c.expires_at.is_(None), jobs.c.expires_at > datetime.utcnow()),
+        )
+        async with engine.connect() as conn:
+            job = (await conn.execute(stmt)).mappings().first()
+        return dict(job) if job is not None else None
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest runnable job, skipping jobs other workers hold."""
+        now = datetime.utcnow()
+        runnable = (
+            select(jobs.c.id)
+            .where(
+                jobs.c.run_after <= now,
+                jobs.c.attempts < self.max_attempts,
+                or_(
+                    jobs.c.status == JobStatus.PENDING,
+                    and_(
+                        jobs.c.status == JobStatus.RUNNING,
+                        jobs.c.lease_expires_at < now,
+                    ),
+                ),
+            )
+            .order_by(jobs.c.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(jobs)
+            .where(jobs.c.id == runnable)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=jobs.c.attempts + 1,
+                started_at=now,
+                lease_expires_at=now + self.lease,
+                updated_at=now,
+            )
+            .returning(*jobs.c)
+        )
+        async with engine.begin() as conn:
+            job = (await conn.execute(stmt)).mappings().first()
+        return dict(job) if job is not None else None
+
+    async def _update(self, job_id: uuid.UUID, **values: Any) -> Dict[str, Any]:
+        stmt = (
+            update(jobs)
+            .where(jobs.c.id == job_id)
+            .values(updated_at=datetime.utcnow(), **values)
+            .returning(*jobs.c)
+        )
+        async with engine.begin() as conn:
+            return dict((await conn.execute(stmt)).mappings().one())
+
+    async def _keep_lease(self, job_id: uuid.UUID) -> None:
+        """Renew a running job's lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self._update(
+                    job_id, lease_expires_at=datetime.utcnow() + self.lease
+                )
+            except Exception as e:
+                logger.error(f"Failed to renew lease of job {job_id}: {str(e)}")
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        """Run a claimed job and store its outcome."""
+        handler = self._handlers[job["kind"]]
+        set_client_key(job["api_key_id"])
+        lease = asyncio.create_task(self._keep_lease(job["id"]))
+        outcome: Dict[str, Any] = {"status_code": 200}
+        start_time = time()
+
+        try:
+            with priority(Priority.BATCH):
+                outcome["result"] = await handler.run(
+                    handler.schema.model_validate(job["payload"])
+                )
+        except asyncio.CancelledError:
+            # Shutting down; give the job back without using up an attempt
+            await self._update(
+                job["id"],
+                status=JobStatus.PENDING,
+                attempts=job["attempts"] - 1,
+                lease_expires_at=None,
+            )
+            raise
+        except UpstreamTimeoutException:
+            outcome.update(status_code=504, error="Request timed out")
+        except UpstreamUnavailableException as e:
+            if job["attempts"] < self.max_attempts:
+                self.requeued += 1
+                await self._update(
+                    job["id"],
+                    status=JobStatus.PENDING,
+                    lease_expires_at=None,
+                    run_after=datetime.utcnow() + timedelta(seconds=e.retry_after),
+                )
+                return
+            outcome.update(status_code=503, error=str(e))
+        except handler.service_exception as e:
+            outcome.update(status_code=422, error=str(e))
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {str(e)}")
+            outcome.update(status_code=500, error="Internal server error")
+        finally:
+            lease.cancel()
+
+        succeeded = outcome["status_code"] == 200
+        if succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        response_time = time() - start_time
+        logger.info(
+            f"Job {job['id']} finished with status {outcome['status_code']} "
+            f"in {response_time:.2f}s"
+        )
+        usage_log_writer.submit(
+            api_key_id=job["api_key_id"],
+            endpoint=f"/jobs/{job['kind'].value}",
+            method="POST",
+            status_code=outcome["status_code"],
+            response_time=response_time,
+            ip_address=None,
+        )
+
+        now = datetime.utcnow()
+        finished = await self._update(
+            job["id"],
+            status=JobStatus.SUCCEEDED if succeeded else JobStatus.FAILED,
+            lease_expires_at=None,
+            finished_at=now,
+            expires_at=now + self.result_ttl,
+            **outcome,
+        )
+        if finished["callback_url"] and self.webhooks_enabled:
+            delivery = asyncio.create_task(self._deliver(finished))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, job: Dict[str, Any]) -> None:
+        """
+        POST a finished job to its callback URL, retrying failures.
+
+        The body is the job as ``GET /jobs/{job_id}`` returns it. The URL is
+        checked again before each attempt, since its host may resolve
+        differently than at submission, and redirects are not followed.
+        """
+        body = JobResponse(**public_job(job)).model_dump_json().encode()
+
+        for attempt in range(self.webhook_max_attempts):
+            if attempt:
+                await asyncio.sleep(random.uniform(0, 2**attempt))
+
+            timestamp = str(int(time()))
+            try:
+                await check_callback_url(job["callback_url"])
+            except CallbackURLException as e:
+                logger.warning(f"Webhook for job {job['id']} not sent: {str(e)}")
+                break
+
+            try:
+                response = await get_http_client().post(
+                    job["callback_url"],
+                    content=body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-Job-Id": str(job["id"]),
+                        "X-Signature-Timestamp": timestamp,
+                        "X-Signature": "sha256="
+                        + sign_webhook(self.webhook_secret, timestamp, body),
+                    },
+                    timeout=self.webhook_timeout,
+                    follow_redirects=False,
+                )
+                if response.is_success:
+                    self.webhooks_delivered += 1
+                    await self._update(
+                        job["id"], callback_delivered_at=datetime.utcnow()
+                    )
+                    return
+                error = f"status {response.status_code}"
+            except Exception as e:
+                error = str(e)
+            logger.warning(f"Webhook for job {job['id']} failed: {error}")
+
+        self.webhooks_failed += 1
+
+    async def cleanup(self) -> int:
+        """
+        Delete expired jobs and fail jobs whose attempts are used up.
+
+        Returns:
+            int: Number of deleted jobs
+        """
+        now = datetime.utcnow()
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(jobs)
+                .where(
+                    jobs.c.status == JobStatus.RUNNING,
+                    jobs.c.lease_expires_at < now,
+                    jobs.c.attempts >= self.max_attempts,
+                )
+                .values(
+                    status=JobStatus.FAILED,
+                    status_code=500,
+                    error="Job did not finish",
+                    lease_expires_at=None,
+                    finished_at=now,
+                    expires_at=now + self.result_ttl,
+                    updated_at=now,
+                )
+            )
+            result = await conn.execute(delete(jobs).where(jobs.c.expires_at < now))
+        return result.rowcount
+
+    async def _run_worker(self) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.busy += 1
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"Failed to process job {job['id']}: {str(e)}")
+            finally:
+                self.busy -= 1
+
+    async def _run_cleanup(self) -> None:
+        """Run cleanup every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                deleted = await self.cleanup()
+                if deleted:
+                    logger.info(f"Deleted {deleted} expired jobs")
+            except Exception as e:
+                logger.error(f"Job cleanup failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start the workers and the cleanup task, and stop them on shutdown."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._run_worker()) for _ in range(self.workers)
+            ]
+            self._tasks.append(asyncio.create_task(self._run_cleanup()))
+        register_close_hook(self.stop)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the workers, returning running jobs to the queue.
+
+        Args:
+            timeout: Maximum seconds to wait for pending webhooks
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._deliveries:
+            await asyncio.wait(self._deliveries, timeout=timeout)
+
+        logger.info("Job queue stopped", extra=self.metrics)
+
+
+# Create a singleton instance
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    result_ttl=settings.JOB_RESULT_TTL_SECONDS,
+    cleanup_interval=settings.JOB_CLEANUP_SECONDS,
+    webhook_secret=settings.JOB_WEBHOOK_SECRET,
+    webhook_timeout=settings.JOB_WEBHOOK_TIMEOUT_SECONDS,
+    webhook_max_attempts=settings.JOB_WEBHOOK_MAX_ATTEMPTS,
+)
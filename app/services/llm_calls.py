@@ -0,0 +1,435 @@
+"""
+Upstream LLM Call Policy
+
+This module wraps chat completion calls with explicit connect/read
+timeouts, an overall deadline, retries with exponential jittered backoff
+on rate limits and server errors, and optional request hedging. Every
+attempt passes the upstream's circuit breaker and runs inside an upstream
+scheduler slot.
+"""
+
+import asyncio
+import random
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any, AsyncIterator, Deque, Dict, NoReturn, Optional
+
+import httpx
+import openai
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.circuit_breaker import Admission, CircuitBreaker, circuit_breakers
+from app.services.upstream_scheduler import (
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+    upstream_scheduler,
+)
+
+logger = get_logger(__name__)
+
+# Latency samples kept per model for the hedging delay
+LATENCY_WINDOW = 200
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """
+    Read the delay requested by a ``Retry-After`` style response header.
+
+    Args:
+        exc: The exception raised by the OpenAI client
+
+    Returns:
+        Optional[float]: Requested delay in seconds, if the response had one
+    """
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+
+    headers = response.headers
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether a failed call may succeed if repeated."""
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+class LLMCaller:
+    """
+    Applies timeouts, retries and hedging to one service's upstream calls.
+
+    Hedging sends a second copy of a request that is still running after
+    the 95th percentile latency of recent calls, and uses whichever answer
+    arrives first. The copy is only sent if the upstream scheduler has a
+    free slot, so hedging never delays queued requests.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float,
+        read_timeout: float,
+        total_timeout: float,
+        max_retries: int,
+        backoff: float,
+        backoff_max: float,
+        hedging: bool,
+        hedge_min_samples: int,
+    ):
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_timeouts = 0
+
+    @classmethod
+    def for_service(cls, name: str) -> "LLMCaller":
+        """
+        Create a caller from the settings, applying the service's overrides.
+
+        Args:
+            name: Key of the service in ``LLM_SERVICE_TIMEOUTS``
+
+        Returns:
+            LLMCaller: The configured caller
+        """
+        overrides = settings.LLM_SERVICE_TIMEOUTS.get(name, {})
+        return cls(
+            connect_timeout=overrides.get(
+                "connect", settings.LLM_CONNECT_TIMEOUT_SECONDS
+            ),
+            read_timeout=overrides.get("read", settings.LLM_READ_TIMEOUT_SECONDS),
+            total_timeout=overrides.get("total", settings.LLM_TOTAL_TIMEOUT_SECONDS),
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff=settings.LLM_RETRY_BACKOFF_SECONDS,
+            backoff_max=settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+            hedging=settings.LLM_HEDGING_ENABLED,
+            hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        )
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Retry, hedging and deadline counters."""
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "deadline_timeouts": self.deadline_timeouts,
+            "p95_seconds": {
+                model: round(p95, 3)
+                for model in self._latencies
+                if (p95 := self._p95(model)) is not None
+            },
+        }
+
+    def _p95(self, model: str) -> Optional[float]:
+        samples = self._latencies.get(model)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _record_latency(self, model: str, latency: float) -> None:
+        self._latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW)).append(latency)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(0.0, deadline - monotonic())
+
+    def _next_delay(
+        self, exc: Exception, attempt: int, deadline: float
+    ) -> Optional[float]:
+        """Backoff before the next attempt, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            return None
+
+        # Full jitter spreads out retries from concurrent callers
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+        requested = retry_after_seconds(exc)
+        if requested is not None:
+            delay = max(delay, requested)
+
+        if delay >= self._remaining(deadline):
+            return None
+        return delay
+
+    def _raise_final(self, exc: Exception) -> NoReturn:
+        """Raise the error for a call that will not be retried."""
+        if isinstance(exc, (asyncio.TimeoutError, openai.APITimeoutError)):
+            self.deadline_timeouts += 1
+            raise UpstreamTimeoutException(
+                "Upstream service did not respond in time"
+            ) from exc
+        if is_retryable(exc):
+            retry_after = retry_after_seconds(exc) or upstream_scheduler.retry_after()
+            raise UpstreamUnavailableException(
+                "Upstream service is unavailable, please retry later",
+                max(1, round(retry_after)),
+            ) from exc
+        raise exc
+
+    def _raise_stream_error(self, exc: Exception) -> NoReturn:
+        """Raise the error for a stream that failed while chunks flowed."""
+        if isinstance(exc, (openai.APITimeoutError, httpx.TimeoutException)):
+            raise UpstreamTimeoutException(
+                "Upstream service did not respond in time"
+            ) from exc
+        if is_retryable(exc) or isinstance(exc, httpx.TransportError):
+            raise UpstreamUnavailableException(
+                "Upstream service is unavailable, please retry later",
+                max(1, round(upstream_scheduler.retry_after())),
+            ) from exc
+        raise exc
+
+    async def _call(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str,
+        kwargs: dict,
+        acquired: bool,
+        deadline: float,
+    ) -> Any:
+        """Make one attempt while holding an upstream slot."""
+        breaker = circuit_breakers.get(str(client.base_url), model)
+        try:
+            admission = breaker.before_call()
+        except Exception:
+            if acquired:
+                upstream_scheduler.release(model)
+            raise
+        if not acquired:
+            await self._acquire_slot(breaker, admission, model)
+
+        async with upstream_scheduler.slot(model, acquired=True):
+            started = monotonic()
+            async with self._breaker_outcome(breaker, admission, started, deadline):
+                response = await client.chat.completions.create(
+                    model=model, timeout=self.timeout, **kwargs
+                )
+        self._record_latency(model, monotonic() - started)
+        return response
+
+    @staticmethod
+    async def _acquire_slot(
+        breaker: CircuitBreaker, admission: Admission, model: str
+    ) -> None:
+        """Wait for an upstream slot, giving the admission back if none is free."""
+        try:
+            await upstream_scheduler.acquire(model)
+        except BaseException:
+            breaker.cancel(admission)
+            raise
+
+    @staticmethod
+    @asynccontextmanager
+    async def _breaker_outcome(
+        breaker: CircuitBreaker, admission: Admission, started: float, deadline: float
+    ) -> AsyncIterator[None]:
+        """
+        Report the outcome of the call made in the block to a breaker.
+
+        A call cut off by the deadline counts as failed, whether it was
+        cancelled by the enclosing ``wait_for`` or timed out itself.
+        """
+        try:
+            yield
+        except asyncio.CancelledError:
+            if monotonic() >= deadline:
+                breaker.record(admission, monotonic() - started, failed=True)
+            else:
+                breaker.cancel(admission)
+            raise
+        except Exception as e:
+            failed = is_retryable(e) or isinstance(e, asyncio.TimeoutError)
+            breaker.record(admission, monotonic() - started, failed=failed)
+            raise
+        breaker.record(admission, monotonic() - started, failed=False)
+
+    async def _hedged_call(
+        self, client: openai.AsyncOpenAI, model: str, kwargs: dict, deadline: float
+    ) -> Any:
+        """Make one attempt, hedged with a second request if it runs long."""
+        delay = self._p95(model) if self.hedging else None
+        if delay is None:
+            return await self._call(client, model, kwargs, False, deadline)
+
+        tasks = [
+            asyncio.create_task(self._call(client, model, kwargs, False, deadline))
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not upstream_scheduler.try_acquire(model):
+                return await tasks[0]
+
+            self.hedges += 1
+            tasks.append(
+                asyncio.create_task(self._call(client, model, kwargs, True, deadline))
+            )
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+
+            # Both requests failed; report the original one's error
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def create(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str,
+        deadline: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Create a chat completion under the call policy.
+
+        Args:
+            client: The OpenAI-compatible client
+            model: The model to use
+            deadline: ``time.monotonic()`` value by which the call must be
+                done (defaults to the total timeout from now)
+            **kwargs: Further ``chat.completions.create`` arguments
+
+        Returns:
+            The chat completion
+
+        Raises:
+            UpstreamTimeoutException: If the deadline passed
+            UpstreamUnavailableException: If the upstream API kept failing
+                with retryable errors, or no slot became free in time
+            openai.OpenAIError: For non-retryable upstream errors
+        """
+        if deadline is None:
+            deadline = monotonic() + self.total_timeout
+        attempt = 0
+        while True:
+            try:
+                return await asyncio.wait_for(
+                    self._hedged_call(client, model, kwargs, deadline),
+                    self._remaining(deadline),
+                )
+            except Exception as e:
+                delay = self._next_delay(e, attempt, deadline)
+                if delay is None:
+                    self._raise_final(e)
+                logger.warning(
+                    f"Retrying {model} call in {delay:.2f}s after error: {str(e)}"
+                )
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str,
+        deadline: Optional[float] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[openai.AsyncStream]:
+        """
+        Open a streamed chat completion under the call policy.
+
+        Retries and the deadline apply to opening the stream; once chunks
+        flow, only the read timeout applies between them, and timeouts or
+        connection failures while reading are raised as upstream errors.
+        The upstream slot is held until the block exits.
+
+        Args:
+            client: The OpenAI-compatible client
+            model: The model to use
+            deadline: ``time.monotonic()`` value by which the stream must
+                be open (defaults to the total timeout from now)
+            **kwargs: Further ``chat.completions.create`` arguments
+
+        Yields:
+            openai.AsyncStream: The chunk stream
+
+        Raises:
+            UpstreamTimeoutException: If the stream did not open in time, or
+                a read timed out
+            UpstreamUnavailableException: If the upstream API kept failing
+                with retryable errors, no slot became free in time, or the
+                connection failed while reading
+            openai.OpenAIError: For non-retryable upstream errors
+        """
+        breaker = circuit_breakers.get(str(client.base_url), model)
+        if deadline is None:
+            deadline = monotonic() + self.total_timeout
+        attempt = 0
+        while True:
+            admission = breaker.before_call()
+            await self._acquire_slot(breaker, admission, model)
+            async with upstream_scheduler.slot(model, acquired=True):
+                try:
+                    async with self._breaker_outcome(
+                        breaker, admission, monotonic(), deadline
+                    ):
+                        stream = await asyncio.wait_for(
+                            client.chat.completions.create(
+                                model=model,
+                                stream=True,
+                                timeout=self.timeout,
+                                **kwargs,
+                            ),
+                            self._remaining(deadline),
+                        )
+                except Exception as e:
+                    delay = self._next_delay(e, attempt, deadline)
+                    if delay is None:
+                        self._raise_final(e)
+                    logger.warning(
+                        f"Retrying {model} stream in {delay:.2f}s after error: {str(e)}"
+                    )
+                else:
+                    async with stream:
+                        try:
+                            yield stream
+                        except Exception as e:
+                            self._raise_stream_error(e)
+                    return
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,50 @@
+"""
+LLM Client Registry
+
+This module hands out ``AsyncOpenAI`` clients that all share the pooled
+HTTP client from ``app.core.http_client``, one per API base URL and key.
+"""
+
+from typing import Dict, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.core.http_client import get_http_client
+
+# (base_url, api_key) -> (HTTP client the OpenAI client was built on, client)
+_clients: Dict[Tuple[str, str], Tuple[httpx.AsyncClient, AsyncOpenAI]] = {}
+
+
+def get_openai_client(
+    base_url: Optional[str] = None, api_key: Optional[str] = None
+) -> AsyncOpenAI:
+    """
+    Get the OpenAI-compatible client for an API.
+
+    Clients are rebuilt when the shared HTTP client was closed and
+    recreated, so they never hold on to a closed connection pool.
+
+    Args:
+        base_url: The API base URL (defaults to OPENAI_BASE_URL)
+        api_key: The API key (defaults to GROK_API_KEY)
+
+    Returns:
+        AsyncOpenAI: The client
+    """
+    key = (base_url or settings.OPENAI_BASE_URL, api_key or settings.GROK_API_KEY)
+    http_client = get_http_client()
+
+    cached = _clients.get(key)
+    if cached is not None and cached[0] is http_client:
+        return cached[1]
+
+    client = AsyncOpenAI(
+        base_url=key[0],
+        api_key=key[1],
+        http_client=http_client,
+        # Retries are handled by app.services.llm_calls
+        max_retries=0,
+    )
+    _clients[key] = (http_client, client)
+    return client
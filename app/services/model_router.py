@@ -0,0 +1,323 @@
+"""
+Model Router
+
+This module routes each task's chat completion calls across one or more
+OpenAI-compatible backends (provider base URL and model). It keeps rolling
+latency and error rates per backend, skips backends whose circuit is open,
+and fails over to the next backend when one is unavailable.
+"""
+
+import random
+from contextlib import asynccontextmanager
+from enum import Enum
+from time import monotonic
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import openai
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenException,
+    circuit_breakers,
+)
+from app.services.llm_calls import LLMCaller
+from app.services.llm_clients import get_openai_client
+from app.services.upstream_scheduler import (
+    UpstreamQueueTimeout,
+    UpstreamUnavailableException,
+)
+
+logger = get_logger(__name__)
+
+# Error rates are capped so a failing backend still gets a finite score
+MAX_SCORED_ERROR_RATE = 0.9
+
+
+class RoutingPolicy(str, Enum):
+    LATENCY = "latency"
+    WEIGHTED = "weighted"
+    FAILOVER = "failover"
+
+
+class BackendConfig(BaseModel):
+    name: str
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    weight: float = Field(default=1.0, gt=0)
+
+
+class RouteConfig(BaseModel):
+    policy: RoutingPolicy = RoutingPolicy.LATENCY
+    backends: List[BackendConfig] = Field(min_length=1)
+
+
+class Backend:
+    """One provider and model, with rolling figures of its recent calls."""
+
+    def __init__(self, config: BackendConfig, alpha: float):
+        self.name = config.name
+        self.base_url = config.base_url
+        self.model = config.model
+        self.api_key = config.api_key
+        self.weight = config.weight
+        self.alpha = alpha
+
+        # Exponentially weighted averages; latency is unknown until sampled
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        return get_openai_client(self.base_url, self.api_key)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return circuit_breakers.get(str(self.client.base_url), self.model)
+
+    @property
+    def score(self) -> float:
+        """Expected seconds per successful call; lower is better."""
+        if self.latency is None:
+            return 0.0
+        return self.latency / (1 - min(self.error_rate, MAX_SCORED_ERROR_RATE))
+
+    def record(self, latency: Optional[float], failed: bool) -> None:
+        """
+        Fold the outcome of a call into the rolling figures.
+
+        Args:
+            latency: Duration of a successful non-streamed call, if any
+            failed: Whether the backend failed the call
+        """
+        self.error_rate += self.alpha * (float(failed) - self.error_rate)
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + self.alpha * (latency - self.latency)
+            )
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        # Public on /health, so no provider URLs or models
+        return {
+            "available": self.breaker.available,
+            "circuit": self.breaker.state.value,
+        }
+
+
+class ModelRoute:
+    """
+    The backends serving one task, and the policy that orders them.
+
+    ``latency`` prefers the backend with the lowest expected time per
+    successful call, trying unsampled backends first and sending a small
+    share of calls elsewhere to keep the figures current. ``weighted``
+    spreads calls in proportion to the backend weights. ``failover``
+    always prefers the backends in the order they are configured.
+
+    Backends whose circuit is open go last. A call moves on to the next
+    backend when one is unavailable (rate limited, failing, open circuit or
+    queue timeout); all attempts share the caller's overall deadline.
+
+    Only failures of the backend itself count against its figures: a local
+    queue timeout or the shared deadline running out do not.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        config: RouteConfig,
+        caller: LLMCaller,
+        alpha: float,
+        explore_rate: float,
+    ):
+        self.task = task
+        self.policy = config.policy
+        self.backends = [Backend(backend, alpha) for backend in config.backends]
+        self.caller = caller
+        self.explore_rate = explore_rate
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the route's models, e.g. in result cache keys."""
+        return ",".join(sorted({backend.model for backend in self.backends}))
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy.value,
+            "backends": {backend.name: backend.metrics for backend in self.backends},
+        }
+
+    def _order(self, backends: List[Backend]) -> List[Backend]:
+        if self.policy == RoutingPolicy.FAILOVER:
+            return backends
+        if self.policy == RoutingPolicy.WEIGHTED:
+            # Weighted random order without replacement
+            return sorted(
+                backends, key=lambda b: random.random() ** (1 / b.weight), reverse=True
+            )
+
+        ordered = sorted(backends, key=lambda b: (b.score, b.in_flight))
+        if len(ordered) > 1 and random.random() < self.explore_rate:
+            ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+        return ordered
+
+    def ranked(self) -> List[Backend]:
+        """Backends in the order the next call should try them."""
+        available = [b for b in self.backends if b.breaker.available]
+        unavailable = [b for b in self.backends if not b.breaker.available]
+        return self._order(available) + unavailable
+
+    async def create(self, **kwargs: Any) -> Any:
+        """
+        Create a chat completion on the best available backend.
+
+        Args:
+            **kwargs: ``chat.completions.create`` arguments except the model
+
+        Returns:
+            The chat completion
+
+        Raises:
+            UpstreamTimeoutException: If the deadline passed
+            UpstreamUnavailableException: If every backend was unavailable
+            openai.OpenAIError: For non-retryable upstream errors
+        """
+        deadline = monotonic() + self.caller.total_timeout
+        error: Optional[UpstreamUnavailableException] = None
+        for backend in self.ranked():
+            started = monotonic()
+            backend.in_flight += 1
+            try:
+                response = await self.caller.create(
+                    backend.client, model=backend.model, deadline=deadline, **kwargs
+                )
+            except (CircuitOpenException, UpstreamQueueTimeout) as e:
+                error = e
+                continue
+            except UpstreamUnavailableException as e:
+                backend.record(None, failed=True)
+                error = e
+                logger.warning(f"{self.task} backend {backend.name} unavailable: {e}")
+                continue
+            finally:
+                backend.in_flight -= 1
+
+            backend.record(monotonic() - started, failed=False)
+            return response
+
+        raise error
+
+    @asynccontextmanager
+    async def stream(self, **kwargs: Any) -> AsyncIterator[openai.AsyncStream]:
+        """
+        Open a streamed chat completion on the best available backend.
+
+        Failover only applies to opening the stream.
+
+        Args:
+            **kwargs: ``chat.completions.create`` arguments except the model
+
+        Yields:
+            openai.AsyncStream: The chunk stream
+
+        Raises:
+            UpstreamTimeoutException: If the stream did not open in time
+            UpstreamUnavailableException: If every backend was unavailable
+            openai.OpenAIError: For non-retryable upstream errors
+        """
+        deadline = monotonic() + self.caller.total_timeout
+        error: Optional[UpstreamUnavailableException] = None
+        for backend in self.ranked():
+            opened = False
+            backend.in_flight += 1
+            try:
+                async with self.caller.stream(
+                    backend.client, model=backend.model, deadline=deadline, **kwargs
+                ) as stream:
+                    opened = True
+                    backend.record(None, failed=False)
+                    yield stream
+                return
+            except (CircuitOpenException, UpstreamQueueTimeout) as e:
+                error = e
+            except UpstreamUnavailableException as e:
+                if opened:
+                    raise
+                backend.record(None, failed=True)
+                error = e
+                logger.warning(f"{self.task} backend {backend.name} unavailable: {e}")
+            finally:
+                backend.in_flight -= 1
+
+        raise error
+
+
+class ModelRouter:
+    """The routes of all tasks, built from ``LLM_BACKENDS``."""
+
+    def __init__(
+        self,
+        backends: Dict[str, Dict[str, Any]],
+        default_models: Dict[str, str],
+        alpha: float,
+        explore_rate: float,
+    ):
+        self.routes: Dict[str, ModelRoute] = {}
+        for task in {*default_models, *backends}:
+            if task in backends:
+                config = RouteConfig.model_validate(backends[task])
+            else:
+                config = RouteConfig(
+                    backends=[
+                        BackendConfig(
+                            name="default",
+                            base_url=settings.OPENAI_BASE_URL,
+                            model=default_models[task],
+                        )
+                    ]
+                )
+            self.routes[task] = ModelRoute(
+                task,
+                config,
+                LLMCaller.for_service(task),
+                alpha=alpha,
+                explore_rate=explore_rate,
+            )
+
+    def route(self, task: str) -> ModelRoute:
+        """
+        Get the route of a task.
+
+        Args:
+            task: The task name, e.g. "summarize"
+
+        Returns:
+            ModelRoute: The task's route
+        """
+        return self.routes[task]
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Policy and backend figures of every route."""
+        return {task: route.metrics for task, route in sorted(self.routes.items())}
+
+
+# Create a singleton instance
+model_router = ModelRouter(
+    backends=settings.LLM_BACKENDS,
+    default_models={
+        "summarize": settings.OPENAI_MODEL_NAME,
+        "paraphrase": settings.OPENAI_MODEL_NAME,
+        "image_to_text": settings.IMAGE_MODEL_NAME,
+    },
+    alpha=settings.LLM_ROUTER_EWMA_ALPHA,
+    explore_rate=settings.LLM_ROUTER_EXPLORE_RATE,
+)
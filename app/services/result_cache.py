@@ -0,0 +1,259 @@
+"""
+AI Result Cache Service
+
+This module caches AI tool results keyed by a hash of the model, the
+request options and the normalized input text, so repeated identical
+requests are answered without calling the upstream API.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from time import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheBackend(ABC):
+    """Storage backend for cached results."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        """Get a cached result, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        """Store a result for ``ttl`` seconds."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache: TTLCache[str, dict] = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Local persistent backend stored in a SQLite file.
+
+    Entries survive restarts and are shared by workers on the same host.
+    Queries run in a worker thread so they never block the event loop.
+    Once ``max_entries`` is exceeded, the least recently read entries are
+    evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_result_cache_accessed_at "
+                "ON result_cache (accessed_at)"
+            )
+
+    def _get(self, key: str) -> Optional[dict]:
+        now = time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM result_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: dict, ttl: float) -> None:
+        now = time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._conn.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM result_cache WHERE key IN ("
+                "SELECT key FROM result_cache ORDER BY accessed_at "
+                "LIMIT max((SELECT count(*) FROM result_cache) - ?, 0))",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize input text for cache keys.
+
+    Trailing and repeated spaces, line ending styles and runs of blank
+    lines are ignored; paragraph breaks are kept.
+
+    Args:
+        text: The input text
+
+    Returns:
+        str: The normalized text
+    """
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class ResultCache:
+    """
+    Result cache with hit, miss and bypass counters.
+
+    Results are only ever looked up by a key from :meth:`make_key`, so any
+    change of model, options or text gives a different entry.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Counters describing cache effectiveness."""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "errors": self.errors,
+        }
+
+    @staticmethod
+    def make_key(namespace: str, model: str, text: str, **options: Any) -> str:
+        """
+        Build a cache key for a request.
+
+        Args:
+            namespace: The tool name (e.g. "summarize")
+            model: The model that produces the result
+            text: The input text; normalized before hashing
+            **options: Request options that affect the result
+
+        Returns:
+            str: Hex SHA-256 digest identifying the request
+        """
+        payload = json.dumps(
+            {
+                "namespace": namespace,
+                "model": model,
+                "options": options,
+                "text": normalize_text(text),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str, bypass: bool = False) -> Optional[dict]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from :meth:`make_key`
+            bypass: Skip the lookup (e.g. for ``Cache-Control: no-cache``)
+
+        Returns:
+            Optional[dict]: The cached result, if any
+        """
+        if not self.enabled:
+            return None
+        if bypass:
+            self.bypasses += 1
+            return None
+
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Result cache lookup failed: {str(e)}")
+            return None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        """
+        Store a result.
+
+        Args:
+            key: Key from :meth:`make_key`
+            value: The result to cache
+        """
+        if not self.enabled:
+            return
+
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Result cache store failed: {str(e)}")
+
+
+def create_result_cache() -> ResultCache:
+    """Create the result cache configured in the settings."""
+    backend: Optional[CacheBackend] = None
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            ttl=settings.RESULT_CACHE_TTL_SECONDS,
+        )
+    elif settings.RESULT_CACHE_BACKEND == "sqlite":
+        backend = SQLiteCacheBackend(
+            path=settings.RESULT_CACHE_SQLITE_PATH,
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+        )
+    elif settings.RESULT_CACHE_BACKEND != "none":
+        raise ValueError(
+            f"Unknown result cache backend: {settings.RESULT_CACHE_BACKEND}"
+        )
+
+    return ResultCache(backend=backend, ttl=settings.RESULT_CACHE_TTL_SECONDS)
+
+
+# Create a singleton instance
+result_cache = create_result_cache()
@@ -0,0 +1,101 @@
+"""
+Streaming Completion Helpers
+
+This module provides helpers for turning streamed chat completion deltas
+into client-facing text.
+"""
+
+from typing import AsyncIterator
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class ThinkFilter:
+    """
+    Removes ``<think>...</think>`` reasoning blocks from streamed text.
+
+    Reasoning models emit their chain of thought inline before the answer.
+    Tags may be split across deltas, so a possible partial tag at the end
+    of a delta is held back until the next one arrives. Leading whitespace
+    of the answer is dropped as well.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._thinking = False
+        self._started = False
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """Length of the longest suffix of ``text`` that prefixes ``tag``."""
+        for length in range(min(len(text), len(tag) - 1), 0, -1):
+            if tag.startswith(text[-length:]):
+                return length
+        return 0
+
+    def feed(self, delta: str) -> str:
+        """
+        Process a streamed delta.
+
+        Args:
+            delta: The next piece of streamed content
+
+        Returns:
+            str: Text that is safe to forward to the client (may be empty)
+        """
+        self._buffer += delta
+        output = []
+
+        while self._buffer:
+            tag = THINK_CLOSE if self._thinking else THINK_OPEN
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._thinking:
+                    output.append(self._buffer[:index])
+                self._buffer = self._buffer[index + len(tag) :]
+                self._thinking = not self._thinking
+                continue
+
+            keep = self._partial_tag_length(self._buffer, tag)
+            if not self._thinking:
+                output.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+
+        return self._emit("".join(output))
+
+    def flush(self) -> str:
+        """Return any held-back text once the stream has ended."""
+        text = "" if self._thinking else self._buffer
+        self._buffer = ""
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+async def iter_content(stream: AsyncIterator) -> AsyncIterator[str]:
+    """
+    Yield the answer text of a streamed chat completion.
+
+    Args:
+        stream: The chat completion chunk stream
+
+    Yields:
+        str: Non-empty pieces of answer text, without reasoning blocks
+    """
+    think_filter = ThinkFilter()
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        text = think_filter.feed(chunk.choices[0].delta.content or "")
+        if text:
+            yield text
+
+    text = think_filter.flush()
+    if text:
+        yield text
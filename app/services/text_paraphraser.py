@@ -6,11 +6,13 @@ This module provides text paraphrasing functionality using an external API.
 
 import json
 from enum import Enum
-from typing import Optional
-from openai import AsyncOpenAI
-from pydantic import BaseModel, Field
+from typing import AsyncIterator
 
-from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.model_router import model_router
+from app.services.result_cache import result_cache
+from app.services.streaming import iter_content
+from app.services.upstream_scheduler import UpstreamException
 
 
 class ParaphraseStyle(str, Enum):
@@ -39,10 +41,8 @@ class TextParaphraserException(Exception):
 
 class TextParaphraser:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.GROK_API_KEY, base_url=settings.OPENAI_BASE_URL
-        )
-        self.model = settings.OPENAI_MODEL_NAME
+        self.inflight = SingleFlight()
+        self.route = model_router.route("paraphrase")
 
     def _create_prompt(
         self,
@@ -50,6 +50,7 @@ class TextParaphraser:
         style: ParaphraseStyle,
         intensity: ParaphraseIntensity,
         length_option: LengthOption,
+        stream: bool = False,
     ) -> str:
         base_prompt = """You are a helpful assistant that paraphrases text.
 
@@ -115,6 +116,12 @@ Return ONLY valid JSON with the structure:
     "paraphrased_text": "Your paraphrased text here..."
 }"""
 
+        if stream:
+            # Streamed output is forwarded as-is, so it must be plain text
+            output_format = """
+**Output Requirements**:
+Return ONLY the paraphrased text, without any preamble or JSON wrapping."""
+
         return f"{base_prompt}\n{style_guidelines[style]}\n{intensity_guidelines[intensity]}\n{length_guidelines[length_option]}\n{output_format}"
 
     async def paraphrase(
@@ -123,6 +130,7 @@ Return ONLY valid JSON with the structure:
         style: ParaphraseStyle,
         intensity: ParaphraseIntensity = ParaphraseIntensity.MEDIUM,
         length_option: LengthOption = LengthOption.SAME,
+        use_cache: bool = True,
     ) -> dict:
         """
         Paraphrase the given text using the specified style, intensity, and length option.
@@ -132,6 +140,8 @@ Return ONLY valid JSON with the structure:
             style: The paraphrasing style (formal, casual, or simple)
             intensity: The paraphrasing intensity level (low, medium, or high)
             length_option: The desired length of the output (same, shorter, or longer)
+            use_cache: Whether a cached result may be returned; fresh results
+                are cached either way
 
         Returns:
             dict: Contains 'paraphrased_text' with the result
@@ -139,13 +149,45 @@ Return ONLY valid JSON with the structure:
         Raises:
             TextParaphraserException: If there's an error during paraphrasing
         """
+        cache_key = result_cache.make_key(
+            "paraphrase",
+            self.route.model_id,
+            text,
+            style=style.value,
+            intensity=intensity.value,
+            length_option=length_option.value,
+        )
+        cached = await result_cache.get(cache_key, bypass=not use_cache)
+        if cached is not None:
+            return cached
+
+        # Identical concurrent requests share one upstream call
+        return await self.inflight.do(
+            cache_key,
+            lambda: self._paraphrase(
+                cache_key=cache_key,
+                text=text,
+                style=style,
+                intensity=intensity,
+                length_option=length_option,
+            ),
+        )
+
+    async def _paraphrase(
+        self,
+        cache_key: str,
+        text: str,
+        style: ParaphraseStyle,
+        intensity: ParaphraseIntensity,
+        length_option: LengthOption,
+    ) -> dict:
+        """Call the upstream API and cache the validated result."""
         try:
             prompt = self._create_prompt(
                 text=text, style=style, intensity=intensity, length_option=length_option
             )
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self.route.create(
                 messages=[
                     {"role": "system", "content": prompt},
                     {"role": "user", "content": text},
@@ -163,13 +205,87 @@ Return ONLY valid JSON with the structure:
                     "Invalid response: missing 'paraphrased_text' field"
                 )
 
-            return result
-
+        except UpstreamException:
+            raise
         except json.JSONDecodeError as e:
             raise TextParaphraserException("Failed to parse paraphraser response")
         except Exception as e:
             raise TextParaphraserException(f"Paraphrasing failed: {str(e)}")
 
+        await result_cache.set(cache_key, result)
+        return result
+
+    async def stream_paraphrase(
+        self,
+        text: str,
+        style: ParaphraseStyle,
+        intensity: ParaphraseIntensity = ParaphraseIntensity.MEDIUM,
+        length_option: LengthOption = LengthOption.SAME,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Paraphrase the given text, yielding the result as it is generated.
+
+        The complete paraphrase is stored in the result cache, and a cached
+        paraphrase is yielded in one piece.
+
+        Args:
+            text: The text to paraphrase
+            style: The paraphrasing style (formal, casual, or simple)
+            intensity: The paraphrasing intensity level (low, medium, or high)
+            length_option: The desired length of the output (same, shorter, or longer)
+            use_cache: Whether a cached result may be returned
+
+        Yields:
+            str: Successive pieces of the paraphrased text
+
+        Raises:
+            TextParaphraserException: If there's an error during paraphrasing
+        """
+        cache_key = result_cache.make_key(
+            "paraphrase",
+            self.route.model_id,
+            text,
+            style=style.value,
+            intensity=intensity.value,
+            length_option=length_option.value,
+        )
+        cached = await result_cache.get(cache_key, bypass=not use_cache)
+        if cached is not None:
+            yield cached["paraphrased_text"]
+            return
+
+        parts = []
+        try:
+            prompt = self._create_prompt(
+                text=text,
+                style=style,
+                intensity=intensity,
+                length_option=length_option,
+                stream=True,
+            )
+
+            async with self.route.stream(
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.7,
+            ) as stream:
+                async for piece in iter_content(stream):
+                    parts.append(piece)
+                    yield piece
+
+        except UpstreamException:
+            raise
+        except Exception as e:
+            raise TextParaphraserException(f"Paraphrasing failed: {str(e)}")
+
+        if not parts:
+            raise TextParaphraserException("Invalid response: empty paraphrase")
+
+        await result_cache.set(cache_key, {"paraphrased_text": "".join(parts).rstrip()})
+
 
 # Create a singleton instance
 paraphraser = TextParaphraser()
@@ -4,13 +4,18 @@ Text Summarization Service
 This module provides text summarization functionality using an external API.
 """
 
+import asyncio
 import json
 from enum import Enum
-from typing import List, Optional
-from openai import AsyncOpenAI
-from pydantic import BaseModel, Field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.chunking import estimate_tokens, split_text
+from app.services.model_router import model_router
+from app.services.result_cache import result_cache
+from app.services.streaming import iter_content
+from app.services.upstream_scheduler import UpstreamException
 
 
 class SummaryMode(str, Enum):
@@ -27,10 +32,11 @@ class TextSummarizerException(Exception):
 
 class TextSummarizer:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.GROK_API_KEY, base_url=settings.OPENAI_BASE_URL
-        )
-        self.model = settings.OPENAI_MODEL_NAME
+        self.inflight = SingleFlight()
+        self.route = model_router.route("summarize")
+        self.chunk_tokens = settings.SUMMARY_CHUNK_TOKENS
+        self.max_parallel_chunks = settings.SUMMARY_MAX_PARALLEL_CHUNKS
+        self.max_reduce_rounds = settings.SUMMARY_MAX_REDUCE_ROUNDS
 
     def _create_prompt(
         self,
@@ -39,6 +45,7 @@ class TextSummarizer:
         max_length: Optional[int] = None,
         custom_instructions: Optional[str] = None,
         extract_keywords: bool = False,
+        stream: bool = False,
     ) -> str:
         base_prompt = """You are a helpful assistant that summarizes text.
 
@@ -96,6 +103,12 @@ Return ONLY valid JSON with the structure:
 }"""
         )
 
+        if stream:
+            # Streamed output is forwarded as-is, so it must be plain text
+            output_format = """
+**Output Requirements**:
+Return ONLY the summary text, without any preamble or JSON wrapping."""
+
         return f"{base_prompt}\n{mode_specific[mode]}\n{keyword_extraction}\n{output_format}"
 
     async def summarize(
@@ -105,6 +118,7 @@ Return ONLY valid JSON with the structure:
         max_length: Optional[int] = None,
         custom_instructions: Optional[str] = None,
         extract_keywords: bool = False,
+        use_cache: bool = True,
     ) -> dict:
         """
         Summarize the given text using the specified mode and parameters.
@@ -115,6 +129,8 @@ Return ONLY valid JSON with the structure:
             max_length: Optional maximum length for paragraph mode
             custom_instructions: Optional custom instructions for custom mode
             extract_keywords: Whether to extract key terms from the text
+            use_cache: Whether a cached result may be returned; fresh results
+                are cached either way
 
         Returns:
             dict: Contains 'summary' and optionally 'keywords' if extract_keywords is True
@@ -122,6 +138,136 @@ Return ONLY valid JSON with the structure:
         Raises:
             TextSummarizerException: If there's an error during summarization
         """
+        cache_key = result_cache.make_key(
+            "summarize",
+            self.route.model_id,
+            text,
+            mode=mode.value,
+            max_length=max_length,
+            custom_instructions=custom_instructions,
+            extract_keywords=extract_keywords,
+        )
+        cached = await result_cache.get(cache_key, bypass=not use_cache)
+        if cached is not None:
+            return cached
+
+        # Identical concurrent requests share one upstream call
+        return await self.inflight.do(
+            cache_key,
+            lambda: self._summarize(
+                cache_key=cache_key,
+                text=text,
+                mode=mode,
+                max_length=max_length,
+                custom_instructions=custom_instructions,
+                extract_keywords=extract_keywords,
+            ),
+        )
+
+    async def _summarize(
+        self,
+        cache_key: str,
+        text: str,
+        mode: SummaryMode,
+        max_length: Optional[int],
+        custom_instructions: Optional[str],
+        extract_keywords: bool,
+    ) -> dict:
+        """Summarize the text, map-reducing long texts, and cache the result."""
+        if estimate_tokens(text) <= self.chunk_tokens:
+            result = await self._complete(
+                text=text,
+                mode=mode,
+                max_length=max_length,
+                custom_instructions=custom_instructions,
+                extract_keywords=extract_keywords,
+            )
+        else:
+            condensed, keywords = await self._condense(text, extract_keywords)
+            result = await self._complete(
+                text=condensed,
+                mode=mode,
+                max_length=max_length,
+                custom_instructions=custom_instructions,
+            )
+            if extract_keywords:
+                result["keywords"] = keywords
+
+        await result_cache.set(cache_key, result)
+        return result
+
+    async def _condense(
+        self, text: str, extract_keywords: bool = False
+    ) -> Tuple[str, List[str]]:
+        """
+        Condense a text that exceeds the chunk budget.
+
+        The text is split into chunks that are summarized concurrently (map).
+        While the joined partial summaries still exceed the budget, they are
+        chunked and summarized again (hierarchical reduce), for at most
+        ``SUMMARY_MAX_REDUCE_ROUNDS`` rounds and only while each round
+        shrinks the text.
+
+        Args:
+            text: The text to condense
+            extract_keywords: Whether to extract keywords from each chunk
+
+        Returns:
+            Tuple[str, List[str]]: The joined partial summaries, which fit in
+            one request unless reducing stopped early, and the keywords merged
+            across chunks
+
+        Raises:
+            TextSummarizerException: If summarizing any chunk fails
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_chunks)
+
+        async def summarize_chunks(chunks: List[str], keywords: bool) -> List[dict]:
+            async def summarize_chunk(chunk: str) -> dict:
+                async with semaphore:
+                    return await self._complete(
+                        text=chunk,
+                        mode=SummaryMode.PARAGRAPH,
+                        extract_keywords=keywords,
+                    )
+
+            return await asyncio.gather(*(summarize_chunk(c) for c in chunks))
+
+        results = await summarize_chunks(
+            split_text(text, self.chunk_tokens), extract_keywords
+        )
+        keywords = (
+            merge_keywords(r.get("keywords") or [] for r in results)
+            if extract_keywords
+            else []
+        )
+
+        combined = "\n\n".join(r["summary"] for r in results)
+        tokens = estimate_tokens(combined)
+        for _ in range(self.max_reduce_rounds):
+            if tokens <= self.chunk_tokens or len(results) <= 1:
+                break
+            results = await summarize_chunks(
+                split_text(combined, self.chunk_tokens), False
+            )
+            reduced = "\n\n".join(r["summary"] for r in results)
+            reduced_tokens = estimate_tokens(reduced)
+            if reduced_tokens >= tokens:
+                # Summaries that no longer shrink would loop forever
+                break
+            combined, tokens = reduced, reduced_tokens
+
+        return combined, keywords
+
+    async def _complete(
+        self,
+        text: str,
+        mode: SummaryMode,
+        max_length: Optional[int] = None,
+        custom_instructions: Optional[str] = None,
+        extract_keywords: bool = False,
+    ) -> dict:
+        """Summarize text that fits in a single upstream request."""
         try:
             prompt = self._create_prompt(
                 text=text,
@@ -131,8 +277,7 @@ Return ONLY valid JSON with the structure:
                 extract_keywords=extract_keywords,
             )
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self.route.create(
                 messages=[
                     {"role": "system", "content": prompt},
                     {"role": "user", "content": text},
@@ -150,18 +295,136 @@ Return ONLY valid JSON with the structure:
                     "Invalid response: missing 'summary' field"
                 )
 
-            if extract_keywords and "keywords" not in result:
-                raise TextSummarizerException(
-                    "Invalid response: missing 'keywords' field"
-                )
-
-            return result
+            if extract_keywords:
+                keywords = result.get("keywords")
+                if keywords is None:
+                    raise TextSummarizerException(
+                        "Invalid response: missing 'keywords' field"
+                    )
+                if not isinstance(keywords, list) or not all(
+                    isinstance(keyword, str) for keyword in keywords
+                ):
+                    raise TextSummarizerException(
+                        "Invalid response: 'keywords' must be a list of strings"
+                    )
 
+        except UpstreamException:
+            raise
         except json.JSONDecodeError as e:
             raise TextSummarizerException("Failed to parse summarizer response")
         except Exception as e:
             raise TextSummarizerException(f"Summarization failed: {str(e)}")
 
+        return result
+
+    async def stream_summary(
+        self,
+        text: str,
+        mode: SummaryMode,
+        max_length: Optional[int] = None,
+        custom_instructions: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Summarize the given text, yielding the summary as it is generated.
+
+        Keyword extraction is not available in streaming mode. The complete
+        summary is stored in the result cache, and a cached summary is
+        yielded in one piece.
+
+        Args:
+            text: The text to summarize
+            mode: The summarization mode (paragraph, bullet_points, or custom)
+            max_length: Optional maximum length for paragraph mode
+            custom_instructions: Optional custom instructions for custom mode
+            use_cache: Whether a cached result may be returned
+
+        Yields:
+            str: Successive pieces of the summary text
+
+        Raises:
+            TextSummarizerException: If there's an error during summarization
+        """
+        cache_key = result_cache.make_key(
+            "summarize",
+            self.route.model_id,
+            text,
+            mode=mode.value,
+            max_length=max_length,
+            custom_instructions=custom_instructions,
+            extract_keywords=False,
+        )
+        cached = await result_cache.get(cache_key, bypass=not use_cache)
+        if cached is not None:
+            yield cached["summary"]
+            return
+
+        # Long texts are condensed first; only the final reduce is streamed
+        if estimate_tokens(text) > self.chunk_tokens:
+            text, _ = await self._condense(text)
+
+        parts = []
+        try:
+            prompt = self._create_prompt(
+                text=text,
+                mode=mode,
+                max_length=max_length,
+                custom_instructions=custom_instructions,
+                stream=True,
+            )
+
+            async with self.route.stream(
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.5,
+            ) as stream:
+                async for piece in iter_content(stream):
+                    parts.append(piece)
+                    yield piece
+
+        except UpstreamException:
+            raise
+        except Exception as e:
+            raise TextSummarizerException(f"Summarization failed: {str(e)}")
+
+        if not parts:
+            raise TextSummarizerException("Invalid response: empty summary")
+
+        await result_cache.set(cache_key, {"summary": "".join(parts).rstrip()})
+
+
+def merge_keywords(keyword_lists: Iterable[List[str]], limit: int = 7) -> List[str]:
+    """
+    Merge keywords extracted from several chunks.
+
+    Keywords are matched case-insensitively and ranked by the number of
+    chunks they appear in, ties broken by first appearance.
+
+    Args:
+        keyword_lists: Keywords extracted from each chunk
+        limit: Maximum number of keywords to return
+
+    Returns:
+        List[str]: The most frequent keywords
+    """
+    counts: Dict[str, int] = {}
+    first_seen: Dict[str, str] = {}
+    for keywords in keyword_lists:
+        seen = set()
+        for keyword in keywords:
+            keyword = keyword.strip()
+            key = keyword.lower()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            counts[key] = counts.get(key, 0) + 1
+            first_seen.setdefault(key, keyword)
+
+    ranked = sorted(counts, key=lambda key: -counts[key])
+    return [first_seen[key] for key in ranked[:limit]]
+
 
 # Create a singleton instance
 summarizer = TextSummarizer()
@@ -0,0 +1,329 @@
+"""
+Upstream Request Scheduler
+
+This module bounds how many chat completion calls the AI services make to
+the upstream API at once. Calls beyond the global or per-model limit wait
+in fair per-API-key queues, served interactive-first, and give up with a
+retryable error if they wait too long.
+"""
+
+import asyncio
+import math
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from time import monotonic
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Iterator, Optional
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """Scheduling class of an upstream call; lower values are served first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class UpstreamException(Exception):
+    """Base exception for upstream API failures outside the request's control"""
+
+    pass
+
+
+class UpstreamUnavailableException(UpstreamException):
+    """The upstream API cannot take the call right now"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamQueueTimeout(UpstreamUnavailableException):
+    """The call waited too long for an upstream slot"""
+
+    pass
+
+
+class UpstreamTimeoutException(UpstreamException, TimeoutError):
+    """The upstream API did not answer within the call's deadline"""
+
+    pass
+
+
+# Who the current request is on behalf of, and how urgent it is. Set once
+# per request so the services do not have to pass them down explicitly.
+_client_key: ContextVar[Optional[Hashable]] = ContextVar(
+    "upstream_client_key", default=None
+)
+_priority: ContextVar[Priority] = ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE
+)
+
+
+def set_client_key(client_key: Hashable) -> None:
+    """
+    Set the key used to queue the current request's upstream calls fairly.
+
+    Args:
+        client_key: Identifies the caller, e.g. the API key ID
+    """
+    _client_key.set(client_key)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """
+    Run the upstream calls made inside the block with the given priority.
+
+    Args:
+        level: The priority class
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("model", "future", "enqueued_at")
+
+    def __init__(self, model: str, future: asyncio.Future):
+        self.model = model
+        self.future = future
+        self.enqueued_at = monotonic()
+
+
+class UpstreamScheduler:
+    """
+    Admission control for upstream calls.
+
+    Each priority class keeps one FIFO queue per client key, and the keys
+    are served round-robin, so a single busy key cannot starve the others.
+    A waiter is only skipped when its model is at its concurrency limit.
+    Like ``TTLCache``, it is meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_concurrency_per_model: int,
+        model_concurrency: Dict[str, int],
+        queue_timeouts: Dict[Priority, float],
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.model_concurrency = model_concurrency
+        self.queue_timeouts = queue_timeouts
+
+        self._queues: Dict[Priority, "OrderedDict[Hashable, Deque[_Waiter]]"] = {
+            level: OrderedDict() for level in Priority
+        }
+        self._in_flight = 0
+        self._in_flight_by_model: Dict[str, int] = {}
+
+        # Exponentially weighted averages used for metrics and Retry-After
+        self._avg_wait = 0.0
+        self._avg_hold = 1.0
+        self.granted = 0
+        self.timeouts = 0
+
+    def _model_limit(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.max_concurrency_per_model)
+
+    def _has_capacity(self, model: str) -> bool:
+        if self._in_flight >= self.max_concurrency:
+            return False
+        return self._in_flight_by_model.get(model, 0) < self._model_limit(model)
+
+    def queue_depth(self, level: Optional[Priority] = None) -> int:
+        """Number of calls waiting, optionally for one priority class."""
+        levels = [level] if level is not None else list(Priority)
+        return sum(
+            len(waiters) for lvl in levels for waiters in self._queues[lvl].values()
+        )
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a newly queued call would be served."""
+        backlog = self.queue_depth() + 1
+        return max(1, math.ceil(self._avg_hold * backlog / self.max_concurrency))
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait time figures."""
+        return {
+            "in_flight": self._in_flight,
+            "in_flight_by_model": dict(self._in_flight_by_model),
+            "queued": {
+                level.name.lower(): self.queue_depth(level) for level in Priority
+            },
+            "granted": self.granted,
+            "timeouts": self.timeouts,
+            "avg_wait_seconds": round(self._avg_wait, 3),
+            "avg_call_seconds": round(self._avg_hold, 3),
+        }
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for level in Priority:
+            clients = self._queues[level]
+            for client_key in list(clients):
+                waiters = clients[client_key]
+                for index, waiter in enumerate(waiters):
+                    if self._has_capacity(waiter.model):
+                        del waiters[index]
+                        if waiters:
+                            clients.move_to_end(client_key)
+                        else:
+                            del clients[client_key]
+                        return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued waiters."""
+        while self._in_flight < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+
+            self._in_flight += 1
+            self._in_flight_by_model[waiter.model] = (
+                self._in_flight_by_model.get(waiter.model, 0) + 1
+            )
+            self.granted += 1
+            wait = monotonic() - waiter.enqueued_at
+            self._avg_wait = 0.9 * self._avg_wait + 0.1 * wait
+            waiter.future.set_result(None)
+
+    def _remove(self, level: Priority, client_key: Hashable, waiter: _Waiter) -> None:
+        waiters = self._queues[level].get(client_key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        if not waiters:
+            del self._queues[level][client_key]
+
+    def _release(self, model: str, held: float) -> None:
+        self._in_flight -= 1
+        self._in_flight_by_model[model] -= 1
+        if not self._in_flight_by_model[model]:
+            del self._in_flight_by_model[model]
+        self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+        self._dispatch()
+
+    async def acquire(self, model: str) -> None:
+        """
+        Wait for an upstream slot for a model.
+
+        The client key and priority are taken from the current context
+        (see :func:`set_client_key` and :func:`priority`).
+
+        Args:
+            model: The model the call will use
+
+        Raises:
+            UpstreamQueueTimeout: If no slot became free within the queue
+                timeout of the call's priority class
+        """
+        level = _priority.get()
+        client_key = _client_key.get()
+        waiter = _Waiter(model, asyncio.get_running_loop().create_future())
+        self._queues[level].setdefault(client_key, deque()).append(waiter)
+        self._dispatch()
+        if waiter.future.done():
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter.future), self.queue_timeouts[level]
+            )
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                # Granted just as the timeout fired
+                return
+            self._remove(level, client_key, waiter)
+            self.timeouts += 1
+            retry_after = self.retry_after()
+            logger.warning(
+                f"Upstream queue timeout for model {model} "
+                f"({level.name.lower()}, retry after {retry_after}s)"
+            )
+            raise UpstreamQueueTimeout(
+                "Upstream service is busy, please retry later", retry_after
+            )
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                self._release(model, 0.0)
+            else:
+                self._remove(level, client_key, waiter)
+            raise
+
+    def try_acquire(self, model: str) -> bool:
+        """
+        Take an upstream slot only if one is free and no call is waiting.
+
+        Used for optional extra calls (such as hedged requests) that should
+        never delay queued work.
+
+        Args:
+            model: The model the call will use
+
+        Returns:
+            bool: True if a slot was taken; pass ``acquired=True`` to
+            :meth:`slot` to use it
+        """
+        if self.queue_depth() or not self._has_capacity(model):
+            return False
+        self._in_flight += 1
+        self._in_flight_by_model[model] = self._in_flight_by_model.get(model, 0) + 1
+        self.granted += 1
+        return True
+
+    def release(self, model: str) -> None:
+        """
+        Give back a slot taken with :meth:`try_acquire` that went unused.
+
+        Args:
+            model: The model the slot was taken for
+        """
+        self._release(model, self._avg_hold)
+
+    @asynccontextmanager
+    async def slot(self, model: str, acquired: bool = False) -> AsyncIterator[None]:
+        """
+        Hold an upstream slot for the duration of the block.
+
+        Args:
+            model: The model the call will use
+            acquired: Whether the slot was already taken with
+                :meth:`try_acquire`
+
+        Raises:
+            UpstreamQueueTimeout: If no slot became free in time
+        """
+        if not acquired:
+            await self.acquire(model)
+        started = monotonic()
+        try:
+            yield
+        finally:
+            self._release(model, monotonic() - started)
+
+
+# Create a singleton instance
+upstream_scheduler = UpstreamScheduler(
+    max_concurrency=settings.UPSTREAM_MAX_CONCURRENCY,
+    max_concurrency_per_model=settings.UPSTREAM_MAX_CONCURRENCY_PER_MODEL,
+    model_concurrency=settings.UPSTREAM_MODEL_CONCURRENCY,
+    queue_timeouts={
+        Priority.INTERACTIVE: settings.UPSTREAM_QUEUE_TIMEOUT_SECONDS,
+        Priority.BATCH: settings.UPSTREAM_BATCH_QUEUE_TIMEOUT_SECONDS,
+    },
+)
@@ -0,0 +1,223 @@
+"""
+API Key Usage Log Writer
+
+This module buffers API key usage records in memory and writes them to the
+database in batches from a background task, keeping the INSERT off the
+request latency path.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import engine, register_close_hook
+from app.core.logging_config import get_logger
+from app.models import APIKeyUsage
+from app.services.usage_rollups import (
+    build_histogram_rows,
+    build_rollup_rows,
+    upsert_histograms,
+    upsert_rollups,
+)
+
+logger = get_logger(__name__)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+class UsageLogWriter:
+    """
+    Bounded, batching writer for ``api_key_usage`` rows.
+
+    Records are queued with :meth:`submit` and drained by a background task
+    that issues one multi-row INSERT per batch and updates the usage rollups
+    in the same transaction. When the queue is full the configured drop
+    policy decides whether the new record or the oldest queued record is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        drop_policy: str = DROP_NEWEST,
+    ):
+        if drop_policy not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown usage log drop policy: {drop_policy}")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+
+        # Metrics
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Counters describing the writer's throughput and losses."""
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    def submit(
+        self,
+        api_key_id: int,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time: float,
+        ip_address: Optional[str],
+        user_agent: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue a usage record for the background writer.
+
+        Args:
+            api_key_id: The ID of the API key
+            endpoint: The endpoint that was accessed
+            method: HTTP method used
+            status_code: Response status code
+            response_time: Response time in seconds
+            ip_address: Client IP address
+            user_agent: Client user agent
+
+        Returns:
+            bool: False if the record was dropped because the queue is full
+        """
+        row = {
+            "api_key_id": api_key_id,
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "response_time": response_time,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": datetime.utcnow(),
+        }
+
+        return self._enqueue(row)
+
+    def submit_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Queue several usage records at once, e.g. for the items of a batch.
+
+        Args:
+            rows: Records with the keyword arguments of :meth:`submit`
+
+        Returns:
+            int: Number of records queued; the rest were dropped
+        """
+        created_at = datetime.utcnow()
+        return sum(
+            self._enqueue({"user_agent": None, **row, "created_at": created_at})
+            for row in rows
+        )
+
+    def _enqueue(self, row: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.drop_policy == DROP_NEWEST:
+                return False
+            # Make room by discarding the oldest queued record
+            self._queue.get_nowait()
+            self._queue.put_nowait(row)
+
+        self.enqueued += 1
+        return True
+
+    async def _collect(self) -> List[Dict[str, Any]]:
+        """Collect up to one batch, waiting at most one flush interval."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch: List[Dict[str, Any]] = []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if self._closing.is_set() or timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch of usage rows and fold it into the rollups."""
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(APIKeyUsage.__table__), batch)
+                await upsert_rollups(conn, build_rollup_rows(batch))
+                await upsert_histograms(conn, build_histogram_rows(batch))
+            self.flushed += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} usage log rows: {str(e)}")
+
+    async def _run(self) -> None:
+        """Drain the queue in batches until closed and empty."""
+        while not (self._closing.is_set() and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    def start(self) -> None:
+        """Start the background writer and drain it on shutdown."""
+        self._closing.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        register_close_hook(self.stop)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting new batches and write everything still queued.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Usage log writer did not drain in time",
+                    extra={"queued": self._queue.qsize()},
+                )
+            self._task = None
+
+        logger.info("Usage log writer stopped", extra=self.metrics)
+
+
+# Create a singleton instance
+usage_log_writer = UsageLogWriter(
+    max_queue_size=settings.USAGE_LOG_QUEUE_SIZE,
+    batch_size=settings.USAGE_LOG_BATCH_SIZE,
+    flush_interval=settings.USAGE_LOG_FLUSH_SECONDS,
+    drop_policy=settings.USAGE_LOG_DROP_POLICY,
+)
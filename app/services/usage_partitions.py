@@ -0,0 +1,209 @@
+"""
+API Key Usage Partition Maintenance
+
+This module keeps the monthly range partitions of ``api_key_usage`` in
+shape: it pre-creates partitions for upcoming months and drops partitions
+that have fallen out of the retention window, so old usage is removed
+without bulk DELETEs. It also prunes hourly latency histograms older than
+the longest window read from them.
+"""
+
+import asyncio
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import delete, text
+
+from app.core.config import settings
+from app.core.database import engine, register_close_hook
+from app.core.logging_config import get_logger
+from app.models import APIKeyLatencyHistogram, RollupGranularity
+
+logger = get_logger(__name__)
+
+PARENT_TABLE = "api_key_usage"
+PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# Serializes partition DDL across workers sharing the database
+LOCK_SQL = text("SELECT pg_advisory_xact_lock(hashtext('api_key_usage_partitions'))")
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Shift the first day of a month by a number of months.
+
+    Args:
+        month: The first day of a month
+        months: Number of months to add (may be negative)
+
+    Returns:
+        date: The first day of the resulting month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Get the partition table name for a month."""
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+class UsagePartitionManager:
+    """
+    Creates upcoming and drops expired monthly ``api_key_usage`` partitions,
+    and prunes expired hourly latency histograms.
+    """
+
+    def __init__(
+        self,
+        retention_months: int,
+        months_ahead: int,
+        interval: float,
+        hourly_histogram_retention_days: int,
+    ):
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+        self.interval = interval
+        self.hourly_histogram_retention_days = hourly_histogram_retention_days
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_partitions(self, today: Optional[date] = None) -> List[str]:
+        """
+        Create partitions for the current month and the months ahead.
+
+        Args:
+            today: Reference date (defaults to the current UTC date)
+
+        Returns:
+            List[str]: Names of the partitions that were checked or created
+        """
+        current = (today or datetime.utcnow().date()).replace(day=1)
+        names = []
+
+        async with engine.begin() as conn:
+            await conn.execute(LOCK_SQL)
+            for offset in range(self.months_ahead + 1):
+                month = add_months(current, offset)
+                name = partition_name(month)
+                await conn.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" '
+                        f'PARTITION OF "{PARENT_TABLE}" '
+                        f"FOR VALUES FROM ('{month.isoformat()}') "
+                        f"TO ('{add_months(month, 1).isoformat()}')"
+                    )
+                )
+                names.append(name)
+
+        return names
+
+    async def drop_expired_partitions(self, today: Optional[date] = None) -> List[str]:
+        """
+        Drop partitions whose whole range is older than the retention window.
+
+        Args:
+            today: Reference date (defaults to the current UTC date)
+
+        Returns:
+            List[str]: Names of the dropped partitions
+        """
+        current = (today or datetime.utcnow().date()).replace(day=1)
+        cutoff = add_months(current, -self.retention_months)
+        dropped = []
+
+        async with engine.begin() as conn:
+            await conn.execute(LOCK_SQL)
+            result = await conn.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE parent.relname = :parent"
+                ),
+                {"parent": PARENT_TABLE},
+            )
+
+            for (name,) in result.all():
+                match = PARTITION_NAME_RE.match(name)
+                if not match:
+                    continue
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                if add_months(month, 1) <= cutoff:
+                    await conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                    dropped.append(name)
+
+        if dropped:
+            logger.info(
+                "Dropped expired usage partitions", extra={"partitions": dropped}
+            )
+        return dropped
+
+    async def prune_hourly_histograms(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete hourly latency histograms older than their retention window.
+
+        Args:
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            int: Number of deleted histogram rows
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(
+            days=self.hourly_histogram_retention_days
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                delete(APIKeyLatencyHistogram).where(
+                    APIKeyLatencyHistogram.granularity == RollupGranularity.HOUR,
+                    APIKeyLatencyHistogram.bucket_start < cutoff,
+                )
+            )
+
+        if result.rowcount:
+            logger.info(f"Deleted {result.rowcount} expired hourly latency histograms")
+        return result.rowcount
+
+    async def run_maintenance(self) -> None:
+        """Create upcoming partitions, drop expired ones and prune histograms."""
+        await self.ensure_partitions()
+        await self.drop_expired_partitions()
+        await self.prune_hourly_histograms()
+
+    async def _run(self) -> None:
+        """Run maintenance every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Usage partition maintenance failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Run maintenance once, then keep running it in the background."""
+        try:
+            await self.run_maintenance()
+        except Exception as e:
+            logger.error(f"Usage partition maintenance failed: {str(e)}")
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        register_close_hook(self.stop)
+
+    async def stop(self) -> None:
+        """Stop the background maintenance task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create a singleton instance
+usage_partitions = UsagePartitionManager(
+    retention_months=settings.USAGE_RETENTION_MONTHS,
+    months_ahead=settings.USAGE_PARTITIONS_AHEAD,
+    interval=settings.USAGE_PARTITION_MAINTENANCE_SECONDS,
+    hourly_histogram_retention_days=settings.USAGE_HOURLY_HISTOGRAM_RETENTION_DAYS,
+)
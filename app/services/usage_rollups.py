@@ -0,0 +1,256 @@
+"""
+API Key Usage Rollup Service
+
+This module folds batches of raw usage records into per-day rollup rows,
+plus log-scale latency histograms, so usage statistics and percentiles can
+be read without scanning the raw ``api_key_usage`` table.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import APIKeyLatencyHistogram, APIKeyUsageRollup, RollupGranularity
+
+# Each histogram bin is 5% wider than the previous one, so percentile
+# estimates are within ~2.5% of the true value. Bin 0 holds everything
+# up to 1ms.
+HISTOGRAM_GROWTH = 1.05
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+# Usage totals are only read per day; finer rollups would be written on every
+# batch and never read
+ROLLUP_GRANULARITIES = (RollupGranularity.DAY,)
+
+# Histograms are only kept at these granularities to bound their size
+HISTOGRAM_GRANULARITIES = (RollupGranularity.HOUR, RollupGranularity.DAY)
+
+
+def bucket_start(timestamp: datetime, granularity: RollupGranularity) -> datetime:
+    """
+    Truncate a timestamp to the start of its rollup bucket.
+
+    Args:
+        timestamp: The timestamp to truncate
+        granularity: The rollup granularity
+
+    Returns:
+        datetime: The start of the bucket containing the timestamp
+    """
+    if granularity == RollupGranularity.HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def latency_bin(response_time: float) -> int:
+    """
+    Get the histogram bin for a response time.
+
+    Args:
+        response_time: Response time in seconds
+
+    Returns:
+        int: Bin index; bin ``n`` covers (1.05^(n-1), 1.05^n] milliseconds
+    """
+    milliseconds = response_time * 1000
+    if milliseconds <= 1:
+        return 0
+    return math.ceil(math.log(milliseconds) / _LOG_GROWTH)
+
+
+def bin_value(bin: int) -> float:
+    """
+    Get the representative response time of a histogram bin.
+
+    Args:
+        bin: Bin index
+
+    Returns:
+        float: Geometric midpoint of the bin in seconds
+    """
+    if bin <= 0:
+        return 0.001
+    return HISTOGRAM_GROWTH ** (bin - 0.5) / 1000
+
+
+def histogram_percentiles(
+    counts: Mapping[int, int], quantiles: Sequence[float]
+) -> List[float]:
+    """
+    Estimate response time percentiles from a merged histogram.
+
+    Args:
+        counts: Request count per bin
+        quantiles: Quantiles to estimate, each between 0 and 1
+
+    Returns:
+        List[float]: Estimated response time in seconds for each quantile
+    """
+    total = sum(counts.values())
+    if total == 0:
+        return [0.0 for _ in quantiles]
+
+    bins = sorted(counts.items())
+    estimates = []
+    for quantile in quantiles:
+        rank = max(1, math.ceil(quantile * total))
+        cumulative = 0
+        for bin, count in bins:
+            cumulative += count
+            if cumulative >= rank:
+                estimates.append(bin_value(bin))
+                break
+    return estimates
+
+
+def build_histogram_rows(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate raw usage records into latency histogram rows.
+
+    Args:
+        records: Usage records with api_key_id, endpoint, response_time and
+            created_at keys
+
+    Returns:
+        List[Dict[str, Any]]: One row per (api_key_id, granularity,
+        bucket_start, endpoint, bin), sorted by that key
+    """
+    counts: Dict[Tuple, int] = {}
+
+    for record in records:
+        bin = latency_bin(record["response_time"])
+        for granularity in HISTOGRAM_GRANULARITIES:
+            key = (
+                record["api_key_id"],
+                granularity,
+                bucket_start(record["created_at"], granularity),
+                record["endpoint"],
+                bin,
+            )
+            counts[key] = counts.get(key, 0) + 1
+
+    return [
+        {
+            "api_key_id": key[0],
+            "granularity": key[1],
+            "bucket_start": key[2],
+            "endpoint": key[3],
+            "bin": key[4],
+            "count": counts[key],
+        }
+        for key in sorted(counts)
+    ]
+
+
+def build_rollup_rows(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate raw usage records into rollup rows for each rollup granularity.
+
+    Args:
+        records: Usage records with api_key_id, endpoint, status_code,
+            response_time and created_at keys
+
+    Returns:
+        List[Dict[str, Any]]: One row per (api_key_id, granularity,
+        bucket_start, endpoint), sorted by that key
+    """
+    rollups: Dict[Tuple, Dict[str, Any]] = {}
+
+    for record in records:
+        response_time = record["response_time"]
+        is_error = record["status_code"] >= 400
+
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (
+                record["api_key_id"],
+                granularity,
+                bucket_start(record["created_at"], granularity),
+                record["endpoint"],
+            )
+            row = rollups.get(key)
+            if row is None:
+                rollups[key] = {
+                    "api_key_id": key[0],
+                    "granularity": key[1],
+                    "bucket_start": key[2],
+                    "endpoint": key[3],
+                    "request_count": 1,
+                    "error_count": int(is_error),
+                    "response_time_sum": response_time,
+                    "response_time_min": response_time,
+                    "response_time_max": response_time,
+                }
+            else:
+                row["request_count"] += 1
+                row["error_count"] += int(is_error)
+                row["response_time_sum"] += response_time
+                row["response_time_min"] = min(row["response_time_min"], response_time)
+                row["response_time_max"] = max(row["response_time_max"], response_time)
+
+    # A stable order keeps concurrent upserts from deadlocking each other
+    return [rollups[key] for key in sorted(rollups)]
+
+
+async def upsert_rollups(conn: AsyncConnection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Merge rollup rows into the rollup table.
+
+    Args:
+        conn: An open connection inside a transaction
+        rows: Rows produced by :func:`build_rollup_rows`
+    """
+    if not rows:
+        return
+
+    table = APIKeyUsageRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            table.c.api_key_id,
+            table.c.granularity,
+            table.c.bucket_start,
+            table.c.endpoint,
+        ],
+        set_={
+            "request_count": table.c.request_count + stmt.excluded.request_count,
+            "error_count": table.c.error_count + stmt.excluded.error_count,
+            "response_time_sum": table.c.response_time_sum
+            + stmt.excluded.response_time_sum,
+            "response_time_min": func.least(
+                table.c.response_time_min, stmt.excluded.response_time_min
+            ),
+            "response_time_max": func.greatest(
+                table.c.response_time_max, stmt.excluded.response_time_max
+            ),
+        },
+    )
+    await conn.execute(stmt, rows)
+
+
+async def upsert_histograms(conn: AsyncConnection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Merge latency histogram rows into the histogram table.
+
+    Args:
+        conn: An open connection inside a transaction
+        rows: Rows produced by :func:`build_histogram_rows`
+    """
+    if not rows:
+        return
+
+    table = APIKeyLatencyHistogram.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            table.c.api_key_id,
+            table.c.granularity,
+            table.c.bucket_start,
+            table.c.endpoint,
+            table.c.bin,
+        ],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    await conn.execute(stmt, rows)
@@ -0,0 +1,129 @@
+"""
+User Cache Service
+
+This module keeps recently resolved users in memory so JWT-authenticated
+requests can skip the user lookup, and versions users so tokens issued
+before a change to the user are rejected.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import User
+
+
+class CachedUser(NamedTuple):
+    """The fields of a user that authenticated requests need."""
+
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_superuser: bool
+    version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            version=user.version,
+        )
+
+
+# Users keyed by ID, as last loaded from the database
+user_cache: TTLCache[int, CachedUser] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def user_token_claims(user: User) -> Dict[str, Any]:
+    """
+    Build the JWT claims identifying a user.
+
+    Args:
+        user: The user the token is issued to
+
+    Returns:
+        Dict[str, Any]: The subject plus the user's active flag and version
+    """
+    return {
+        "sub": str(user.id),
+        "ver": user.version,
+        "active": user.is_active,
+    }
+
+
+async def get_cached_user(session: AsyncSession, user_id: int) -> Optional[CachedUser]:
+    """
+    Get a user, using the user cache.
+
+    A cache hit needs no database round trip. On a miss the user is loaded
+    and cached until the TTL expires or the user changes.
+
+    Args:
+        session: Database session used on a cache miss
+        user_id: The ID of the user
+
+    Returns:
+        Optional[CachedUser]: The user, if it exists
+    """
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    result = await session.execute(select(User).where(User.id == user_id))
+    db_user = result.scalar_one_or_none()
+    if db_user is None:
+        return None
+    user = CachedUser.from_user(db_user)
+    user_cache.set(user_id, user)
+    return user
+
+
+async def update_user_access(
+    session: AsyncSession, user_id: int, **values: Any
+) -> bool:
+    """
+    Change a user's status or privileges and revoke their earlier tokens.
+
+    Bulk UPDATE statements bypass the ORM hooks that bump the version, so
+    changes to ``is_active`` or ``is_superuser`` must go through here.
+
+    Args:
+        session: Database session; the change is committed
+        user_id: The ID of the user
+        **values: The columns to change, e.g. ``is_active=False``
+
+    Returns:
+        bool: Whether the user exists
+    """
+    result = await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(version=User.version + 1, **values)
+    )
+    await session.commit()
+    user_cache.pop(user_id)
+    return result.rowcount > 0
+
+
+@event.listens_for(User, "before_update")
+def _bump_user_version(mapper, connection, target: User) -> None:
+    # Every change to a user invalidates the tokens issued before it. Bulk
+    # UPDATE statements bypass this hook; use update_user_access instead.
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version = (target.version or 0) + 1
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_user(mapper, connection, target: User) -> None:
+    user_cache.pop(target.id)
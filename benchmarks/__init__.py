@@ -0,0 +1,7 @@
+"""
+Benchmarks
+
+Standalone scripts for measuring query plans and hot-path performance.
+Run them as modules from the project root, e.g.
+``uv run python -m benchmarks.usage_index_plans``.
+"""
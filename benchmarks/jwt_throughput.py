@@ -0,0 +1,88 @@
+"""
+JWT Encode/Decode Throughput Benchmark
+
+Measures how many access tokens per second can be encoded and decoded with
+PyJWT, and how many repeated bearer tokens per second verify_token resolves
+from its decoded-token cache. If python-jose (the library app.core.auth used
+before it was merged into app.core.security) is installed, it is measured
+alongside for comparison.
+
+Usage:
+    uv run python -m benchmarks.jwt_throughput --iterations 50000
+"""
+
+import argparse
+from time import perf_counter
+from typing import Callable
+
+import jwt
+
+from app.core.config import settings
+from app.core.security import (
+    ALGORITHM,
+    create_access_token,
+    token_cache,
+    verify_token,
+)
+
+try:
+    from jose import jwt as jose_jwt
+except ImportError:
+    jose_jwt = None
+
+CLAIMS = {"sub": "42", "ver": 1, "active": True}
+
+
+def measure(title: str, fn: Callable[[], object], iterations: int) -> None:
+    fn()
+    start = perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = perf_counter() - start
+    print(
+        f"{title:<28} {iterations / elapsed:>12,.0f} ops/s "
+        f"{elapsed / iterations * 1e6:>8.2f} us/op"
+    )
+
+
+def main(iterations: int) -> None:
+    token = create_access_token(CLAIMS)
+    key = settings.SECRET_KEY
+
+    print(f"{iterations} iterations per case")
+    measure("pyjwt encode", lambda: create_access_token(CLAIMS), iterations)
+    measure(
+        "pyjwt decode",
+        lambda: jwt.decode(token, key, algorithms=[ALGORITHM]),
+        iterations,
+    )
+
+    def uncached() -> None:
+        token_cache.clear()
+        verify_token(token)
+
+    measure("verify_token (cache miss)", uncached, iterations)
+    measure("verify_token (cache hit)", lambda: verify_token(token), iterations)
+
+    if jose_jwt is None:
+        print("python-jose is not installed; skipping")
+        return
+
+    payload = jwt.decode(token, key, algorithms=[ALGORITHM])
+    measure(
+        "python-jose encode",
+        lambda: jose_jwt.encode(payload, key, algorithm=ALGORITHM),
+        iterations,
+    )
+    measure(
+        "python-jose decode",
+        lambda: jose_jwt.decode(token, key, algorithms=[ALGORITHM]),
+        iterations,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+    main(args.iterations)
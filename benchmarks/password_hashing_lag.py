@@ -0,0 +1,80 @@
+"""
+Password Hashing Event Loop Lag Benchmark
+
+Runs a burst of concurrent password verifications, as a wave of logins
+would, and measures how late a 10ms ticker on the same event loop wakes up.
+The burst is run twice: calling bcrypt inline (the old login handler) and
+through the bounded password hashing pool in app.core.security.
+
+No database is needed; the hash is generated once up front.
+
+Usage:
+    uv run python -m benchmarks.password_hashing_lag --logins 20
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+from typing import Awaitable, Callable, List
+
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+
+TICK_SECONDS = 0.01
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    """Sleep in short ticks, recording how late each wake-up is."""
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(perf_counter() - start - TICK_SECONDS)
+
+
+async def run(title: str, verify: Callable[[], Awaitable[bool]], logins: int) -> None:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 5)
+
+    start = perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = perf_counter() - start
+
+    stop.set()
+    await tick_task
+    assert all(results)
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{title:<10} total {elapsed * 1000:8.1f} ms | ticks {len(lags):4d} | "
+        f"lag p50 {statistics.median(lags) * 1000:7.1f} ms "
+        f"p99 {p99 * 1000:7.1f} ms max {lags[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main(logins: int) -> None:
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+
+    async def inline() -> bool:
+        return verify_password(password, hashed)
+
+    async def offloaded() -> bool:
+        return await verify_password_async(password, hashed)
+
+    print(f"{logins} concurrent logins, ticker every {TICK_SECONDS * 1000:.0f} ms")
+    await run("inline", inline, logins)
+    await run("offloaded", offloaded, logins)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,142 @@
+"""
+Usage Index Query Plan Benchmark
+
+Seeds a scratch schema with synthetic API keys and usage rows, then prints
+the query plans and execution times of the hot lookup and usage stats
+queries before and after adding the indexes from migration 05bdfd6dccf1.
+
+The scratch schema is dropped afterwards; application tables are untouched.
+
+Usage:
+    uv run python -m benchmarks.usage_index_plans --keys 1000 --rows 2000000
+"""
+
+import argparse
+import asyncio
+import re
+from typing import List, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+
+SCHEMA = "bench_usage_indexes"
+
+SETUP_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TYPE {SCHEMA}.keystatus AS ENUM ('ACTIVE', 'REVOKED', 'EXPIRED');
+CREATE TABLE {SCHEMA}.api_keys (
+    id SERIAL PRIMARY KEY,
+    key_prefix VARCHAR NOT NULL,
+    key_hash VARCHAR NOT NULL,
+    status {SCHEMA}.keystatus NOT NULL
+);
+CREATE INDEX ON {SCHEMA}.api_keys (key_prefix);
+CREATE TABLE {SCHEMA}.api_key_usage (
+    id SERIAL PRIMARY KEY,
+    api_key_id INTEGER NOT NULL REFERENCES {SCHEMA}.api_keys (id),
+    endpoint VARCHAR NOT NULL,
+    status_code INTEGER NOT NULL,
+    response_time FLOAT NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+CREATE INDEX ON {SCHEMA}.api_key_usage (endpoint);
+"""
+
+SEED_KEYS_SQL = f"""
+INSERT INTO {SCHEMA}.api_keys (key_prefix, key_hash, status)
+SELECT substr(md5(i::text), 1, 8), encode(sha256(i::text::bytea), 'hex'),
+       CASE WHEN i % 10 = 0 THEN 'REVOKED' ELSE 'ACTIVE' END::{SCHEMA}.keystatus
+FROM generate_series(1, $1::int) AS i
+"""
+
+SEED_USAGE_SQL = f"""
+INSERT INTO {SCHEMA}.api_key_usage
+    (api_key_id, endpoint, status_code, response_time, created_at)
+SELECT 1 + (i % $1::int),
+       (ARRAY['/summarize', '/paraphrase', '/image-to-text'])[1 + i % 3],
+       CASE WHEN i % 20 = 0 THEN 500 ELSE 200 END,
+       random() * 5,
+       now() - (i || ' seconds')::interval
+FROM generate_series(1, $2::int) AS i
+"""
+
+INDEX_SQL = f"""
+CREATE INDEX ix_api_key_usage_api_key_id_created_at
+    ON {SCHEMA}.api_key_usage (api_key_id, created_at DESC);
+CREATE UNIQUE INDEX ix_api_keys_key_hash ON {SCHEMA}.api_keys (key_hash);
+CREATE INDEX ix_api_keys_key_prefix_active
+    ON {SCHEMA}.api_keys (key_prefix) WHERE status = 'ACTIVE';
+ANALYZE {SCHEMA}.api_keys;
+ANALYZE {SCHEMA}.api_key_usage;
+"""
+
+QUERIES: List[Tuple[str, str]] = [
+    (
+        "verify key by prefix",
+        f"SELECT * FROM {SCHEMA}.api_keys "
+        f"WHERE key_prefix = substr(md5('42'), 1, 8) AND status = 'ACTIVE'",
+    ),
+    (
+        "lookup key by hash",
+        f"SELECT * FROM {SCHEMA}.api_keys "
+        f"WHERE key_hash = encode(sha256('42'::bytea), 'hex')",
+    ),
+    (
+        "usage by endpoint",
+        f"SELECT endpoint, count(*), count(*) FILTER (WHERE status_code < 400), "
+        f"sum(response_time) FROM {SCHEMA}.api_key_usage "
+        f"WHERE api_key_id = 42 GROUP BY endpoint",
+    ),
+    (
+        "recent usage",
+        f"SELECT * FROM {SCHEMA}.api_key_usage WHERE api_key_id = 42 "
+        f"ORDER BY created_at DESC LIMIT 10",
+    ),
+]
+
+
+async def explain(conn: asyncpg.Connection, title: str) -> None:
+    """Print the plan and execution time of every benchmark query."""
+    print(f"\n===== {title} =====")
+    for name, query in QUERIES:
+        rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+        plan = [row[0] for row in rows]
+        execution = next((line for line in plan if line.startswith("Execution")), "")
+        match = re.search(r"([\d.]+) ms", execution)
+        print(f"\n--- {name}: {match.group(1) if match else '?'} ms")
+        for line in plan:
+            print(f"    {line}")
+
+
+async def main(keys: int, rows: int) -> None:
+    conn = await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=int(settings.POSTGRES_PORT),
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        print(f"Seeding {keys} keys and {rows} usage rows into {SCHEMA}")
+        await conn.execute(SETUP_SQL)
+        await conn.execute(SEED_KEYS_SQL, keys)
+        await conn.execute(SEED_USAGE_SQL, keys, rows)
+        await conn.execute(f"ANALYZE {SCHEMA}.api_keys")
+        await conn.execute(f"ANALYZE {SCHEMA}.api_key_usage")
+
+        await explain(conn, "before indexes")
+        await conn.execute(INDEX_SQL)
+        await explain(conn, "after indexes")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.keys, args.rows))
@@ -8,12 +8,16 @@ It initializes the application and includes all API routers.
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from slowapi.errors import RateLimitExceeded
 
 from app import include_routers
 from app.core.logging_config import setup_logging, get_logger
-from app.core.rate_limit import limiter
+from app.core.rate_limit import RateLimitExceeded, limiter
 from app.core.database import init_db, close_db
+from app.core.http_client import init_http_client, close_http_client
+from app.services.api_key_activity import api_key_activity
+from app.services.jobs import job_queue
+from app.services.usage_log_writer import usage_log_writer
+from app.services.usage_partitions import usage_partitions
 
 
 # Initialize the root logger
@@ -58,13 +62,31 @@ def create_app() -> FastAPI:
         await init_db()
         logger.info("Database initialization completed")
 
+        # Make sure usage partitions exist before any usage is written
+        await usage_partitions.start()
+
+        # Start batched writes of API key last used timestamps
+        api_key_activity.start()
+
+        # Start the background usage log writer
+        usage_log_writer.start()
+
+        # Open the shared connection pool for upstream API calls
+        await init_http_client()
+
+        # Start the background job workers
+        job_queue.start()
+
     @app.on_event("shutdown")
     async def shutdown_event():
-        """Close database connections on shutdown."""
+        """Flush buffered writes and close database and HTTP connections on shutdown."""
         logger.info("Closing database connections")
         await close_db()
         logger.info("Database connections closed")
 
+        await close_http_client()
+        logger.info("HTTP connections closed")
+
     return app
 
 
@@ -86,7 +108,9 @@ async def rate_limit_exceeded_handler(
         extra={"client_ip": request.client.host, "path": request.url.path},
     )
     return JSONResponse(
-        status_code=429, content={"error": "Rate limit exceeded", "detail": str(exc)}
+        status_code=429,
+        content={"error": "Rate limit exceeded", "detail": str(exc)},
+        headers=exc.headers,
     )
 
 
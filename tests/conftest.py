@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration.
+
+Settings are read from the environment when app.core.config is imported, so
+placeholder values for the required ones are set before any test imports the
+application. Real values from the environment take precedence.
+"""
+
+import os
+
+for name, value in {
+    "SECRET_KEY": "test-secret-key",
+    "GROK_API_KEY": "test-grok-api-key",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "ai_tool_nest_test",
+    "HOST": "127.0.0.1",
+    "PORT": "8000",
+    "RELOAD": "false",
+    "BASE_URL": "http://testserver",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,69 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from app.services import api_key_activity as api_key_activity_module
+from app.services.api_key_activity import APIKeyActivityTracker
+
+
+class FakeEngine:
+    def __init__(self):
+        self.statements = []
+        self.error = None
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def execute(self, statement):
+        if self.error is not None:
+            raise self.error
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(api_key_activity_module, "engine", engine)
+    return engine
+
+
+def test_touches_keep_the_latest_time_per_key():
+    tracker = APIKeyActivityTracker(flush_interval=60)
+    tracker.touch(1, datetime(2026, 10, 15, 9))
+    tracker.touch(1, datetime(2026, 10, 15, 8))
+    tracker.touch(2, datetime(2026, 10, 15, 7))
+    tracker.touch(1, datetime(2026, 10, 15, 10))
+
+    assert tracker._pending == {
+        1: datetime(2026, 10, 15, 10),
+        2: datetime(2026, 10, 15, 7),
+    }
+
+
+async def test_flush_writes_all_keys_in_one_statement(engine):
+    tracker = APIKeyActivityTracker(flush_interval=60)
+    tracker.touch(1, datetime(2026, 10, 15, 9))
+    tracker.touch(2, datetime(2026, 10, 15, 10))
+
+    assert await tracker.flush() == 2
+    assert len(engine.statements) == 1
+    assert "UPDATE api_keys" in str(engine.statements[0])
+    assert await tracker.flush() == 0
+    assert len(engine.statements) == 1
+
+
+async def test_failed_flush_keeps_touches_for_the_next_one(engine):
+    tracker = APIKeyActivityTracker(flush_interval=60)
+    tracker.touch(1, datetime(2026, 10, 15, 9))
+    engine.error = OSError("database is down")
+
+    with pytest.raises(OSError):
+        await tracker.flush()
+    # A touch made while the flush was failing is merged with the old one
+    tracker.touch(1, datetime(2026, 10, 15, 8))
+    assert tracker._pending == {1: datetime(2026, 10, 15, 9)}
+
+    engine.error = None
+    assert await tracker.flush() == 1
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.security import get_api_key_hash
+from app.models import KeyStatus, User
+from app.services.api_key_activity import api_key_activity
+from app.services.api_key_service import APIKeyService, api_key_cache
+from app.services.user_cache import CachedUser
+
+API_KEY = "sk_test_0123456789abcdef"
+
+
+class FakeSession:
+    def __init__(self, user=None):
+        self.user = user
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalar_one_or_none=lambda: self.user)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    api_key_cache.clear()
+    yield
+    api_key_cache.clear()
+    api_key_activity._pending.clear()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    user = User(
+        id=7,
+        email="ada@example.com",
+        username="ada",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        version=3,
+    )
+    service = APIKeyService(FakeSession(user))
+    verified = []
+
+    async def verify_and_update_key(api_key):
+        verified.append(api_key)
+        return SimpleNamespace(
+            id=42, user_id=7, status=KeyStatus.ACTIVE, rate_limit_tier="pro"
+        )
+
+    monkeypatch.setattr(service, "verify_and_update_key", verify_and_update_key)
+    service.verified = verified
+    return service
+
+
+async def test_caches_a_snapshot_of_the_key_user(service):
+    key = await service.authenticate(API_KEY)
+
+    assert key.user == CachedUser(7, "ada@example.com", "ada", True, False, 3)
+    assert key.key_id == 42
+    assert key.rate_limit_tier == "pro"
+
+    assert await service.authenticate(API_KEY) is key
+    assert len(service.verified) == 1
+    assert len(service.session.statements) == 1
+
+
+async def test_cached_key_that_is_not_active_is_rejected(service):
+    key = await service.authenticate(API_KEY)
+    key_hash = get_api_key_hash(API_KEY)
+    api_key_cache.set(key_hash, key._replace(status=KeyStatus.REVOKED))
+
+    assert await service.authenticate(API_KEY) is None
+    assert api_key_cache.get(key_hash) is None
+
+
+async def test_usage_stats_combine_the_per_endpoint_aggregates(monkeypatch):
+    service = APIKeyService(FakeSession(SimpleNamespace(id=42)))
+
+    async def aggregate(key_id):
+        return [
+            SimpleNamespace(
+                endpoint="/summarize", total=3, successful=2, response_time_sum=3.0
+            ),
+            SimpleNamespace(
+                endpoint="/paraphrase", total=1, successful=1, response_time_sum=1.0
+            ),
+        ]
+
+    async def histograms(key_id, window):
+        return [SimpleNamespace(endpoint="/summarize", bin=10, count=4)]
+
+    async def recent_usage(key_id):
+        return []
+
+    monkeypatch.setattr(service, "_aggregate_usage_by_endpoint", aggregate)
+    monkeypatch.setattr(service, "_get_latency_histograms", histograms)
+    monkeypatch.setattr(service, "_get_recent_usage", recent_usage)
+
+    stats = await service.get_key_usage_stats(42, user_id=7)
+
+    assert stats.total_requests == 4
+    assert (stats.successful_requests, stats.failed_requests) == (3, 1)
+    assert stats.average_response_time == 1.0
+    assert stats.usage_by_endpoint == {"/summarize": 3, "/paraphrase": 1}
+    assert stats.latency_percentiles.count == 4
+
+
+async def test_usage_stats_for_another_users_key_are_not_found():
+    service = APIKeyService(FakeSession(None))
+
+    assert await service.get_key_usage_stats(42, user_id=8) is None
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.api.v1.endpoints.ai_tools.utils import run_batch
+from app.services import upstream_scheduler as upstream_scheduler_module
+from app.services.upstream_scheduler import (
+    Priority,
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+)
+
+
+class ServiceError(Exception):
+    pass
+
+
+async def test_outcomes_keep_item_order_and_status():
+    async def process(item):
+        await asyncio.sleep(0.001 * (3 - item))
+        if item == 1:
+            raise ServiceError("bad response")
+        if item == 2:
+            raise UpstreamUnavailableException("busy", 7)
+        if item == 3:
+            raise UpstreamTimeoutException("timed out")
+        return {"summary": str(item)}
+
+    outcomes = await run_batch([0, 1, 2, 3], process, ServiceError)
+
+    assert [outcome["index"] for outcome in outcomes] == [0, 1, 2, 3]
+    assert [outcome["status_code"] for outcome in outcomes] == [200, 422, 503, 504]
+    assert outcomes[0]["result"] == {"summary": "0"}
+    assert outcomes[2]["retry_after"] == 7
+
+
+async def test_items_run_with_bounded_concurrency_and_batch_priority():
+    running = 0
+    most_running = 0
+    priorities = set()
+
+    async def process(item):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        priorities.add(upstream_scheduler_module._priority.get())
+        await asyncio.sleep(0.001)
+        running -= 1
+        return {}
+
+    await run_batch(list(range(10)), process, ServiceError, max_concurrency=3)
+
+    assert most_running == 3
+    assert priorities == {Priority.BATCH}
+    assert upstream_scheduler_module._priority.get() == Priority.INTERACTIVE
@@ -0,0 +1,60 @@
+import pytest
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_value_until_ttl_expires(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1)
+
+    clock[0] += 59
+    assert c.get("a") == 1
+
+    clock[0] += 1
+    assert c.get("a") is None
+    assert len(c) == 0
+    assert (c.hits, c.misses) == (1, 1)
+
+
+def test_set_ttl_overrides_default(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1, ttl=5)
+
+    clock[0] += 5
+    assert c.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+
+
+def test_pop_and_clear(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+
+    assert c.pop("a") == 1
+    assert c.pop("a") is None
+    c.clear()
+    assert len(c) == 0
+
+
+def test_zero_maxsize_disables_cache(clock):
+    c = TTLCache(maxsize=0, ttl=60)
+    c.set("a", 1)
+    assert c.get("a") is None
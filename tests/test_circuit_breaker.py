@@ -0,0 +1,170 @@
+import asyncio
+from time import monotonic
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import circuit_breaker as circuit_breaker_module
+from app.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenException,
+    CircuitState,
+    circuit_breakers,
+)
+from app.services.llm_calls import LLMCaller
+from app.services.upstream_scheduler import UpstreamTimeoutException
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker_module, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        name="test",
+        window=60,
+        min_calls=4,
+        error_rate=0.5,
+        slow_call_seconds=5,
+        slow_call_rate=0.5,
+        open_seconds=30,
+        half_open_probes=2,
+    )
+
+
+def fail(breaker: CircuitBreaker, calls: int) -> None:
+    for _ in range(calls):
+        breaker.record(breaker.before_call(), 0.1, failed=True)
+
+
+def half_open(breaker: CircuitBreaker, clock: Clock) -> None:
+    fail(breaker, 4)
+    clock.now += 30
+
+
+def test_opens_once_error_rate_is_reached(breaker):
+    breaker.record(breaker.before_call(), 0.1, failed=False)
+    breaker.record(breaker.before_call(), 0.1, failed=False)
+    fail(breaker, 1)
+    assert breaker.state == CircuitState.CLOSED
+
+    fail(breaker, 1)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenException):
+        breaker.before_call()
+    assert breaker.rejected == 1
+
+
+def test_opens_once_slow_call_rate_is_reached(breaker):
+    for _ in range(4):
+        breaker.record(breaker.before_call(), 6, failed=False)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_min_calls_and_window(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 61
+    fail(breaker, 1)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_probes_close_the_circuit(breaker, clock):
+    half_open(breaker, clock)
+    assert breaker.available
+
+    probes = [breaker.before_call(), breaker.before_call()]
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert all(probe.probe for probe in probes)
+    with pytest.raises(CircuitOpenException):
+        breaker.before_call()
+
+    for probe in probes:
+        breaker.record(probe, 0.1, failed=False)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_failed_probe_reopens_the_circuit(breaker, clock):
+    half_open(breaker, clock)
+    breaker.record(breaker.before_call(), 0.1, failed=True)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.trips == 2
+
+
+def test_cancelled_probe_frees_its_slot(breaker, clock):
+    half_open(breaker, clock)
+    probes = [breaker.before_call(), breaker.before_call()]
+    breaker.cancel(probes[0])
+    assert breaker.available
+    breaker.before_call()
+
+
+def test_call_admitted_while_closed_is_not_a_probe(breaker, clock):
+    normal = breaker.before_call()
+    half_open(breaker, clock)
+    probes = [breaker.before_call(), breaker.before_call()]
+
+    # Finishing or cancelling the old call leaves the probe slots alone
+    breaker.record(normal, 0.1, failed=False)
+    breaker.cancel(normal)
+    assert not breaker.available
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    for probe in probes:
+        breaker.record(probe, 0.1, failed=False)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_probe_from_an_earlier_half_open_state_is_ignored(breaker, clock):
+    half_open(breaker, clock)
+    stale = breaker.before_call()
+    breaker.record(breaker.before_call(), 0.1, failed=True)
+    clock.now += 30
+
+    probe = breaker.before_call()
+    breaker.record(stale, 0.1, failed=False)
+    breaker.cancel(stale)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker._probes_in_flight == 1
+
+    breaker.record(probe, 0.1, failed=False)
+    breaker.record(breaker.before_call(), 0.1, failed=False)
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_deadline_expiry_counts_as_a_failed_call():
+    async def create(**kwargs):
+        await asyncio.sleep(10)
+
+    client = SimpleNamespace(
+        base_url="http://deadline.test/v1",
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+    )
+    caller = LLMCaller(
+        connect_timeout=1,
+        read_timeout=1,
+        total_timeout=1,
+        max_retries=0,
+        backoff=0,
+        backoff_max=0,
+        hedging=False,
+        hedge_min_samples=1,
+    )
+
+    with pytest.raises(UpstreamTimeoutException):
+        await caller.create(client, "model", deadline=monotonic() + 0.05)
+
+    breaker = circuit_breakers.get("http://deadline.test/v1", "model")
+    assert breaker.metrics["calls"] == 1
+    assert breaker.metrics["error_rate"] == 1.0
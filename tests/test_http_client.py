@@ -0,0 +1,28 @@
+from app.core.http_client import close_http_client, get_http_client
+from app.services.llm_clients import get_openai_client
+
+
+async def test_clients_share_one_pooled_http_client():
+    try:
+        first = get_openai_client("http://one.test/v1", "key")
+        second = get_openai_client("http://two.test/v1", "key")
+
+        assert get_openai_client("http://one.test/v1", "key") is first
+        assert first is not second
+        assert first._client is second._client is get_http_client()
+        assert first.max_retries == 0
+    finally:
+        await close_http_client()
+
+
+async def test_clients_are_rebuilt_after_the_pool_is_closed():
+    try:
+        before = get_openai_client("http://one.test/v1", "key")
+        await close_http_client()
+        after = get_openai_client("http://one.test/v1", "key")
+
+        assert after is not before
+        assert after._client is get_http_client()
+        assert not after._client.is_closed
+    finally:
+        await close_http_client()
@@ -0,0 +1,374 @@
+"""
+Job queue tests.
+
+The claim tests run against the database in TEST_DATABASE_URL, e.g.
+``postgresql://postgres@localhost/postgres``, and are skipped without it.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from app.core import database as database_module
+from app.models import JobKind, JobStatus
+from app.schemas.jobs import JobResponse
+from app.services import jobs as jobs_module
+from app.services.jobs import (
+    CallbackURLException,
+    JobQueue,
+    check_callback_url,
+    jobs,
+    public_job,
+)
+from app.services.upstream_scheduler import UpstreamUnavailableException
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+requires_database = pytest.mark.skipif(
+    not DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """Resolve every host to the given addresses."""
+    addresses = []
+
+    async def getaddrinfo(self, host, port, **kwargs):
+        if not addresses:
+            raise socket.gaierror("unknown host")
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port or 0))
+            for address in addresses
+        ]
+
+    monkeypatch.setattr(
+        "asyncio.base_events.BaseEventLoop.getaddrinfo", getaddrinfo, raising=True
+    )
+    return addresses
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "127.0.0.1",
+        "10.0.0.5",
+        "172.16.0.1",
+        "192.168.1.1",
+        "169.254.169.254",
+        "100.64.0.1",
+        "0.0.0.0",
+        "224.0.0.1",
+        "::1",
+        "fe80::1",
+        "fd00::1",
+        "::ffff:127.0.0.1",
+    ],
+)
+async def test_callback_url_rejects_non_public_addresses(resolve, address):
+    resolve.append(address)
+    with pytest.raises(CallbackURLException):
+        await check_callback_url("https://hooks.example.com/job")
+
+
+async def test_callback_url_rejects_if_any_address_is_private(resolve):
+    resolve.extend(["93.184.216.34", "10.0.0.5"])
+    with pytest.raises(CallbackURLException):
+        await check_callback_url("https://hooks.example.com/job")
+
+
+async def test_callback_url_accepts_public_addresses(resolve):
+    resolve.extend(["93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"])
+    await check_callback_url("https://hooks.example.com:8443/job")
+
+
+@pytest.mark.parametrize(
+    "url", ["ftp://hooks.example.com/job", "https:///job", "https://unknown.test/"]
+)
+async def test_callback_url_rejects_invalid_urls(resolve, url):
+    with pytest.raises(CallbackURLException):
+        await check_callback_url(url)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.is_success = 200 <= status_code < 300
+
+
+class FakeClient:
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.requests = []
+
+    async def post(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return FakeResponse(self.status_code)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = JobQueue(
+        workers=0,
+        poll_interval=1,
+        lease_seconds=60,
+        max_attempts=1,
+        result_ttl=60,
+        cleanup_interval=60,
+        webhook_secret="secret",
+        webhook_timeout=1,
+        webhook_max_attempts=1,
+    )
+    queue.updates = []
+
+    async def update(job_id, **values):
+        queue.updates.append(values)
+        return {"callback_url": None, **values}
+
+    monkeypatch.setattr(queue, "_update", update)
+    return queue
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(jobs_module, "get_http_client", lambda: client)
+    return client
+
+
+def finished_job(callback_url: str) -> dict:
+    now = datetime(2026, 10, 15, 13, 0, 24)
+    return {
+        "id": uuid.uuid4(),
+        "kind": JobKind.SUMMARIZE,
+        "status": JobStatus.SUCCEEDED,
+        "status_code": 200,
+        "result": {"summary": "Short."},
+        "error": None,
+        "created_at": now,
+        "finished_at": now,
+        "expires_at": now,
+        "callback_url": callback_url,
+    }
+
+
+async def test_deliver_sends_the_job_response_without_following_redirects(
+    queue, client, resolve
+):
+    resolve.append("93.184.216.34")
+    job = finished_job("https://hooks.example.com/job")
+
+    await queue._deliver(job)
+
+    [(url, kwargs)] = client.requests
+    assert url == "https://hooks.example.com/job"
+    assert kwargs["follow_redirects"] is False
+    assert json.loads(kwargs["content"]) == json.loads(
+        JobResponse(**public_job(job)).model_dump_json()
+    )
+    assert queue.webhooks_delivered == 1
+
+
+async def test_deliver_skips_hosts_that_now_resolve_privately(queue, client, resolve):
+    resolve.append("169.254.169.254")
+
+    await queue._deliver(finished_job("https://hooks.example.com/job"))
+
+    assert client.requests == []
+    assert queue.webhooks_failed == 1
+
+
+async def test_close_hooks_stop_later_services_first(monkeypatch):
+    stopped = []
+
+    async def dispose():
+        stopped.append("engine")
+
+    def service(name):
+        async def stop():
+            stopped.append(name)
+
+        return stop
+
+    monkeypatch.setattr(database_module, "_close_hooks", [])
+    monkeypatch.setattr(database_module, "engine", SimpleNamespace(dispose=dispose))
+
+    # Registered in the order main.py starts the services
+    database_module.register_close_hook(service("usage_log_writer"))
+    database_module.register_close_hook(service("job_queue"))
+    await database_module.close_db()
+
+    assert stopped == ["job_queue", "usage_log_writer", "engine"]
+
+
+class Request(BaseModel):
+    text: str
+
+
+def claimed_job(attempts: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "kind": JobKind.SUMMARIZE,
+        "payload": {"text": "Long text."},
+        "attempts": attempts,
+        "api_key_id": 42,
+    }
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(
+        jobs_module.usage_log_writer,
+        "submit",
+        lambda **kwargs: submitted.append(kwargs),
+    )
+    return submitted
+
+
+async def test_unavailable_upstream_requeues_the_job(queue, submitted):
+    async def run(request):
+        raise UpstreamUnavailableException("busy", 30)
+
+    queue.register(JobKind.SUMMARIZE, Request, run, ValueError)
+    queue.max_attempts = 3
+
+    before = datetime.utcnow()
+    await queue._process(claimed_job(attempts=1))
+
+    [values] = queue.updates
+    assert values["status"] == JobStatus.PENDING
+    assert values["lease_expires_at"] is None
+    assert before + timedelta(seconds=30) <= values["run_after"]
+    assert queue.requeued == 1
+    assert submitted == []
+
+
+async def test_unavailable_upstream_fails_the_last_attempt(queue, submitted):
+    async def run(request):
+        raise UpstreamUnavailableException("busy", 30)
+
+    queue.register(JobKind.SUMMARIZE, Request, run, ValueError)
+
+    await queue._process(claimed_job(attempts=1))
+
+    [values] = queue.updates
+    assert (values["status"], values["status_code"]) == (JobStatus.FAILED, 503)
+    assert submitted[0]["status_code"] == 503
+    assert queue.failed == 1
+
+
+async def test_cancelled_job_is_returned_without_using_an_attempt(queue):
+    started = asyncio.Event()
+
+    async def run(request):
+        started.set()
+        await asyncio.sleep(10)
+
+    queue.register(JobKind.SUMMARIZE, Request, run, ValueError)
+
+    task = asyncio.create_task(queue._process(claimed_job(attempts=1)))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert queue.updates == [
+        {"status": JobStatus.PENDING, "attempts": 0, "lease_expires_at": None}
+    ]
+
+
+@pytest.fixture
+async def job_engine(monkeypatch):
+    engine = create_async_engine(
+        DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    )
+
+    def create(conn):
+        jobs.c.kind.type.create(conn, checkfirst=True)
+        jobs.c.status.type.create(conn, checkfirst=True)
+        # Without the API key foreign key, so no users or keys are needed
+        conn.execute(CreateTable(jobs, include_foreign_key_constraints=[]))
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE IF EXISTS jobs")
+        await conn.run_sync(create)
+    monkeypatch.setattr(jobs_module, "engine", engine)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE jobs")
+    await engine.dispose()
+
+
+@pytest.fixture
+def db_queue():
+    return JobQueue(
+        workers=0,
+        poll_interval=1,
+        lease_seconds=60,
+        max_attempts=2,
+        result_ttl=60,
+        cleanup_interval=60,
+        webhook_secret=None,
+        webhook_timeout=1,
+        webhook_max_attempts=1,
+    )
+
+
+@requires_database
+async def test_concurrent_claims_take_different_jobs(job_engine, db_queue):
+    for _ in range(2):
+        await db_queue.submit(42, JobKind.SUMMARIZE, {"text": "Long text."})
+
+    claims = await asyncio.gather(*(db_queue._claim() for _ in range(3)))
+
+    claimed = [job for job in claims if job is not None]
+    assert len(claimed) == 2
+    assert claimed[0]["id"] != claimed[1]["id"]
+    assert all(job["status"] == JobStatus.RUNNING for job in claimed)
+
+
+@requires_database
+async def test_lapsed_lease_is_claimed_until_attempts_run_out(job_engine, db_queue):
+    job = await db_queue.submit(42, JobKind.SUMMARIZE, {"text": "Long text."})
+    expire_lease = (
+        update(jobs)
+        .where(jobs.c.id == job["id"])
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+
+    first = await db_queue._claim()
+    assert await db_queue._claim() is None
+
+    async with job_engine.begin() as conn:
+        await conn.execute(expire_lease)
+    second = await db_queue._claim()
+    assert (second["id"], second["attempts"]) == (first["id"], 2)
+
+    async with job_engine.begin() as conn:
+        await conn.execute(expire_lease)
+    assert await db_queue._claim() is None
+
+
+@requires_database
+async def test_requeued_job_waits_for_its_run_after(job_engine, db_queue):
+    job = await db_queue.submit(42, JobKind.SUMMARIZE, {"text": "Long text."})
+    await db_queue._claim()
+    await db_queue._update(
+        job["id"],
+        status=JobStatus.PENDING,
+        lease_expires_at=None,
+        run_after=datetime.utcnow() + timedelta(seconds=30),
+    )
+
+    assert await db_queue._claim() is None
@@ -0,0 +1,185 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services.llm_calls import LLMCaller, retry_after_seconds
+from app.services.upstream_scheduler import (
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+)
+
+
+class FakeStream:
+    """Yields some chunks, then fails with the given error."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        yield "chunk"
+        raise self.error
+
+
+def status_error(status_code: int, headers=None) -> openai.APIStatusError:
+    response = httpx.Response(
+        status_code,
+        headers=headers,
+        request=httpx.Request("POST", "http://upstream.test/v1/chat/completions"),
+    )
+    error_type = {400: openai.BadRequestError, 429: openai.RateLimitError}.get(
+        status_code, openai.InternalServerError
+    )
+    return error_type(f"HTTP {status_code}", response=response, body=None)
+
+
+def make_caller(**overrides) -> LLMCaller:
+    options = dict(
+        connect_timeout=1,
+        read_timeout=1,
+        total_timeout=1,
+        max_retries=0,
+        backoff=0,
+        backoff_max=0,
+        hedging=False,
+        hedge_min_samples=1,
+    )
+    options.update(overrides)
+    return LLMCaller(**options)
+
+
+def make_client(base_url: str, create) -> SimpleNamespace:
+    return SimpleNamespace(
+        base_url=base_url,
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+    )
+
+
+async def read_stream(caller: LLMCaller, client) -> list:
+    chunks = []
+    async with caller.stream(client, "model") as stream:
+        async for chunk in stream:
+            chunks.append(chunk)
+    return chunks
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (httpx.ReadTimeout("read timed out"), UpstreamTimeoutException),
+        (httpx.RemoteProtocolError("peer closed"), UpstreamUnavailableException),
+    ],
+)
+async def test_mid_stream_errors_become_upstream_errors(error, expected):
+    stream = FakeStream(error)
+
+    async def create(**kwargs):
+        return stream
+
+    client = make_client("http://midstream.test/v1", create)
+    with pytest.raises(expected):
+        await read_stream(make_caller(), client)
+    assert stream.closed
+
+
+async def test_mid_stream_service_errors_pass_through():
+    stream = FakeStream(ValueError("bad chunk"))
+
+    async def create(**kwargs):
+        return stream
+
+    client = make_client("http://midstream.test/v1", create)
+    with pytest.raises(ValueError):
+        await read_stream(make_caller(), client)
+
+
+def test_retry_after_headers_are_read():
+    assert retry_after_seconds(status_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(status_error(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(status_error(429)) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+async def test_retryable_errors_are_retried():
+    errors = [status_error(429), status_error(503)]
+
+    async def create(**kwargs):
+        if errors:
+            raise errors.pop(0)
+        return "completion"
+
+    caller = make_caller(max_retries=2)
+    client = make_client("http://retry.test/v1", create)
+
+    assert await caller.create(client, "model") == "completion"
+    assert caller.retries == 2
+
+
+async def test_non_retryable_errors_are_raised_at_once():
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        raise status_error(400)
+
+    caller = make_caller(max_retries=2)
+    client = make_client("http://bad-request.test/v1", create)
+
+    with pytest.raises(openai.BadRequestError):
+        await caller.create(client, "model")
+    assert len(calls) == 1
+
+
+async def test_retry_after_past_the_deadline_gives_up():
+    async def create(**kwargs):
+        raise status_error(429, {"retry-after": "30"})
+
+    caller = make_caller(max_retries=3)
+    client = make_client("http://busy.test/v1", create)
+
+    with pytest.raises(UpstreamUnavailableException) as exc_info:
+        await caller.create(client, "model")
+    assert exc_info.value.retry_after == 30
+    assert caller.retries == 0
+
+
+async def test_slow_call_is_hedged():
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+            return "original"
+        return "hedge"
+
+    caller = make_caller(hedging=True, hedge_min_samples=1, total_timeout=5)
+    caller._record_latency("model", 0.01)
+    client = make_client("http://hedge.test/v1", create)
+
+    assert await caller.create(client, "model") == "hedge"
+    assert (caller.hedges, caller.hedge_wins) == (1, 1)
+
+
+async def test_fast_call_is_not_hedged():
+    async def create(**kwargs):
+        return "original"
+
+    caller = make_caller(hedging=True, hedge_min_samples=1)
+    caller._record_latency("model", 1)
+    client = make_client("http://no-hedge.test/v1", create)
+
+    assert await caller.create(client, "model") == "original"
+    assert caller.hedges == 0
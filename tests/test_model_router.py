@@ -0,0 +1,63 @@
+import pytest
+
+from app.services.model_router import ModelRoute, RouteConfig, RoutingPolicy
+from app.services.upstream_scheduler import (
+    UpstreamQueueTimeout,
+    UpstreamTimeoutException,
+    UpstreamUnavailableException,
+)
+
+
+class FakeCaller:
+    total_timeout = 10
+
+    def __init__(self, errors):
+        self.errors = errors
+
+    async def create(self, client, model, deadline, **kwargs):
+        error = self.errors.get(model)
+        if error is not None:
+            raise error
+        return model
+
+
+def make_route(errors) -> ModelRoute:
+    config = RouteConfig(
+        policy=RoutingPolicy.FAILOVER,
+        backends=[
+            {"name": "primary", "base_url": "http://primary.test/v1", "model": "a"},
+            {"name": "secondary", "base_url": "http://secondary.test/v1", "model": "b"},
+        ],
+    )
+    return ModelRoute("test", config, FakeCaller(errors), alpha=0.5, explore_rate=0.0)
+
+
+async def test_queue_timeout_fails_over_without_counting_against_backend():
+    route = make_route({"a": UpstreamQueueTimeout("queue full", 1)})
+
+    assert await route.create(messages=[]) == "b"
+    assert route.backends[0].error_rate == 0.0
+
+
+async def test_unavailable_backend_counts_as_failed():
+    route = make_route({"a": UpstreamUnavailableException("rate limited", 1)})
+
+    assert await route.create(messages=[]) == "b"
+    assert route.backends[0].error_rate == 0.5
+
+
+async def test_deadline_expiry_does_not_count_against_backend():
+    route = make_route({"a": UpstreamTimeoutException("deadline passed")})
+
+    with pytest.raises(UpstreamTimeoutException):
+        await route.create(messages=[])
+    assert route.backends[0].error_rate == 0.0
+
+
+def test_metrics_expose_only_names_and_status():
+    route = make_route({})
+
+    assert route.metrics["backends"] == {
+        "primary": {"available": True, "circuit": "closed"},
+        "secondary": {"available": True, "circuit": "closed"},
+    }
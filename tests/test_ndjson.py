@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from app.api.v1.endpoints.ai_tools.utils import (
+    iter_ndjson_lines,
+    parse_ndjson_item,
+    stream_bulk_results,
+)
+
+
+class FakeRequest:
+    """A request whose body arrives in the given chunks."""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class Item(BaseModel):
+    text: str
+
+
+async def read_lines(request, max_line_bytes=16):
+    return [line async for line in iter_ndjson_lines(request, max_line_bytes)]
+
+
+async def test_line_numbers_count_blank_lines():
+    request = FakeRequest(b'{"a": 1}\n\n  \n{"b"', b': 2}\n\n{"c": 3}')
+
+    assert await read_lines(request) == [
+        (1, b'{"a": 1}'),
+        (4, b'{"b": 2}'),
+        (6, b'{"c": 3}'),
+    ]
+
+
+async def test_oversized_lines_are_skipped_across_chunks():
+    request = FakeRequest(b'{"a": 1}\n{"text": "', b"x" * 20, b'"}\n{"b": 2}\n')
+
+    assert await read_lines(request) == [
+        (1, b'{"a": 1}'),
+        (2, None),
+        (3, b'{"b": 2}'),
+    ]
+
+
+async def test_line_at_the_limit_is_kept():
+    line = b"x" * 16
+    assert await read_lines(FakeRequest(line + b"\n" + line + b"x")) == [
+        (1, line),
+        (2, None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (None, (7, None, {"status_code": 413, "error": "Line too long"})),
+        (b"{", (7, None, {"status_code": 422, "error": "Invalid JSON"})),
+        (b"[1]", (7, None, {"status_code": 422, "error": "Expected an object"})),
+    ],
+)
+def test_parse_errors_use_the_line_number(line, expected):
+    assert parse_ndjson_item(line, 7, Item) == expected
+
+
+def test_parse_keeps_the_client_id():
+    client_id, item, error = parse_ndjson_item(b'{"id": "doc-1", "text": "x"}', 7, Item)
+    assert (client_id, item, error) == ("doc-1", Item(text="x"), None)
+
+
+async def test_bulk_results_are_identified_by_line(monkeypatch):
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.ai_tools.utils.log_batch_usage", lambda *args: None
+    )
+
+    async def process(item: Item) -> dict:
+        return {"text": item.text.upper()}
+
+    request = FakeRequest(
+        b'{"text": "a"}\n\n{"text": "' + b"x" * 40 + b'"}\n{"text": "c"}\n'
+    )
+    results = [
+        json.loads(line)
+        async for line in stream_bulk_results(
+            request,
+            Item,
+            process,
+            ValueError,
+            api_key_id=1,
+            endpoint="/test/bulk",
+            max_line_bytes=32,
+        )
+    ]
+
+    assert sorted((r["id"], r["status_code"]) for r in results) == [
+        (1, 200),
+        (3, 413),
+        (4, 200),
+    ]
+
+
+async def test_slow_reader_bounds_items_in_progress(monkeypatch):
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.ai_tools.utils.log_batch_usage", lambda *args: None
+    )
+    started = 0
+    received = 0
+    most_outstanding = 0
+
+    async def process(item: Item) -> dict:
+        nonlocal started, most_outstanding
+        started += 1
+        most_outstanding = max(most_outstanding, started - received)
+        return {"text": item.text}
+
+    request = FakeRequest(*(b'{"text": "x"}\n' for _ in range(50)))
+    async for _ in stream_bulk_results(
+        request,
+        Item,
+        process,
+        ValueError,
+        api_key_id=1,
+        endpoint="/test/bulk",
+        max_concurrency=2,
+    ):
+        received += 1
+        await asyncio.sleep(0.001)
+
+    assert received == 50
+    # Two items in progress plus two results waiting to be sent
+    assert most_outstanding <= 4
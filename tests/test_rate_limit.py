@@ -0,0 +1,39 @@
+from contextvars import copy_context
+
+from starlette.requests import Request
+
+from app.core.rate_limit import rate_limit_key, set_rate_limit_subject, tiered_limit
+
+
+def make_request() -> Request:
+    return Request({"type": "http", "client": ("203.0.113.9", 1234), "headers": []})
+
+
+def in_context(fn):
+    """Run a function in a fresh context, as each request does."""
+    return copy_context().run(fn)
+
+
+def test_anonymous_requests_are_limited_per_ip():
+    assert in_context(lambda: rate_limit_key(make_request())) == "203.0.113.9"
+
+
+def test_authenticated_requests_are_limited_per_subject():
+    def key():
+        set_rate_limit_subject("api_key:42", "pro")
+        return rate_limit_key(make_request())
+
+    assert in_context(key) == "api_key:42"
+
+
+def test_limits_scale_with_the_callers_tier():
+    limit = tiered_limit("5/minute;100/day")
+
+    def for_tier(tier):
+        set_rate_limit_subject("api_key:42", tier)
+        return limit()
+
+    assert in_context(limit) == "5 per 1 minute;100 per 1 day"
+    assert in_context(lambda: for_tier("pro")) == "25 per 1 minute;500 per 1 day"
+    # Unknown tiers get the default tier's limits
+    assert in_context(lambda: for_tier("gold")) == "5 per 1 minute;100 per 1 day"
@@ -0,0 +1,167 @@
+"""
+Rate limit storage tests.
+
+The PostgreSQL tests run against the database in TEST_DATABASE_URL, e.g.
+``postgresql://postgres@localhost/postgres``, and are skipped without it.
+"""
+
+import asyncio
+import os
+
+import asyncpg
+import pytest
+from limits import parse
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from starlette.requests import Request
+
+from app.core.rate_limit import RateLimiter, RateLimitExceeded
+from app.core.rate_limit_storage import PostgresStorage
+from app.models.rate_limit_counter import RateLimitCounter
+from main import rate_limit_exceeded_handler
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+requires_database = pytest.mark.skipif(
+    not DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+@pytest.fixture
+async def database():
+    conn = await asyncpg.connect(DATABASE_URL)
+    create = CreateTable(RateLimitCounter.__table__).compile(
+        dialect=postgresql.dialect()
+    )
+    await conn.execute("DROP TABLE IF EXISTS rate_limit_counters")
+    await conn.execute(str(create))
+    yield conn
+    await conn.execute("DROP TABLE rate_limit_counters")
+    await conn.close()
+
+
+@pytest.fixture
+async def storage(database):
+    storage = PostgresStorage(f"async+{DATABASE_URL}")
+    yield storage
+    await storage.close()
+
+
+def make_request() -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": ("203.0.113.9", 1234),
+            "path": "/",
+            "headers": [],
+        }
+    )
+
+
+@requires_database
+async def test_incr_counts_within_a_window(storage):
+    assert await storage.incr("k", 60) == 1
+    assert await storage.incr("k", 60, amount=2) == 3
+    assert await storage.get("k") == 3
+    assert await storage.get("missing") == 0
+
+
+@requires_database
+async def test_expired_window_starts_over(storage, database):
+    await storage.incr("k", 60)
+    await database.execute(
+        "UPDATE rate_limit_counters SET expires_at = expires_at - interval '2 minutes'"
+    )
+
+    assert await storage.get("k") == 0
+    assert await storage.incr("k", 60) == 1
+
+
+@requires_database
+async def test_concurrent_increments_are_atomic(storage):
+    counts = await asyncio.gather(*(storage.incr("k", 60) for _ in range(50)))
+
+    assert sorted(counts) == list(range(1, 51))
+    assert await storage.get("k") == 50
+
+
+@requires_database
+async def test_expiry_clear_and_reset(storage):
+    before = await storage.get_expiry("k")
+    await storage.incr("k", 60)
+    await storage.incr("other", 60)
+
+    expiry = await storage.get_expiry("k")
+    assert before + 55 < expiry < before + 65
+    assert await storage.check()
+
+    await storage.clear("k")
+    assert await storage.get("k") == 0
+    assert await storage.reset() == 1
+
+
+@requires_database
+async def test_limiter_enforces_limits_in_postgres(database):
+    limiter = RateLimiter(lambda request: "api_key:1", DATABASE_URL)
+    request = make_request()
+    try:
+        await limiter.check(request, "route", "2/minute")
+        await limiter.check(request, "route", "2/minute")
+        with pytest.raises(RateLimitExceeded):
+            await limiter.check(request, "route", "2/minute")
+        # Other routes are counted separately
+        await limiter.check(request, "other", "2/minute")
+    finally:
+        await limiter.storage.close()
+
+    assert await database.fetchval("SELECT sum(count) FROM rate_limit_counters") == 4
+
+
+async def test_limiter_falls_back_to_memory_when_storage_is_down():
+    limiter = RateLimiter(
+        lambda request: "api_key:1", "postgresql://nobody@127.0.0.1:1/none"
+    )
+    request = make_request()
+    try:
+        await limiter.check(request, "route", "1/minute")
+        assert limiter._storage_failed_at is not None
+        with pytest.raises(RateLimitExceeded):
+            await limiter.check(request, "route", "1/minute")
+    finally:
+        await limiter.storage.close()
+
+
+async def test_limit_decorator_checks_before_the_route():
+    limiter = RateLimiter(lambda request: request.client.host, "memory://")
+    calls = []
+
+    @limiter.limit(lambda: "1/minute")
+    async def route(request: Request) -> str:
+        calls.append(request)
+        return "ok"
+
+    request = make_request()
+    assert await route(request=request) == "ok"
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await route(request=request)
+    assert len(calls) == 1
+    assert exc_info.value.status_code == 429
+    assert 1 <= exc_info.value.retry_after <= 60
+    assert exc_info.value.headers["Retry-After"] == str(exc_info.value.retry_after)
+
+
+def test_limit_decorator_needs_a_request_parameter():
+    limiter = RateLimiter(lambda request: "key", "memory://")
+    with pytest.raises(TypeError):
+
+        @limiter.limit("1/minute")
+        async def route() -> None:
+            pass
+
+
+async def test_rate_limit_handler_sends_retry_after():
+    exc = RateLimitExceeded(parse("1/minute"), 42)
+    response = await rate_limit_exceeded_handler(make_request(), exc)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "42"
@@ -0,0 +1,63 @@
+from app.services.result_cache import (
+    MemoryCacheBackend,
+    ResultCache,
+    SQLiteCacheBackend,
+    normalize_text,
+)
+
+
+class FailingBackend(MemoryCacheBackend):
+    async def get(self, key):
+        raise OSError("cache is down")
+
+
+def test_normalization_ignores_whitespace_but_keeps_paragraphs():
+    assert normalize_text("  a  b \r\nc\t\n\n\n\nd ") == "a b\nc\n\nd"
+
+
+def test_keys_depend_on_model_options_and_normalized_text():
+    key = ResultCache.make_key("summarize", "m1", "a  b", mode="paragraph")
+
+    assert key == ResultCache.make_key("summarize", "m1", "a b ", mode="paragraph")
+    assert key != ResultCache.make_key("summarize", "m2", "a b", mode="paragraph")
+    assert key != ResultCache.make_key("summarize", "m1", "a b", mode="custom")
+    assert key != ResultCache.make_key("paraphrase", "m1", "a b", mode="paragraph")
+
+
+async def test_hits_misses_and_bypasses_are_counted():
+    cache = ResultCache(MemoryCacheBackend(max_entries=10, ttl=60), ttl=60)
+
+    assert await cache.get("k") is None
+    await cache.set("k", {"summary": "short"})
+    assert await cache.get("k") == {"summary": "short"}
+    assert await cache.get("k", bypass=True) is None
+
+    assert (cache.hits, cache.misses, cache.bypasses) == (1, 1, 1)
+
+
+async def test_backend_errors_count_as_misses():
+    cache = ResultCache(FailingBackend(max_entries=10, ttl=60), ttl=60)
+
+    assert await cache.get("k") is None
+    assert cache.errors == 1
+
+
+async def test_disabled_cache_stores_nothing():
+    cache = ResultCache(None, ttl=60)
+
+    await cache.set("k", {"summary": "short"})
+    assert await cache.get("k") is None
+    assert cache.metrics["enabled"] is False
+
+
+async def test_sqlite_backend_expires_and_evicts(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2)
+
+    await backend.set("expired", {"n": 0}, ttl=-1)
+    assert await backend.get("expired") is None
+
+    await backend.set("a", {"n": 1}, ttl=60)
+    await backend.set("b", {"n": 2}, ttl=60)
+    await backend.set("c", {"n": 3}, ttl=60)
+    assert await backend.get("c") == {"n": 3}
+    assert [await backend.get(key) for key in ("a", "b")].count(None) == 1
@@ -0,0 +1,77 @@
+import threading
+from datetime import timedelta
+
+import pytest
+
+from app.core import security
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    token_cache,
+    verify_password_async,
+    verify_token,
+)
+
+
+class FakeContext:
+    """Records the thread each bcrypt call runs on."""
+
+    def __init__(self):
+        self.threads = []
+
+    def hash(self, password):
+        self.threads.append(threading.current_thread().name)
+        return f"hashed:{password}"
+
+    def verify(self, password, hashed):
+        self.threads.append(threading.current_thread().name)
+        return hashed == f"hashed:{password}"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+async def test_password_hashing_runs_off_the_event_loop(monkeypatch):
+    context = FakeContext()
+    monkeypatch.setattr(security, "pwd_context", context)
+
+    hashed = await get_password_hash_async("correct horse")
+
+    assert await verify_password_async("correct horse", hashed)
+    assert not await verify_password_async("wrong horse", hashed)
+    assert len(context.threads) == 3
+    assert all(name.startswith("password-hash") for name in context.threads)
+
+
+def test_tokens_round_trip_and_are_cached_as_copies():
+    token = create_access_token({"sub": "7"})
+
+    claims = verify_token(token)
+    assert claims["sub"] == "7"
+    assert len(token_cache) == 1
+
+    claims["sub"] = "8"
+    assert verify_token(token)["sub"] == "7"
+
+
+def test_invalid_and_expired_tokens_are_rejected_and_not_cached():
+    expired = create_access_token({"sub": "7"}, timedelta(seconds=-1))
+
+    assert verify_token(expired) is None
+    assert verify_token(create_access_token({"sub": "7"}) + "x") is None
+    assert verify_token("not a token") is None
+    assert len(token_cache) == 0
+
+
+def test_cached_token_is_rejected_once_it_expires(monkeypatch):
+    token = create_access_token({"sub": "7"})
+    exp = verify_token(token)["exp"]
+
+    monkeypatch.setattr(security, "time", lambda: exp + 1)
+
+    assert verify_token(token) is None
+    assert len(token_cache) == 0
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+async def test_identical_calls_share_one_result():
+    flight = SingleFlight()
+    started = []
+    release = asyncio.Event()
+
+    async def call():
+        started.append(1)
+        await release.wait()
+        return "result"
+
+    callers = [asyncio.create_task(flight.do("k", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 3
+    assert len(started) == 1
+    assert flight.metrics == {"in_flight": 0, "calls": 1, "coalesced": 2}
+
+
+async def test_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        flight.do("k", call), flight.do("k", call), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def retry():
+        return "ok"
+
+    assert await flight.do("k", retry) == "ok"
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(flight.do("k", call))
+    second = asyncio.create_task(flight.do("k", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == "result"
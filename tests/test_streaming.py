@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.api.v1.endpoints.ai_tools import utils as utils_module
+from app.api.v1.endpoints.ai_tools.utils import (
+    event_stream_requested,
+    sse_event,
+    stream_events,
+)
+from app.services.streaming import ThinkFilter
+from app.services.upstream_scheduler import UpstreamTimeoutException
+
+
+class ServiceError(Exception):
+    pass
+
+
+def make_request(accept: str = "") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": ("203.0.113.9", 1234),
+            "headers": [(b"accept", accept.encode())],
+        }
+    )
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        utils_module, "log_api_usage", lambda **kwargs: logged.append(kwargs)
+    )
+    return logged
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.split("\n\n")[:-1]:
+        event, data = block.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[7:], json.loads(data[6:])))
+    return events
+
+
+async def collect(pieces, logged) -> list:
+    body = "".join(
+        [
+            event
+            async for event in stream_events(
+                pieces,
+                result_field="summary",
+                service_exception=ServiceError,
+                request=make_request(),
+                api_key_id=42,
+                endpoint="/summarize",
+                start_time=0,
+            )
+        ]
+    )
+    return parse_events(body)
+
+
+def test_sse_event_framing():
+    assert sse_event("token", {"text": "a\nb"}) == (
+        'event: token\ndata: {"text": "a\\nb"}\n\n'
+    )
+
+
+def test_event_stream_is_requested_by_parameter_or_accept_header():
+    assert event_stream_requested(make_request(), stream=True)
+    assert event_stream_requested(make_request("text/event-stream"))
+    assert not event_stream_requested(make_request("application/json"))
+
+
+async def test_tokens_are_followed_by_the_full_result(logged):
+    async def pieces():
+        yield "Short "
+        yield "summary. "
+
+    assert await collect(pieces(), logged) == [
+        ("token", {"text": "Short "}),
+        ("token", {"text": "summary. "}),
+        ("done", {"summary": "Short summary."}),
+    ]
+    assert logged[0]["status_code"] == 200
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [
+        (UpstreamTimeoutException("timed out"), 504),
+        (ServiceError("bad response"), 422),
+        (RuntimeError("bug"), 500),
+    ],
+)
+async def test_failures_end_the_stream_with_an_error_event(logged, error, status_code):
+    async def pieces():
+        yield "Short "
+        raise error
+
+    events = await collect(pieces(), logged)
+
+    assert events[0] == ("token", {"text": "Short "})
+    assert events[-1][0] == "error"
+    assert logged[0]["status_code"] == status_code
+
+
+def test_think_blocks_split_across_deltas_are_removed():
+    think_filter = ThinkFilter()
+    deltas = ["<thi", "nk>plan</th", "ink>\n Answer", " <", "b>"]
+
+    text = "".join(think_filter.feed(delta) for delta in deltas)
+
+    assert text + think_filter.flush() == "Answer <b>"
@@ -0,0 +1,98 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from app.services.chunking import estimate_tokens
+from app.services.text_summarizer import (
+    SummaryMode,
+    TextSummarizer,
+    TextSummarizerException,
+)
+
+
+@pytest.fixture
+def summarizer():
+    summarizer = TextSummarizer()
+    summarizer.chunk_tokens = 10
+    summarizer.max_reduce_rounds = 3
+    return summarizer
+
+
+def paragraphs(count: int, words: int = 8) -> str:
+    return "\n\n".join(" ".join(["word"] * words) for _ in range(count))
+
+
+async def test_condense_stops_when_a_round_does_not_shrink(summarizer, monkeypatch):
+    calls = []
+
+    async def complete(text, mode, extract_keywords=False, **kwargs):
+        calls.append(text)
+        return {"summary": text}
+
+    monkeypatch.setattr(summarizer, "_complete", complete)
+
+    text = paragraphs(6)
+    combined, keywords = await summarizer._condense(text)
+
+    # The map round plus one reduce round that did not shrink the text
+    assert len(calls) == 12
+    assert combined == text
+    assert keywords == []
+
+
+async def test_condense_stops_after_max_rounds(summarizer, monkeypatch):
+    rounds = []
+
+    async def complete(text, mode, extract_keywords=False, **kwargs):
+        rounds.append(text)
+        return {"summary": text[:-1]}
+
+    monkeypatch.setattr(summarizer, "_complete", complete)
+
+    combined, _ = await summarizer._condense(paragraphs(8))
+
+    chunk_calls = len(paragraphs(8).split("\n\n"))
+    assert len(rounds) == chunk_calls * (1 + summarizer.max_reduce_rounds)
+    assert len(combined) > summarizer.chunk_tokens
+
+
+async def test_condense_reduces_until_within_budget(summarizer, monkeypatch):
+    async def complete(text, mode, extract_keywords=False, **kwargs):
+        return {"summary": "short", "keywords": ["term"]}
+
+    monkeypatch.setattr(summarizer, "_complete", complete)
+
+    combined, keywords = await summarizer._condense(
+        paragraphs(12), extract_keywords=True
+    )
+
+    assert estimate_tokens(combined) <= summarizer.chunk_tokens
+    assert set(combined.split("\n\n")) == {"short"}
+    assert keywords == ["term"]
+
+
+class FakeRoute:
+    def __init__(self, result: dict):
+        self.result = result
+
+    async def create(self, **kwargs):
+        message = SimpleNamespace(content=json.dumps(self.result))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.mark.parametrize("keywords", [[1, None], "alpha, beta"])
+async def test_complete_rejects_malformed_keywords(summarizer, keywords):
+    summarizer.route = FakeRoute({"summary": "short", "keywords": keywords})
+
+    with pytest.raises(TextSummarizerException):
+        await summarizer._complete("text", SummaryMode.PARAGRAPH, extract_keywords=True)
+
+
+async def test_complete_accepts_keyword_strings(summarizer):
+    summarizer.route = FakeRoute({"summary": "short", "keywords": ["alpha"]})
+
+    result = await summarizer._complete(
+        "text", SummaryMode.PARAGRAPH, extract_keywords=True
+    )
+
+    assert result["keywords"] == ["alpha"]
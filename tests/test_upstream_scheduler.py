@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from app.services.upstream_scheduler import (
+    Priority,
+    UpstreamQueueTimeout,
+    UpstreamScheduler,
+    priority,
+    set_client_key,
+)
+
+
+def make_scheduler(max_concurrency=1, per_model=1, timeout=5.0) -> UpstreamScheduler:
+    return UpstreamScheduler(
+        max_concurrency=max_concurrency,
+        max_concurrency_per_model=per_model,
+        model_concurrency={},
+        queue_timeouts={Priority.INTERACTIVE: timeout, Priority.BATCH: timeout},
+    )
+
+
+def queue(scheduler, served, client_key, model="m", level=Priority.INTERACTIVE):
+    """Start a call that records its name once it gets a slot."""
+
+    async def call():
+        set_client_key(client_key)
+        with priority(level):
+            await scheduler.acquire(model)
+        served.append((client_key, model))
+
+    return asyncio.create_task(call())
+
+
+async def settle():
+    """Let woken waiters run up to their next suspension point."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def drain(scheduler, model="m", count=1):
+    """Release slots one at a time, letting the next waiter run."""
+    for _ in range(count):
+        scheduler.release(model)
+        await settle()
+
+
+async def test_client_keys_are_served_round_robin():
+    scheduler = make_scheduler()
+    await scheduler.acquire("m")
+    served = []
+    for client_key in ("a", "a", "a", "b", "c"):
+        queue(scheduler, served, client_key)
+    await asyncio.sleep(0)
+
+    await drain(scheduler, count=5)
+
+    assert [client_key for client_key, _ in served] == ["a", "b", "c", "a", "a"]
+
+
+async def test_interactive_calls_are_served_before_batch_calls():
+    scheduler = make_scheduler()
+    await scheduler.acquire("m")
+    served = []
+    queue(scheduler, served, "a", level=Priority.BATCH)
+    queue(scheduler, served, "b")
+    await asyncio.sleep(0)
+
+    await drain(scheduler, count=2)
+
+    assert [client_key for client_key, _ in served] == ["b", "a"]
+
+
+async def test_waiters_for_a_busy_model_do_not_block_other_models():
+    scheduler = make_scheduler(max_concurrency=2, per_model=1)
+    await scheduler.acquire("m")
+    served = []
+    queue(scheduler, served, "a", model="m")
+    queue(scheduler, served, "a", model="other")
+    await settle()
+
+    assert served == [("a", "other")]
+    assert scheduler.queue_depth() == 1
+
+
+async def test_queue_timeout_removes_the_waiter():
+    scheduler = make_scheduler(timeout=0.01)
+    await scheduler.acquire("m")
+
+    with pytest.raises(UpstreamQueueTimeout) as exc_info:
+        await scheduler.acquire("m")
+
+    assert exc_info.value.retry_after >= 1
+    assert scheduler.queue_depth() == 0
+    assert scheduler.timeouts == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = make_scheduler()
+    await scheduler.acquire("m")
+    task = queue(scheduler, [], "a")
+    await asyncio.sleep(0)
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert scheduler.queue_depth() == 0
+    scheduler.release("m")
+    assert scheduler.metrics["in_flight"] == 0
+
+
+async def test_cancelling_a_granted_waiter_does_not_leak_the_slot():
+    scheduler = make_scheduler()
+    await scheduler.acquire("m")
+    served = []
+    tasks = [queue(scheduler, served, "a"), queue(scheduler, served, "b")]
+    await asyncio.sleep(0)
+
+    # The slot goes to "a", which is cancelled before it resumes; either
+    # it keeps the slot or hands it to "b", but the slot is never lost
+    scheduler.release("m")
+    tasks[0].cancel()
+    await settle()
+
+    assert len(served) == 1
+    assert scheduler.metrics["in_flight"] == 1
+    await drain(scheduler)
+    tasks[1].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert scheduler.queue_depth() == 0
+
+
+async def test_try_acquire_never_jumps_the_queue():
+    scheduler = make_scheduler(max_concurrency=2, per_model=2)
+    assert scheduler.try_acquire("m")
+    assert scheduler.try_acquire("m")
+    assert not scheduler.try_acquire("m")
+
+    scheduler.release("m")
+    assert scheduler.try_acquire("m")
+
+
+async def test_slot_releases_when_the_block_exits():
+    scheduler = make_scheduler()
+
+    with pytest.raises(RuntimeError):
+        async with scheduler.slot("m"):
+            assert scheduler.metrics["in_flight"] == 1
+            raise RuntimeError("call failed")
+
+    assert scheduler.metrics["in_flight"] == 0
@@ -0,0 +1,93 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import usage_log_writer as usage_log_writer_module
+from app.services.usage_log_writer import DROP_OLDEST, UsageLogWriter
+
+
+def submit(writer: UsageLogWriter, api_key_id: int) -> bool:
+    return writer.submit(
+        api_key_id=api_key_id,
+        endpoint="/summarize",
+        method="POST",
+        status_code=200,
+        response_time=0.5,
+        ip_address="203.0.113.9",
+    )
+
+
+def queued_keys(writer: UsageLogWriter) -> list:
+    return [row["api_key_id"] for row in writer._queue._queue]
+
+
+def test_full_queue_drops_the_newest_record():
+    writer = UsageLogWriter(max_queue_size=2, batch_size=10, flush_interval=1)
+
+    assert submit(writer, 1) and submit(writer, 2)
+    assert not submit(writer, 3)
+    assert queued_keys(writer) == [1, 2]
+    assert (writer.enqueued, writer.dropped) == (2, 1)
+
+
+def test_full_queue_can_drop_the_oldest_record():
+    writer = UsageLogWriter(
+        max_queue_size=2, batch_size=10, flush_interval=1, drop_policy=DROP_OLDEST
+    )
+
+    assert submit(writer, 1) and submit(writer, 2) and submit(writer, 3)
+    assert queued_keys(writer) == [2, 3]
+    assert (writer.enqueued, writer.dropped) == (3, 1)
+
+
+def test_unknown_drop_policy_is_rejected():
+    with pytest.raises(ValueError):
+        UsageLogWriter(
+            max_queue_size=2, batch_size=10, flush_interval=1, drop_policy="x"
+        )
+
+
+async def test_stop_drains_the_queue_in_batches(monkeypatch):
+    writer = UsageLogWriter(max_queue_size=100, batch_size=3, flush_interval=60)
+    batches = []
+
+    async def write(batch):
+        batches.append([row["api_key_id"] for row in batch])
+
+    monkeypatch.setattr(writer, "_write", write)
+    for api_key_id in range(7):
+        submit(writer, api_key_id)
+    writer.submit_many(
+        [
+            {
+                "api_key_id": 7,
+                "endpoint": "/summarize/batch",
+                "method": "POST",
+                "status_code": 200,
+                "response_time": 0.5,
+                "ip_address": "203.0.113.9",
+            }
+        ]
+    )
+
+    writer.start()
+    await writer.stop(timeout=1)
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert writer._queue.empty()
+
+
+async def test_failed_write_is_counted(monkeypatch):
+    @asynccontextmanager
+    async def begin():
+        raise OSError("database is down")
+        yield
+
+    monkeypatch.setattr(
+        usage_log_writer_module, "engine", type("Engine", (), {"begin": begin})
+    )
+    writer = UsageLogWriter(max_queue_size=10, batch_size=10, flush_interval=1)
+
+    await writer._write([{"api_key_id": 1}, {"api_key_id": 2}])
+
+    assert (writer.failed, writer.flushed, writer.batches) == (2, 0, 0)
@@ -0,0 +1,104 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import RollupGranularity
+from app.services import usage_partitions as usage_partitions_module
+from app.services.usage_partitions import (
+    UsagePartitionManager,
+    add_months,
+    partition_name,
+)
+
+
+class FakeConnection:
+    def __init__(self, rowcount=0):
+        self.rowcount = rowcount
+        self.rows = []
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=self.rowcount, all=lambda: self.rows)
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = FakeConnection()
+
+    @asynccontextmanager
+    async def begin():
+        yield connection
+
+    monkeypatch.setattr(usage_partitions_module, "engine", SimpleNamespace(begin=begin))
+    return connection
+
+
+@pytest.fixture
+def manager():
+    return UsagePartitionManager(
+        retention_months=12,
+        months_ahead=2,
+        interval=60,
+        hourly_histogram_retention_days=8,
+    )
+
+
+def compiled(statement) -> tuple:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+async def test_prunes_hourly_histograms_past_retention(manager, connection):
+    connection.rowcount = 3
+
+    deleted = await manager.prune_hourly_histograms(now=datetime(2026, 10, 15, 12))
+
+    assert deleted == 3
+    ((sql, params),) = [compiled(statement) for statement in connection.statements]
+    assert sql.startswith("DELETE FROM api_key_latency_histograms")
+    assert params == {
+        "granularity_1": RollupGranularity.HOUR,
+        "bucket_start_1": datetime(2026, 10, 7, 12),
+    }
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name(date(2026, 3, 1)) == "api_key_usage_y2026m03"
+
+
+async def test_creates_partitions_for_the_current_and_next_months(manager, connection):
+    names = await manager.ensure_partitions(today=date(2026, 11, 20))
+
+    assert names == [
+        "api_key_usage_y2026m11",
+        "api_key_usage_y2026m12",
+        "api_key_usage_y2027m01",
+    ]
+    ddl = [str(statement) for statement in connection.statements[1:]]
+    assert ddl[2] == (
+        'CREATE TABLE IF NOT EXISTS "api_key_usage_y2027m01" '
+        'PARTITION OF "api_key_usage" '
+        "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')"
+    )
+
+
+async def test_drops_only_partitions_past_retention(manager, connection):
+    connection.rows = [
+        ("api_key_usage_y2025m09",),
+        ("api_key_usage_y2025m10",),
+        ("api_key_usage_y2025m11",),
+        ("api_key_usage_default",),
+    ]
+
+    dropped = await manager.drop_expired_partitions(today=date(2026, 11, 20))
+
+    assert dropped == ["api_key_usage_y2025m09", "api_key_usage_y2025m10"]
+    assert str(connection.statements[-1]) == (
+        'DROP TABLE IF EXISTS "api_key_usage_y2025m10"'
+    )
@@ -0,0 +1,79 @@
+from datetime import datetime
+from app.models import RollupGranularity
+from app.services.usage_rollups import (
+    bin_value,
+    build_histogram_rows,
+    build_rollup_rows,
+    histogram_percentiles,
+    latency_bin,
+)
+
+
+def record(created_at, status_code=200, response_time=0.5, endpoint="/summarize"):
+    return {
+        "api_key_id": 1,
+        "endpoint": endpoint,
+        "status_code": status_code,
+        "response_time": response_time,
+        "created_at": created_at,
+    }
+
+
+def test_rollups_are_built_per_day_only():
+    rows = build_rollup_rows(
+        [
+            record(datetime(2026, 10, 15, 9, 1)),
+            record(datetime(2026, 10, 15, 17, 30), status_code=500, response_time=1.5),
+            record(datetime(2026, 10, 16, 0, 5)),
+        ]
+    )
+
+    assert [(row["granularity"], row["bucket_start"]) for row in rows] == [
+        (RollupGranularity.DAY, datetime(2026, 10, 15)),
+        (RollupGranularity.DAY, datetime(2026, 10, 16)),
+    ]
+    first = rows[0]
+    assert first["request_count"] == 2
+    assert first["error_count"] == 1
+    assert first["response_time_sum"] == 2.0
+    assert (first["response_time_min"], first["response_time_max"]) == (0.5, 1.5)
+
+
+def test_latency_bins_are_within_a_few_percent():
+    for response_time in (0.0005, 0.012, 0.25, 3.7, 42.0):
+        bin = latency_bin(response_time)
+        if response_time <= 0.001:
+            assert bin == 0
+        else:
+            assert abs(bin_value(bin) - response_time) / response_time < 0.03
+
+
+def test_histogram_percentiles_follow_the_counts():
+    fast, slow = latency_bin(0.1), latency_bin(2.0)
+    counts = {fast: 90, slow: 10}
+
+    p50, p90, p99 = histogram_percentiles(counts, (0.5, 0.9, 0.99))
+
+    assert p50 == p90 == bin_value(fast)
+    assert p99 == bin_value(slow)
+    assert histogram_percentiles({}, (0.5,)) == [0.0]
+
+
+def test_histograms_are_built_per_hour_and_day():
+    rows = build_histogram_rows(
+        [
+            record(datetime(2026, 10, 15, 9, 1)),
+            record(datetime(2026, 10, 15, 9, 40)),
+            record(datetime(2026, 10, 15, 17, 30)),
+        ]
+    )
+
+    bin = latency_bin(0.5)
+    assert [
+        (row["granularity"], row["bucket_start"], row["bin"], row["count"])
+        for row in rows
+    ] == [
+        (RollupGranularity.DAY, datetime(2026, 10, 15), bin, 3),
+        (RollupGranularity.HOUR, datetime(2026, 10, 15, 9), bin, 2),
+        (RollupGranularity.HOUR, datetime(2026, 10, 15, 17), bin, 1),
+    ]
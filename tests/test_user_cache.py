@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import User
+from app.services.user_cache import (
+    CachedUser,
+    get_cached_user,
+    update_user_access,
+    user_cache,
+    user_token_claims,
+)
+
+
+class FakeSession:
+    def __init__(self, user=None, rowcount=1):
+        self.user = user
+        self.rowcount = rowcount
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(
+            scalar_one_or_none=lambda: self.user, rowcount=self.rowcount
+        )
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def make_user() -> User:
+    return User(
+        id=7,
+        email="ada@example.com",
+        username="ada",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        version=3,
+    )
+
+
+async def test_caches_a_snapshot_of_the_user():
+    session = FakeSession(make_user())
+
+    user = await get_cached_user(session, 7)
+    assert user == CachedUser(7, "ada@example.com", "ada", True, False, 3)
+    assert user_cache.get(7) is user
+
+    assert await get_cached_user(session, 7) is user
+    assert len(session.statements) == 1
+
+
+async def test_missing_user_is_not_cached():
+    assert await get_cached_user(FakeSession(), 7) is None
+    assert user_cache.get(7) is None
+
+
+def test_token_claims_carry_only_subject_status_and_version():
+    assert user_token_claims(make_user()) == {"sub": "7", "ver": 3, "active": True}
+
+
+async def test_update_user_access_bumps_version_and_evicts():
+    user_cache.set(7, CachedUser.from_user(make_user()))
+    session = FakeSession()
+
+    assert await update_user_access(session, 7, is_active=False)
+
+    [statement] = session.statements
+    params = statement.compile().params
+    assert params["is_active"] is False
+    assert "version=(users.version +" in str(statement).replace(" = ", "=")
+    assert session.commits == 1
+    assert user_cache.get(7) is None